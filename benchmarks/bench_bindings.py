@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用快捷键匹配基准测试
+生成不同数量的快捷键，回放同一段按键序列，对比前缀树匹配与逐个检查每个快捷键的朴素实现的单事件开销
+"""
+
+import argparse
+import random
+import string
+import time
+
+from bindings import SequenceMatcher, compile_bindings, parse_binding
+
+MODIFIERS = ["ctrl_l", "alt_l", "shift_l", "cmd"]
+CHARS = string.ascii_lowercase + string.digits
+
+
+def make_bindings(count: int, seed: int = 1):
+    """生成互不为前缀的快捷键: 一个修饰键组合后接一到两个字符"""
+    rng = random.Random(seed)
+    bindings = {}
+    while len(bindings) < count:
+        steps = [f"{rng.choice(MODIFIERS)}+{rng.choice(CHARS)}"]
+        steps += rng.sample(CHARS, rng.randint(1, 2))
+        candidate = dict(bindings)
+        candidate[", ".join(steps)] = f"app{len(bindings)}"
+        try:
+            compile_bindings(candidate, str)
+        except ValueError:
+            continue
+        bindings = candidate
+    return bindings
+
+
+def make_events(bindings, count: int, seed: int = 2):
+    """按下/释放事件: 一半是完整的快捷键，一半是随机输入"""
+    rng = random.Random(seed)
+    texts = list(bindings)
+    events = []
+    while len(events) < count:
+        if rng.random() < 0.5:
+            for step in parse_binding(rng.choice(texts)):
+                events += [("press", name) for name in step]
+                events += [("release", name) for name in reversed(step)]
+        else:
+            name = rng.choice(CHARS)
+            events += [("press", name), ("release", name)]
+    return events
+
+
+class NaiveMatcher:
+    """对照组: 每个事件检查每个快捷键的进度"""
+
+    def __init__(self, bindings, on_action):
+        self.bindings = [([frozenset(step) for step in parse_binding(text)], action)
+                         for text, action in bindings.items()]
+        self.progress = [0] * len(self.bindings)
+        self.on_action = on_action
+        self.pressed = set()
+
+    def on_press(self, key):
+        self.pressed.add(key)
+        chord = frozenset(self.pressed)
+        for i, (steps, action) in enumerate(self.bindings):
+            step = steps[self.progress[i]]
+            if chord == step:
+                self.progress[i] += 1
+                if self.progress[i] == len(steps):
+                    self.progress[i] = 0
+                    self.on_action(action)
+            elif not chord < step:
+                self.progress[i] = 1 if chord == steps[0] else 0
+
+    def on_release(self, key):
+        self.pressed.discard(key)
+
+
+def replay(matcher, events) -> float:
+    start = time.perf_counter()
+    for action, name in events:
+        if action == "press":
+            matcher.on_press(name)
+        else:
+            matcher.on_release(name)
+    return (time.perf_counter() - start) / len(events)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 100, 1000])
+    arg_parser.add_argument("--events", type=int, default=200_000)
+    args = arg_parser.parse_args()
+
+    for count in args.counts:
+        bindings = make_bindings(count)
+        events = make_events(bindings, args.events)
+        fired = []
+        trie = replay(SequenceMatcher(compile_bindings(bindings, str), fired.append, timeout=60), events)
+        trie_fired = len(fired)
+        fired.clear()
+        naive = replay(NaiveMatcher(bindings, fired.append), events)
+        print(f"{count:>5} 个快捷键: 前缀树 {trie * 1e9:6.0f}ns/事件 (触发 {trie_fired})  "
+              f"朴素 {naive * 1e9:8.0f}ns/事件 (触发 {len(fired)})")
+
+
+if __name__ == "__main__":
+    main()
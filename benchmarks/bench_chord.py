@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+组合键检测基准测试
+注入合成按键事件，测量从组合键凑齐到主线程开始分发的延迟，
+并与旧的 10ms 轮询实现对比
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from hotkey import ChordDetector
+
+TRIGGER_KEYS = ["alt_l", "alt_r"]
+NOISE_KEYS = ["a", "b", "ctrl_l", "shift_l"]
+
+
+def _report(name, samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<10} n={len(samples):<5} mean={statistics.fmean(samples) * 1e6:9.1f}us "
+          f"p50={p50 * 1e6:9.1f}us p99={p99 * 1e6:9.1f}us")
+
+
+def bench_event_driven(rounds: int):
+    """事件驱动: 监听回调直接唤醒分发线程"""
+    trigger_event = threading.Event()
+    detector = ChordDetector(TRIGGER_KEYS, trigger_event.set)
+    samples = []
+    t_trigger = [0.0]
+
+    def dispatcher():
+        for _ in range(rounds):
+            trigger_event.wait()
+            samples.append(time.perf_counter() - t_trigger[0])
+            trigger_event.clear()
+
+    thread = threading.Thread(target=dispatcher, daemon=True)
+    thread.start()
+    for _ in range(rounds):
+        for key in NOISE_KEYS:
+            detector.on_press(key)
+            detector.on_release(key)
+        detector.on_press(TRIGGER_KEYS[0])
+        t_trigger[0] = time.perf_counter()
+        detector.on_press(TRIGGER_KEYS[1])
+        while trigger_event.is_set():
+            time.sleep(0)
+        detector.on_release(TRIGGER_KEYS[1])
+        detector.on_release(TRIGGER_KEYS[0])
+        time.sleep(0.001)
+    thread.join()
+    return samples
+
+
+def bench_polling(rounds: int):
+    """旧实现: 主线程每 10ms 比较一次集合"""
+    current_press_keys = []
+    samples = []
+    t_trigger = [0.0]
+    done = threading.Event()
+    dispatched = threading.Event()
+
+    def poller():
+        showing = False
+        while not done.is_set():
+            time.sleep(0.01)
+            if set(TRIGGER_KEYS) <= set(current_press_keys):
+                if not showing:
+                    showing = True
+                    samples.append(time.perf_counter() - t_trigger[0])
+                    dispatched.set()
+            else:
+                showing = False
+
+    thread = threading.Thread(target=poller, daemon=True)
+    thread.start()
+    for _ in range(rounds):
+        current_press_keys.append(TRIGGER_KEYS[0])
+        t_trigger[0] = time.perf_counter()
+        current_press_keys.append(TRIGGER_KEYS[1])
+        dispatched.wait()
+        dispatched.clear()
+        current_press_keys.remove(TRIGGER_KEYS[1])
+        current_press_keys.remove(TRIGGER_KEYS[0])
+        time.sleep(0.015)
+    done.set()
+    thread.join()
+    return samples
+
+
+def bench_callback_cost(events: int):
+    """单次按键回调的开销"""
+    detector = ChordDetector(TRIGGER_KEYS, lambda: None)
+    keys = NOISE_KEYS + TRIGGER_KEYS
+    start = time.perf_counter()
+    for i in range(events // (2 * len(keys))):
+        for key in keys:
+            detector.on_press(key)
+        for key in keys:
+            detector.on_release(key)
+    elapsed = time.perf_counter() - start
+    return elapsed / events
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    print("触发到分发延迟:")
+    _report("event", bench_event_driven(args.rounds))
+    _report("polling", bench_polling(args.rounds))
+    per_event = bench_callback_cost(1_000_000)
+    print(f"回调开销: {per_event * 1e9:.0f}ns/事件")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置解析吞吐量基准测试
+在 1 万到 100 万行的合成配置上对比单遍扫描解析器与旧的逐个 re.match 实现，
+输出 MB/s 和 条目/s
+"""
+
+import argparse
+import random
+import re
+import time
+
+from config import CustomConfigParser
+
+
+class LegacyConfigParser:
+    """旧版解析器(仅保留解析部分)，作为对比基线"""
+
+    def parse_string(self, content):
+        config = {}
+        current_section = None
+        for line_num, line in enumerate(content.strip().split('\n'), 1):
+            line = line.strip()
+            if not line or line.startswith('##'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                current_section = line[1:-1]
+                config[current_section] = {}
+                continue
+            if '=' in line:
+                key, value = self._parse_key_value(line)
+                if current_section is None:
+                    raise ValueError(f"第{line_num}行: 必须在段内定义键值对")
+                config[current_section][key] = value
+        return config
+
+    def _parse_key_value(self, line):
+        parts = line.split('=', 1)
+        key = parts[0].strip()
+        value = parts[1].strip()
+        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', key):
+            raise ValueError(f"无效的键名: {key}")
+        return key, self._parse_value(value)
+
+    def _parse_value(self, value):
+        if value.startswith('"') and value.endswith('"'):
+            return value[1:-1].replace('\\n', '\n').replace('\\t', '\t').replace('\\"', '"')
+        if re.match(r'^\d+$', value):
+            return int(value)
+        if re.match(r'^\d+\.\d+$', value):
+            return float(value)
+        if value.lower() in ['yes', 'true', 'on']:
+            return True
+        if value.lower() in ['no', 'false', 'off']:
+            return False
+        if value.startswith('[') and value.endswith(']'):
+            items = value[1:-1].split(',')
+            return [self._parse_value(item.strip()) for item in items if item.strip()]
+        if value.startswith('{') and value.endswith('}'):
+            items = value[1:-1].split(',')
+            result = {}
+            for item in items:
+                if ':' in item:
+                    k, v = item.split(':', 1)
+                    result[k.strip()] = self._parse_value(v.strip())
+            return result
+        if value.startswith('path:'):
+            return value[5:]
+        if value.startswith('expr:'):
+            return value[5:]
+        return value
+
+
+VALUE_TEMPLATES = [
+    lambda rng, i: f'"应用 {i} 的说明文字"',
+    lambda rng, i: str(rng.randint(0, 100000)),
+    lambda rng, i: f"{rng.random() * 100:.3f}",
+    lambda rng, i: rng.choice(["yes", "no"]),
+    lambda rng, i: f'["/opt/app{i}", "/usr/lib/app{i}", {i}]',
+    lambda rng, i: f"{{command: app{i} --flag, icon: app{i}, weight: {i % 7}}}",
+    lambda rng, i: f"path:/usr/share/app{i}",
+    lambda rng, i: "expr:keyboard.Key.alt_l",
+]
+
+
+def make_config(lines: int, seed: int = 1) -> str:
+    """生成合成配置，每个段 20 个键"""
+    rng = random.Random(seed)
+    parts = []
+    entry = 0
+    while len(parts) < lines:
+        parts.append(f"[app{entry // 20}]")
+        parts.append("## 自动生成")
+        for _ in range(20):
+            parts.append(f"key_{entry} = {rng.choice(VALUE_TEMPLATES)(rng, entry)}")
+            entry += 1
+        parts.append("")
+    return "\n".join(parts[:lines]) + "\n"
+
+
+def _measure(parser, content, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parser.parse_string(content)
+        best = min(best, time.perf_counter() - start)
+    entries = sum(len(section) for section in result.values())
+    return best, entries
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--lines", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    for lines in args.lines:
+        content = make_config(lines)
+        size_mb = len(content.encode('utf-8')) / 1e6
+        print(f"{lines} 行 ({size_mb:.1f}MB):")
+        for name, parser in (("legacy", LegacyConfigParser()), ("tokenizer", CustomConfigParser())):
+            elapsed, entries = _measure(parser, content, args.repeat if lines < 1_000_000 else 1)
+            print(f"  {name:<10} {elapsed * 1e3:9.1f}ms  {size_mb / elapsed:7.2f}MB/s  "
+                  f"{entries / elapsed:12,.0f} 条目/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量更新基准测试
+对比修改一个键后用 write_config 重写整个文件与 ConfigDocument.set + save 的耗时
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_config import make_config
+from config import ConfigDocument, CustomConfigParser
+
+
+def bench(lines, rounds):
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "config.ccf")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(make_config(lines))
+
+        parser = CustomConfigParser()
+        config = parser.parse_file(file_path, snapshot=False)
+        section = next(iter(config))
+        start = time.perf_counter()
+        for i in range(rounds):
+            config[section]["counter"] = i
+            parser.write_config(file_path, config)
+        rewrite = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        document = ConfigDocument.load(file_path)
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(rounds):
+            document.set(section, "counter", i)
+            document.save()
+        update = (time.perf_counter() - start) / rounds
+
+        print(f"{lines} 行:")
+        print(f"  write_config 重写   {rewrite * 1e3:9.2f}ms")
+        print(f"  ConfigDocument 载入 {loaded * 1e3:9.2f}ms")
+        print(f"  set + save          {update * 1e3:9.2f}ms")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--lines", type=int, nargs="+", default=[1_000, 100_000])
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    for lines in args.lines:
+        bench(lines, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
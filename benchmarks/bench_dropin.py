@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+drop-in 片段基准测试
+生成主配置和 config.d 中的大量片段(每个片段是一个团队或机器的应用列表)，对比:
+首次加载、无变化时重新加载、修改一个片段后重新加载，
+以及每次都重新解析全部片段、把全部片段拼接成一个文件解析的耗时
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from config import CustomConfigParser, DropInConfig
+
+
+def make_fragment(i: int, apps: int) -> str:
+    entries = ", ".join(f"团队{i} 应用{j}:/opt/team{i}/bin/app{j} --profile {i}" for j in range(apps))
+    return (f"## 第 {i} 个片段\n"
+            f"[general]\n"
+            f"apps = {{{entries}}}\n\n"
+            f"[team{i}]\n"
+            f'owner = "team{i}@example.com"\n'
+            f"machines = [host{i}a, host{i}b, host{i}c]\n"
+            f"priority = {i % 10}\n")
+
+
+def make_tree(base: str, fragments: int, apps: int) -> str:
+    main_path = os.path.join(base, "config.ccf")
+    with open(main_path, "w", encoding="utf-8") as f:
+        f.write("[general]\nname = \"CCF\"\napps = {Microsoft Edge:microsoft-edge-stable}\n")
+    directory = os.path.join(base, "config.d")
+    os.makedirs(directory)
+    for i in range(fragments):
+        with open(os.path.join(directory, f"{i:04d}-team.ccf"), "w", encoding="utf-8") as f:
+            f.write(make_fragment(i, apps))
+    # 让所有文件脱离"刚修改过"的窗口，缓存可以直接信任
+    old = time.time_ns() - 10_000_000_000
+    for name in os.listdir(directory):
+        os.utime(os.path.join(directory, name), ns=(old, old))
+    os.utime(main_path, ns=(old, old))
+    return main_path
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def bench(fragments: int, apps: int, snapshot: bool):
+    with tempfile.TemporaryDirectory() as base:
+        main_path = make_tree(base, fragments, apps)
+        config = DropInConfig(main_path, snapshot=snapshot)
+        merged, cold = _timed(config.load)
+        _, unchanged = _timed(config.load)
+
+        changed_path = config.files()[fragments // 2 + 1]
+        with open(changed_path, "a", encoding="utf-8") as f:
+            f.write("extra = yes\n")
+        merged_after, one_changed = _timed(config.load)
+        reparsed = config.reparsed
+
+        _, full = _timed(lambda: DropInConfig(main_path, snapshot=False).load())
+
+        concatenated = os.path.join(base, "all.ccf")
+        with open(concatenated, "w", encoding="utf-8") as out:
+            for file_path in config.files():
+                with open(file_path, "r", encoding="utf-8") as f:
+                    out.write(f.read() + "\n")
+        _, single = _timed(lambda: CustomConfigParser().parse_file(concatenated, snapshot=False))
+
+        print(f"{fragments} 个片段 x {apps} 个应用 (合并后 {len(merged_after['general']['apps'])} 个应用, "
+              f"快照 {'开' if snapshot else '关'}):")
+        print(f"  首次加载              {cold * 1e3:8.1f}ms")
+        print(f"  无变化重新加载        {unchanged * 1e3:8.1f}ms")
+        print(f"  修改一个片段后加载    {one_changed * 1e3:8.1f}ms (重新解析 {reparsed} 个文件)")
+        print(f"  全部重新解析          {full * 1e3:8.1f}ms")
+        print(f"  拼接为单个文件解析    {single * 1e3:8.1f}ms")
+        assert merged_after["general"]["apps"].keys() == merged["general"]["apps"].keys()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--fragments", type=int, default=1000)
+    arg_parser.add_argument("--apps", type=int, default=5)
+    arg_parser.add_argument("--snapshot", action="store_true", help="首次加载时使用并生成磁盘快照")
+    args = arg_parser.parse_args()
+
+    bench(args.fragments, args.apps, args.snapshot)
+
+
+if __name__ == "__main__":
+    main()
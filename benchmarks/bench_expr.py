@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表达式求值基准测试
+对比每次都解析编译的 eval(源文本) 与 expr_eval 按源文本缓存代码对象后的求值耗时，
+以及第一次求值(解析 + 白名单检查 + 编译)的耗时
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+from expr_eval import compile_expr, evaluate
+
+EXPRESSIONS = [
+    "keyboard.Key.alt_l",
+    "keyboard.Key.ctrl_r",
+    'f"--profile={profile} --class={name}"',
+    "timeout * 1000 if fast else timeout",
+]
+SYMBOLS = {
+    "keyboard": SimpleNamespace(Key=SimpleNamespace(alt_l="alt_l", ctrl_r="ctrl_r")),
+    "profile": "default",
+    "name": "perflaunch",
+    "timeout": 1.5,
+    "fast": True,
+}
+
+
+def _per_call(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for source in EXPRESSIONS:
+            func(source)
+    return (time.perf_counter() - start) / (rounds * len(EXPRESSIONS))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=50_000)
+    args = arg_parser.parse_args()
+
+    globals_ = {"__builtins__": {}}
+    plain = _per_call(lambda source: eval(source, globals_, SYMBOLS), args.rounds)
+
+    start = time.perf_counter()
+    for source in EXPRESSIONS:
+        compile_expr(source)
+    first = (time.perf_counter() - start) / len(EXPRESSIONS)
+    cached = _per_call(lambda source: evaluate(source, SYMBOLS), args.rounds)
+
+    print(f"eval(源文本)         {plain * 1e6:7.2f}us/次")
+    print(f"首次编译(含检查)     {first * 1e6:7.2f}us/次")
+    print(f"evaluate(缓存代码)   {cached * 1e6:7.2f}us/次")
+
+
+if __name__ == "__main__":
+    main()
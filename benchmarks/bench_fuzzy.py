@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模糊搜索基准测试
+在合成的大规模名称列表上逐字符输入查询，统计索引构建时间和每次按键的耗时
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from fuzzy import FuzzyIndex
+
+
+def make_names(count: int, seed: int = 1):
+    """生成类似应用名称的合成数据"""
+    rng = random.Random(seed)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+             for _ in range(max(100, count // 15))]
+    return [" ".join(rng.choice(words).capitalize() for _ in range(rng.randint(1, 3)))
+            for _ in range(count)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--entries", type=int, default=50_000)
+    arg_parser.add_argument("--queries", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    names = make_names(args.entries)
+    start = time.perf_counter()
+    index = FuzzyIndex(names)
+    print(f"索引构建: {len(names)} 条, {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+    rng = random.Random(2)
+    samples = []
+    for _ in range(args.queries):
+        target = rng.choice(names).lower()
+        index.search("")
+        query = ""
+        for char in target:
+            query += char
+            start = time.perf_counter()
+            index.search(query)
+            samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    print(f"每次按键: n={len(samples)} mean={statistics.fmean(samples) * 1e6:.1f}us "
+          f"p50={samples[len(samples) // 2] * 1e6:.1f}us "
+          f"p99={samples[int(len(samples) * 0.99)] * 1e6:.1f}us max={samples[-1] * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
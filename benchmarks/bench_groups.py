@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动组基准测试
+同一组应用分别以并行上限 1(逐个启动)和更高的上限启动，对比整组耗时；
+启动调用中可以附加固定等待，模拟启动前需要的准备工作(解析命令、检查策略等)
+"""
+
+import argparse
+import statistics
+import time
+
+from groups import LaunchGroup, run_group
+from launcher import ALWAYS, Launcher
+
+
+def bench(apps: int, parallel: int, command: str, rounds: int, prepare: float):
+    launcher = Launcher()
+    names = tuple(f"app{i}" for i in range(apps))
+
+    def launch(app_name):
+        if prepare:
+            time.sleep(prepare)
+        return launcher.launch_app(app_name, command, ALWAYS)[0]
+
+    for limit in sorted({1, parallel}):
+        group = LaunchGroup("bench", names, {}, {}, limit)
+        reports = [run_group(group, launch) for _ in range(rounds)]
+        wall = statistics.median(report.wall_time for report in reports)
+        spawn = statistics.median(entry.spawn_time for report in reports for entry in report.entries)
+        print(f"  并行 {limit:>2}: 整组 {wall * 1e3:7.2f}ms, 单个启动 {spawn * 1e3:6.2f}ms")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--apps", type=int, default=10)
+    arg_parser.add_argument("--parallel", type=int, default=4)
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    arg_parser.add_argument("--commands", nargs="+", default=["true", "sh -c 'exec true' >/dev/null"])
+    arg_parser.add_argument("--prepare-ms", type=float, nargs="+", default=[0, 5], help="每次启动前的等待")
+    args = arg_parser.parse_args()
+
+    for prepare_ms in args.prepare_ms:
+        for command in args.commands:
+            print(f"{args.apps} 个应用, 命令 {command!r}, 启动前等待 {prepare_ms}ms:")
+            bench(args.apps, args.parallel, command, args.rounds, prepare_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图标加载基准测试
+在临时图标主题中生成一批 256x256 PNG，对比:
+在界面线程中逐个解码缩放(不使用缓存)、线程池冷加载(生成缩略图)、缩略图已在磁盘缓存时的加载、
+LRU 命中时 request() 的开销。需要 PIL；没有显示时使用 tkinter 替身
+"""
+
+import argparse
+import importlib.util
+import os
+import queue
+import sys
+import tempfile
+import time
+
+from benchmarks.suite import _choose_tk
+
+
+def make_icons(root: str, count: int, size: int = 256):
+    from PIL import Image, ImageDraw
+    directory = os.path.join(root, "hicolor", f"{size}x{size}", "apps")
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((8, 8, size - 8, size - 8), fill=(i * 37 % 256, i * 91 % 256, 200, 255))
+        draw.text((size // 3, size // 3), str(i), fill=(255, 255, 255, 255))
+        image.save(os.path.join(directory, f"app{i}.png"))
+    return {f"应用 {i}": f"app{i}" for i in range(count)}
+
+
+def load_all(cache, deliveries: "queue.SimpleQueue", app_names):
+    """请求全部图标，在当前线程中执行工作线程送回的结果，直到全部到达"""
+    pending = sum(cache.request(app_name) is None for app_name in app_names)
+    for _ in range(pending):
+        func, args = deliveries.get()
+        func(*args)
+
+
+def bench(count, workers):
+    import tkinter
+    import icons
+
+    # PhotoImage 需要一个 Tk 解释器
+    root = tkinter.Tk()
+    with tempfile.TemporaryDirectory() as base:
+        theme_root = os.path.join(base, "icons")
+        names = make_icons(theme_root, count)
+        os.environ["XDG_DATA_HOME"] = base
+        os.environ["XDG_DATA_DIRS"] = base
+        thumbnails = os.path.join(base, "thumbnails")
+
+        start = time.perf_counter()
+        for icon in names.values():
+            icons._decode(icons.find_icon(icon, icons.DEFAULT_SIZE, roots=[theme_root]), icons.DEFAULT_SIZE)
+        inline = time.perf_counter() - start
+
+        def run():
+            deliveries = queue.SimpleQueue()
+            cache = icons.IconCache(lambda func, *args: deliveries.put((func, args)), workers=workers,
+                                    names=names, directory=thumbnails)
+            start = time.perf_counter()
+            load_all(cache, deliveries, list(names))
+            elapsed = time.perf_counter() - start
+            cache.shutdown()
+            return cache, elapsed
+
+        _, cold = run()
+        cache, warm = run()
+
+        start = time.perf_counter()
+        for app_name in names:
+            cache.request(app_name)
+        hit = (time.perf_counter() - start) / count
+
+        print(f"{count} 个图标, {workers} 个工作线程:")
+        print(f"  界面线程内解码缩放 {inline * 1e3:9.1f}ms")
+        print(f"  线程池冷加载       {cold * 1e3:9.1f}ms")
+        print(f"  磁盘缩略图缓存     {warm * 1e3:9.1f}ms")
+        print(f"  LRU 命中           {hit * 1e6:9.2f}us/次")
+    root.destroy()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--tk", choices=["auto", "stub", "real"], default="auto")
+    arg_parser.add_argument("--count", type=int, default=200)
+    arg_parser.add_argument("--workers", type=int, default=2)
+    args = arg_parser.parse_args()
+
+    if importlib.util.find_spec("PIL") is None:
+        print("没有安装 PIL，跳过")
+        sys.exit(0)
+    _choose_tk(args.tk)
+    bench(args.count, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程启动基准测试
+对比旧的 os.popen("exec ...") 与 posix_spawn 启动器的单次启动耗时
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from launcher import Launcher
+
+
+def _report(name, samples):
+    samples = sorted(samples)
+    print(f"{name:<12} n={len(samples):<4} mean={statistics.fmean(samples) * 1e6:8.1f}us "
+          f"p50={samples[len(samples) // 2] * 1e6:8.1f}us max={samples[-1] * 1e6:8.1f}us")
+
+
+def bench_popen(command, rounds):
+    samples = []
+    pipes = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        pipes.append(os.popen(f"exec {command}", mode='r', buffering=-1))
+        samples.append(time.perf_counter() - start)
+    for pipe in pipes:
+        pipe.close()
+    return samples
+
+
+def bench_spawn(command, rounds):
+    launcher = Launcher()
+    launcher.prepare(command)
+    samples = []
+    for _ in range(rounds):
+        launcher.launch(command)
+        samples.append(launcher.last_spawn_time)
+    return samples
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--command", default="true")
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    print(f"启动 {args.command!r} 的耗时:")
+    _report("os.popen", bench_popen(args.command, args.rounds))
+    _report("posix_spawn", bench_spawn(args.command, args.rounds))
+    time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+惰性段索引基准测试
+对比完整解析与 mmap 段索引(打开 + 读取一个段)的耗时，
+以及完整解析和 iter_entries 流式读取的峰值内存
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_config import make_config
+from config import CustomConfigParser
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench(lines):
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "config.ccf")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(make_config(lines))
+        size_mb = os.path.getsize(file_path) / 1e6
+
+        start = time.perf_counter()
+        CustomConfigParser().parse_file(file_path, snapshot=False)
+        eager = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parser = CustomConfigParser()
+        sections = parser.parse_file(file_path, lazy=True)
+        opened = time.perf_counter() - start
+        middle = list(sections)[len(sections) // 2]
+        start = time.perf_counter()
+        parser.get_section(middle)
+        first_get = time.perf_counter() - start
+
+        def stream():
+            streaming = CustomConfigParser()
+            streaming.parse_file(file_path, lazy=True)
+            for _ in streaming.iter_entries():
+                pass
+
+        eager_peak = _peak_memory(lambda: CustomConfigParser().parse_file(file_path, snapshot=False))
+        stream_peak = _peak_memory(stream)
+
+        print(f"{lines} 行 ({size_mb:.1f}MB, {len(sections)} 段):")
+        print(f"  完整解析       {eager * 1e3:9.1f}ms  峰值内存 {eager_peak / 1e6:7.1f}MB")
+        print(f"  惰性打开       {opened * 1e3:9.1f}ms")
+        print(f"  首次读取一个段 {first_get * 1e3:9.3f}ms")
+        print(f"  iter_entries   {'':>11}  峰值内存 {stream_peak / 1e6:7.1f}MB")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--lines", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = arg_parser.parse_args()
+
+    for lines in args.lines:
+        bench(lines)
+
+
+if __name__ == "__main__":
+    main()
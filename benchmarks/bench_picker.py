@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+选择窗口显示延迟基准测试
+对比每次新建 tk.Tk() 的冷路径与常驻窗口的热路径，
+测量从"热键触发"到窗口映射到屏幕的时间，
+以及不同列表长度下窗口创建和上下移动选择的耗时。需要可用的 X 显示
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from select_window import MaterialSelectWindow
+
+
+def _report(name, samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    print(f"{name:<6} n={len(samples):<4} mean={statistics.fmean(samples) * 1e3:8.2f}ms "
+          f"p50={p50 * 1e3:8.2f}ms max={samples[-1] * 1e3:8.2f}ms")
+
+
+def _measure_until_mapped(window, t_hotkey, samples, list_items=None):
+    """显示窗口，在第一次 <Map> 事件时记录延迟并关闭"""
+    def on_map(event=None):
+        if not recorded:
+            recorded.append(True)
+            samples.append(time.perf_counter() - t_hotkey)
+            window.root.after_idle(window.cancel)
+
+    recorded = []
+    window.root.bind("<Map>", on_map)
+    window.show(list_items)
+    window.root.unbind("<Map>")
+
+
+def bench_cold(items, rounds):
+    samples = []
+    for _ in range(rounds):
+        t_hotkey = time.perf_counter()
+        window = MaterialSelectWindow(items, None, "cold")
+        _measure_until_mapped(window, t_hotkey, samples)
+    return samples
+
+
+def bench_warm(items, rounds):
+    samples = []
+    window = MaterialSelectWindow(items, None, "warm", persistent=True)
+    for _ in range(rounds):
+        t_hotkey = time.perf_counter()
+        _measure_until_mapped(window, t_hotkey, samples, items)
+    window.root.destroy()
+    return samples
+
+
+def bench_build_and_navigate(count, moves):
+    """窗口创建耗时与单次移动选择耗时"""
+    items = [f"应用 {i}" for i in range(count)]
+    start = time.perf_counter()
+    window = MaterialSelectWindow(items, None, "build", persistent=True)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(moves):
+        window.move_down()
+    for _ in range(moves):
+        window.move_up()
+    navigate = (time.perf_counter() - start) / (2 * moves)
+    window.root.destroy()
+    print(f"{count:>7} 项: 创建 {build * 1e3:8.2f}ms, 移动选择 {navigate * 1e6:8.1f}us/次")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    arg_parser.add_argument("--items", type=int, default=10)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100_000])
+    args = arg_parser.parse_args()
+
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        print("没有可用的显示，跳过 (可以使用 xvfb-run 运行)")
+        sys.exit(0)
+
+    items = [f"应用 {i}" for i in range(args.items)]
+    print("热键到窗口可见延迟:")
+    _report("cold", bench_cold(items, args.rounds))
+    _report("warm", bench_warm(items, args.rounds))
+    print("列表长度对创建和导航的影响:")
+    for count in args.sizes:
+        bench_build_and_navigate(count, 200)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预读基准测试
+把测试程序(默认是当前 Python 解释器)和它的依赖库复制到临时目录，用 LD_LIBRARY_PATH 让子进程加载这些副本。
+每轮先用 posix_fadvise(DONTNEED) 把副本从页缓存中清除(相当于只对这些文件 drop caches，不需要 root)，
+然后对比直接启动(冷启动)和预读后再启动，从 posix_spawn 到子进程退出的耗时；
+同时用 mincore 统计启动前副本在页缓存中的比例，确认清除和预读确实生效。
+动态链接器被所有进程共享，不复制也不清除
+"""
+
+import argparse
+import ctypes
+import mmap
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Sequence
+
+from prefetch import prefetch_file, resolve_files
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.mmap.restype = ctypes.c_void_p
+_libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+_libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+_libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_char_p]
+_MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+def resident_pages(file_path: str) -> tuple:
+    """(在页缓存中的页数, 总页数)"""
+    size = os.path.getsize(file_path)
+    pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    if not pages:
+        return 0, 0
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        address = _libc.mmap(None, size, mmap.PROT_READ, mmap.MAP_SHARED, fd, 0)
+        if address in (None, _MAP_FAILED):
+            raise OSError(ctypes.get_errno(), "mmap 失败")
+        try:
+            vector = ctypes.create_string_buffer(pages)
+            if _libc.mincore(address, size, vector) != 0:
+                raise OSError(ctypes.get_errno(), "mincore 失败")
+            return sum(byte & 1 for byte in vector.raw), pages
+        finally:
+            _libc.munmap(address, size)
+    finally:
+        os.close(fd)
+
+
+def resident_fraction(files: Sequence[str]) -> float:
+    counts = [resident_pages(file_path) for file_path in files]
+    return sum(c[0] for c in counts) / max(1, sum(c[1] for c in counts))
+
+
+def drop_cache(files: Sequence[str]):
+    for file_path in files:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def make_test_binary(binary: str, base: str) -> str:
+    """复制可执行文件和依赖库(不含动态链接器)，返回副本路径"""
+    files = resolve_files(binary)
+    interpreter = {path for path in files if os.path.basename(path).startswith("ld-")}
+    os.makedirs(os.path.join(base, "bin"))
+    os.makedirs(os.path.join(base, "lib"))
+    copy = os.path.join(base, "bin", os.path.basename(files[0]))
+    for file_path in files:
+        if file_path in interpreter:
+            continue
+        target = copy if file_path == files[0] else os.path.join(base, "lib", os.path.basename(file_path))
+        shutil.copy2(file_path, target)
+        # 写回磁盘，脏页不能被 DONTNEED 清除
+        with open(target, 'rb+') as f:
+            os.fsync(f.fileno())
+    return copy
+
+
+def time_exec(argv: List[str], env) -> float:
+    start = time.perf_counter()
+    pid = os.posix_spawn(argv[0], argv, env,
+                         file_actions=[(os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0)])
+    os.waitpid(pid, 0)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--binary", default=os.path.realpath(sys.executable))
+    arg_parser.add_argument("--args", nargs="*", help="测试程序的参数，默认 Python 用 -c pass，其他用 --version")
+    arg_parser.add_argument("--rounds", type=int, default=10)
+    arg_parser.add_argument("--settle-ms", type=float, default=200,
+                            help="预读后等待的时间，相当于打开选择窗口到选定应用之间的间隔")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base:
+        copy = make_test_binary(args.binary, base)
+        env = dict(os.environ, LD_LIBRARY_PATH=os.path.join(base, "lib"))
+        if args.binary == os.path.realpath(sys.executable):
+            # 副本旁边没有标准库
+            env["PYTHONHOME"] = sys.base_prefix
+        extra = args.args if args.args is not None else \
+            (["-c", "pass"] if args.binary == os.path.realpath(sys.executable) else ["--version"])
+        argv = [copy, *extra]
+
+        os.environ["LD_LIBRARY_PATH"] = env["LD_LIBRARY_PATH"]
+        files = [path for path in resolve_files(copy) if path.startswith(base)]
+        size = sum(os.path.getsize(path) for path in files)
+        print(f"{os.path.basename(copy)}: {len(files)} 个文件, {size / 2**20:.1f}MiB, {args.rounds} 轮")
+
+        time_exec(argv, env)
+        warm = [time_exec(argv, env) for _ in range(args.rounds)]
+        cold, prefetched, advise = [], [], []
+        cold_resident, prefetched_resident = [], []
+        for _ in range(args.rounds):
+            drop_cache(files)
+            cold_resident.append(resident_fraction(files))
+            cold.append(time_exec(argv, env))
+
+            drop_cache(files)
+            start = time.perf_counter()
+            for file_path in files:
+                prefetch_file(file_path)
+            advise.append(time.perf_counter() - start)
+            time.sleep(args.settle_ms / 1000)
+            prefetched_resident.append(resident_fraction(files))
+            prefetched.append(time_exec(argv, env))
+
+        def report(name, samples, resident=None):
+            line = f"  {name:<10} 中位数 {statistics.median(samples) * 1e3:7.2f}ms  最大 {max(samples) * 1e3:7.2f}ms"
+            if resident is not None:
+                line += f"  启动前驻留 {statistics.fmean(resident) * 100:5.1f}%"
+            print(line)
+
+        report("页缓存命中", warm)
+        report("冷启动", cold, cold_resident)
+        report("预读后", prefetched, prefetched_resident)
+        report("预读调用", advise)
+
+
+if __name__ == "__main__":
+    main()
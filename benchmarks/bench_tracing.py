@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+追踪开销微基准测试
+对比按键钩子中每个事件的开销: 原来的 print + str.format(输出到 /dev/null 和管道)、
+追踪关闭时的级别检查、追踪开启时写入环形缓冲区
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import tracing
+
+KEY = "Key.alt_l"
+
+
+def _per_event(func, events):
+    start = time.perf_counter()
+    func(events)
+    return (time.perf_counter() - start) / events
+
+
+def bench_print(stream, events):
+    def run(n):
+        for _ in range(n):
+            print('特殊键： {} 被按下'.format(KEY), file=stream)
+    return _per_event(run, events)
+
+
+def bench_tracer(level, events):
+    tracer = tracing.Tracer(capacity=1 << 16, level=level, stream=open(os.devnull, "w"))
+    event_id = tracing.register_event("key.press")
+
+    def run(n):
+        for _ in range(n):
+            if tracer.level <= tracing.DEBUG:
+                tracer.emit(event_id, KEY)
+    return _per_event(run, events)
+
+
+def _pipe_stream():
+    """一端持续读取的管道，模拟 stdout 接到 journald 等管道"""
+    read_fd, write_fd = os.pipe()
+
+    def drain():
+        while os.read(read_fd, 65536):
+            pass
+
+    threading.Thread(target=drain, daemon=True).start()
+    return os.fdopen(write_fd, "w", buffering=1)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--events", type=int, default=200_000)
+    args = arg_parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        results = [("print /dev/null", bench_print(devnull, args.events))]
+    results.append(("print 管道(行缓冲)", bench_print(_pipe_stream(), args.events)))
+    results.append(("trace 关闭", bench_tracer(tracing.OFF, args.events)))
+    results.append(("trace 开启", bench_tracer(tracing.DEBUG, args.events)))
+    for name, per_event in results:
+        print(f"{name:<20} {per_event * 1e9:8.0f} ns/事件")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+使用记录基准测试
+写入一年的合成启动记录，测量加载快照+日志和 frecency 排序的耗时，以及磁盘占用
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from usage import UsageStore
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--per-day", type=int, default=50)
+    arg_parser.add_argument("--apps", type=int, default=60)
+    arg_parser.add_argument("--catalog", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(1)
+    names = [f"应用 {i}" for i in range(args.catalog)]
+    used = names[:args.apps]
+    weights = [1.0 / (i + 1) for i in range(args.apps)]
+    now = time.time()
+    launches = args.per_day * 365
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = UsageStore(directory)
+        start = time.perf_counter()
+        for i in range(launches):
+            timestamp = now - 365 * 86400 + i * (365 * 86400 / launches)
+            store.record(rng.choices(used, weights)[0], timestamp)
+        elapsed = time.perf_counter() - start
+        print(f"写入 {launches} 条记录: {elapsed * 1e6 / launches:.1f}us/条")
+
+        size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        print(f"磁盘占用: {size} 字节")
+
+        start = time.perf_counter()
+        store = UsageStore(directory)
+        print(f"加载: {(time.perf_counter() - start) * 1e3:.3f}ms ({len(store.apps)} 个应用)")
+
+        start = time.perf_counter()
+        ranked = store.rank(names)
+        print(f"排序 {len(names)} 项: {(time.perf_counter() - start) * 1e3:.3f}ms, 前三: {ranked[:3]}")
+
+
+if __name__ == "__main__":
+    main()
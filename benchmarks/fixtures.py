@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试数据
+在一个目录中生成配置文件、应用目录树和按键轨迹，供 suite 和单项基准测试共用
+"""
+
+import os
+from typing import Dict
+
+from benchmarks.bench_catalog import make_tree
+from benchmarks.bench_config import make_config
+from benchmarks.bench_fuzzy import make_names
+from benchmarks.keysource import make_key_trace, save_key_trace
+
+__all__ = ["make_config", "make_tree", "make_names", "make_key_trace", "make_fixtures"]
+
+
+def make_fixtures(base: str, config_lines: int = 100_000, desktop: int = 2000, executables: int = 3000,
+                  chords: int = 200) -> Dict[str, object]:
+    """在 base 中生成全部数据，返回各文件路径"""
+    config_path = os.path.join(base, "config.ccf")
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(make_config(config_lines))
+
+    desktop_roots, bin_dirs = make_tree(os.path.join(base, "catalog"), desktop, executables)
+
+    trace_path = os.path.join(base, "keys.trace")
+    save_key_trace(trace_path, make_key_trace(chords, interval=0.0005))
+
+    return {
+        "config": config_path,
+        "desktop_roots": desktop_roots,
+        "bin_dirs": bin_dirs,
+        "catalog_index": os.path.join(base, "catalog.json"),
+        "key_trace": trace_path,
+    }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟 pynput 的按键事件源
+回放按键轨迹(偏移秒数, press/release, 键名)，接口与 keyboard.Listener 相同(start/stop/join)，
+不需要 X 显示和 pynput。键名 "Key.alt_l" 表示特殊键，单个字符表示字符键
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+PRESS = "press"
+RELEASE = "release"
+
+# 默认的触发组合键
+TRIGGER_KEYS = ("Key.alt_l", "Key.alt_r")
+
+# (相对开始的秒数, press/release, 键名)
+Trace = List[Tuple[float, str, str]]
+
+
+class FakeKey:
+    """特殊键，与 pynput.keyboard.Key 一样没有 char 属性"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return f"Key.{self.name}"
+
+
+class FakeKeyCode:
+    """字符键"""
+
+    def __init__(self, char: str):
+        self.char = char
+
+    def __repr__(self):
+        return repr(self.char)
+
+
+_keys: Dict[str, object] = {}
+
+
+def key(name: str):
+    """同一个键名总是返回同一个对象，可以直接放进集合比较"""
+    obj = _keys.get(name)
+    if obj is None:
+        obj = _keys[name] = FakeKey(name[4:]) if name.startswith("Key.") else FakeKeyCode(name)
+    return obj
+
+
+def make_key_trace(chords: int, noise: int = 8, interval: float = 0.002, seed: int = 1,
+                   trigger_keys: Tuple[str, ...] = TRIGGER_KEYS) -> Trace:
+    """生成轨迹: 每次组合键之间夹杂若干普通按键"""
+    rng = random.Random(seed)
+    noise_keys = list("abcdefghijklmnopqrstuvwxyz") + ["Key.shift_l", "Key.ctrl_l", "Key.space"]
+    trace: Trace = []
+    t = 0.0
+    for _ in range(chords):
+        for _ in range(noise):
+            name = rng.choice(noise_keys)
+            trace.append((t, PRESS, name))
+            t += interval
+            trace.append((t, RELEASE, name))
+            t += interval
+        for name in trigger_keys:
+            trace.append((t, PRESS, name))
+            t += interval
+        for name in reversed(trigger_keys):
+            trace.append((t, RELEASE, name))
+            t += interval
+    return trace
+
+
+def save_key_trace(file_path: str, trace: Trace):
+    with open(file_path, "w", encoding="utf-8") as f:
+        for offset, action, name in trace:
+            f.write(f"{offset:.6f}\t{action}\t{name}\n")
+
+
+def load_key_trace(file_path: str) -> Trace:
+    trace: Trace = []
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            offset, action, name = line.rstrip("\n").split("\t", 2)
+            trace.append((float(offset), action, name))
+    return trace
+
+
+class KeyReplay:
+    """在后台线程中按轨迹调用 on_press/on_release
+
+    realtime 为真时按轨迹中的时间间隔回放，否则尽快回放；
+    before_event(动作, 键) 在每个事件分发前调用，可用于记录时间戳
+    """
+
+    def __init__(self, trace: Trace, on_press: Callable, on_release: Callable, realtime: bool = False,
+                 before_event: Optional[Callable[[str, object], None]] = None):
+        self.events = [(offset, action, key(name)) for offset, action, name in trace]
+        self.on_press = on_press
+        self.on_release = on_release
+        self.realtime = realtime
+        self.before_event = before_event
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="key-replay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        start = time.perf_counter()
+        for offset, action, event_key in self.events:
+            if self._stop.is_set():
+                return
+            if self.realtime:
+                delay = start + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if self.before_event is not None:
+                self.before_event(action, event_key)
+            (self.on_press if action == PRESS else self.on_release)(event_key)
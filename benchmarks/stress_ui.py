@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面命令队列压力测试
+多个线程同时向 UiLoop 提交数千个 show/hide/refresh 命令，检查:
+所有命令都被执行或合并、处理函数只在界面线程中运行、事件循环不崩溃，
+并报告提交到执行的延迟。没有 X 显示时使用 tkinter 替身:
+
+    python -m benchmarks.stress_ui --threads 32 --posts 2000
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from benchmarks.suite import _choose_tk, _percentile
+
+
+def run(threads: int, posts: int, items: int):
+    from select_window import MaterialSelectWindow
+    from ui import HIDE, REFRESH, SHOW, UiLoop
+
+    names = [f"应用 {i}" for i in range(items)]
+    window = MaterialSelectWindow(names, None, "stress", persistent=True)
+    ui_loop = UiLoop(window.root)
+    ui_thread = threading.get_ident()
+    wrong_thread = [0]
+    latencies = []
+
+    def check_thread():
+        if threading.get_ident() != ui_thread:
+            wrong_thread[0] += 1
+
+    def show(posted_at):
+        check_thread()
+        latencies.append(time.perf_counter() - posted_at)
+        if not window.visible:
+            window.present(names)
+
+    def hide():
+        check_thread()
+        window.hide()
+
+    def refresh():
+        check_thread()
+        if window.visible:
+            window.set_items(names)
+
+    ui_loop.register(SHOW, show, coalesce=True)
+    ui_loop.register(HIDE, hide, coalesce=True)
+    ui_loop.register(REFRESH, refresh, coalesce=True)
+
+    barrier = threading.Barrier(threads)
+
+    def producer(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(posts):
+            choice = rng.random()
+            if choice < 0.7:
+                ui_loop.post(SHOW, time.perf_counter())
+            elif choice < 0.85:
+                ui_loop.post(HIDE)
+            else:
+                ui_loop.post(REFRESH)
+
+    finished = []
+
+    def coordinator():
+        workers = [threading.Thread(target=producer, args=(i,), daemon=True) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        ui_loop.call(lambda: (finished.append(time.perf_counter()), window.root.quit()))
+
+    start = time.perf_counter()
+    threading.Thread(target=coordinator, daemon=True).start()
+    window.root.mainloop()
+    elapsed = (finished[0] if finished else time.perf_counter()) - start
+
+    total = threads * posts
+    # 最后的 call 也计入 executed
+    handled = ui_loop.executed - 1 + ui_loop.coalesced
+    print(f"{threads} 个线程 x {posts} 次提交 = {total} 个命令, {elapsed * 1e3:.1f}ms "
+          f"({total / elapsed:,.0f} 个/秒)")
+    print(f"  执行 {ui_loop.executed - 1}, 合并 {ui_loop.coalesced}, 非界面线程执行 {wrong_thread[0]}")
+    if latencies:
+        print(f"  show 提交到执行: p50 {_percentile(latencies, 0.5) * 1e3:.2f}ms "
+              f"p99 {_percentile(latencies, 0.99) * 1e3:.2f}ms max {max(latencies) * 1e3:.2f}ms")
+    ui_loop.close()
+    window.root.destroy()
+    return handled == total and not wrong_thread[0]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tk", choices=["auto", "stub", "real"], default="auto")
+    arg_parser.add_argument("--threads", type=int, default=16)
+    arg_parser.add_argument("--posts", type=int, default=1000, help="每个线程提交的命令数")
+    arg_parser.add_argument("--items", type=int, default=100)
+    args = arg_parser.parse_args()
+
+    print(f"Tk: {_choose_tk(args.tk)}")
+    if not run(args.threads, args.posts, args.items):
+        print("失败: 有命令丢失或在其他线程中执行")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
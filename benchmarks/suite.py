@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无显示基准测试套件
+生成配置、应用目录和按键轨迹，依次测量组合键检测延迟、配置解析吞吐量、应用目录加载、
+选择窗口创建和导航、进程启动耗时，结果输出为 JSON，可以与之前提交的结果对比:
+
+    python -m benchmarks.suite --output after.json --compare before.json
+
+没有 X 显示时选择窗口使用 tkinter 替身(benchmarks/tkstub.py)，只测量 Python 部分的开销
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.fixtures import make_fixtures, make_names
+from benchmarks.keysource import PRESS, TRIGGER_KEYS, KeyReplay, key, load_key_trace
+
+# 结果: 名称 -> {"value": 数值, "unit": 单位, "better": "lower" 或 "higher"}
+Results = Dict[str, Dict[str, object]]
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def _add(results: Results, name: str, value: float, unit: str, better: str = "lower"):
+    results[name] = {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def _best(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_chord(results: Results, fixtures, realtime: bool = True):
+    """回放按键轨迹，测量最后一个触发键按下到分发线程唤醒的延迟"""
+    from hotkey import ChordDetector
+
+    trace = load_key_trace(fixtures["key_trace"])
+    trigger_event = threading.Event()
+    pressed_at = [0.0]
+    fired_at: List[float] = []
+    samples: List[float] = []
+    done = threading.Event()
+
+    def before_event(action, _key):
+        if action == PRESS:
+            pressed_at[0] = time.perf_counter()
+
+    def on_trigger():
+        fired_at.append(pressed_at[0])
+        trigger_event.set()
+
+    def dispatcher():
+        while not done.is_set():
+            if trigger_event.wait(0.1):
+                samples.append(time.perf_counter() - fired_at[-1])
+                trigger_event.clear()
+
+    detector = ChordDetector([key(name) for name in TRIGGER_KEYS], on_trigger)
+    thread = threading.Thread(target=dispatcher, daemon=True)
+    thread.start()
+    replay = KeyReplay(trace, detector.on_press, detector.on_release, realtime=realtime,
+                       before_event=before_event)
+    replay.start()
+    replay.join()
+    time.sleep(0.05)
+    done.set()
+    thread.join()
+    _add(results, "chord.dispatch_p50", _percentile(samples, 0.5) * 1e6, "us")
+    _add(results, "chord.dispatch_p99", _percentile(samples, 0.99) * 1e6, "us")
+
+    # 单个事件的回调开销: 不带时间间隔尽快回放
+    detector = ChordDetector(detector.trigger_keys, lambda: None)
+    events = [(action, key(name)) for _, action, name in trace]
+
+    def replay_all():
+        for action, event_key in events:
+            (detector.on_press if action == PRESS else detector.on_release)(event_key)
+
+    _add(results, "chord.callback", _best(replay_all, 3) / len(events) * 1e9, "ns")
+
+
+def bench_config(results: Results, fixtures, repeat: int):
+    from config import CustomConfigParser
+
+    path = fixtures["config"]
+    size_mb = os.path.getsize(path) / 1e6
+    parse = _best(lambda: CustomConfigParser().parse_file(path, snapshot=False), repeat)
+    _add(results, "config.parse_throughput", size_mb / parse, "MB/s", "higher")
+    _add(results, "config.parse", parse * 1e3, "ms")
+
+    # 让快照脱离"刚修改过"的窗口，之后的加载直接使用快照
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10_000_000_000))
+    CustomConfigParser().parse_file(path)
+    _add(results, "config.snapshot_load", _best(lambda: CustomConfigParser().parse_file(path), repeat) * 1e3, "ms")
+
+
+def bench_catalog(results: Results, fixtures):
+    from catalog import AppCatalog
+
+    def load(force):
+        catalog = AppCatalog(desktop=True, executables=True, desktop_roots=fixtures["desktop_roots"],
+                             executable_dirs=fixtures["bin_dirs"], index_path=fixtures["catalog_index"])
+        start = time.perf_counter()
+        catalog.load(force=force)
+        return time.perf_counter() - start
+
+    _add(results, "catalog.cold", load(True) * 1e3, "ms")
+    _add(results, "catalog.warm", min(load(False) for _ in range(3)) * 1e3, "ms")
+
+
+def bench_picker(results: Results, sizes: List[int], moves: int = 200):
+    from fuzzy import FuzzyIndex
+    from select_window import MaterialSelectWindow
+
+    for count in sizes:
+        items = make_names(count)
+        start = time.perf_counter()
+        window = MaterialSelectWindow(items, None, "bench", persistent=True)
+        _add(results, f"picker.build_{count}", (time.perf_counter() - start) * 1e3, "ms")
+
+        start = time.perf_counter()
+        for _ in range(moves):
+            window.move_down()
+        for _ in range(moves):
+            window.move_up()
+        _add(results, f"picker.navigate_{count}", (time.perf_counter() - start) / (2 * moves) * 1e6, "us")
+
+        # 与 main 相同，索引在后台构建(这里直接计时)，按使用记录重新排序后复用已有的表
+        start = time.perf_counter()
+        index = FuzzyIndex(items)
+        _add(results, f"picker.index_build_{count}", (time.perf_counter() - start) * 1e3, "ms")
+        ranked = items[count // 2:count // 2 + 20] + items[:count // 2] + items[count // 2 + 20:]
+        start = time.perf_counter()
+        index = index.reordered(ranked)
+        _add(results, f"picker.index_reorder_{count}", (time.perf_counter() - start) * 1e3, "ms")
+        window.set_items(ranked, index)
+
+        # 逐字符输入一个名称
+        query = items[len(items) // 2][:6].lower()
+        samples = []
+        for i in range(1, len(query) + 1):
+            start = time.perf_counter()
+            window.set_query(query[:i])
+            samples.append(time.perf_counter() - start)
+        _add(results, f"picker.first_keystroke_{count}", samples[0] * 1e3, "ms")
+        _add(results, f"picker.keystroke_{count}", statistics.median(samples[1:]) * 1e3, "ms")
+        window.root.destroy()
+
+
+def bench_launch(results: Results, rounds: int, command: str = "true"):
+    from launcher import Launcher
+
+    launcher = Launcher()
+    launcher.prepare(command)
+    samples = []
+    for _ in range(rounds):
+        launcher.launch(command)
+        samples.append(launcher.last_spawn_time)
+    _add(results, "launch.spawn_p50", _percentile(samples, 0.5) * 1e6, "us")
+    _add(results, "launch.spawn_p99", _percentile(samples, 0.99) * 1e6, "us")
+
+
+def _choose_tk(mode: str) -> str:
+    """决定使用真实 Tk 还是替身，必须在导入 select_window 之前调用"""
+    if mode == "auto":
+        mode = "real" if os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY") else "stub"
+    if mode == "real":
+        try:
+            import tkinter
+            tkinter.Tk().destroy()
+        except Exception as e:
+            print(f"无法使用真实 Tk ({e})，改用替身", file=sys.stderr)
+            mode = "stub"
+    if mode == "stub":
+        from benchmarks import tkstub
+        tkstub.install()
+    return mode
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """打印与基线的对比，返回超过阈值的退化项数"""
+    regressions = 0
+    print(f"{'指标':<32} {'基线':>12} {'当前':>12} {'变化':>8}", file=sys.stderr)
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None or not old["value"]:
+            print(f"{name:<32} {'-':>12} {result['value']:>12} {'新增':>8}", file=sys.stderr)
+            continue
+        change = result["value"] / old["value"] - 1
+        worse = change > threshold if result["better"] == "lower" else change < -threshold
+        regressions += worse
+        mark = "  退化" if worse else ""
+        print(f"{name:<32} {old['value']:>12} {result['value']:>12} {change * 100:+7.1f}%{mark}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tk", choices=["auto", "stub", "real"], default="auto")
+    arg_parser.add_argument("--config-lines", type=int, default=100_000)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 10_000, 100_000])
+    arg_parser.add_argument("--chords", type=int, default=200)
+    arg_parser.add_argument("--launches", type=int, default=100)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--output", help="结果 JSON 写入此文件(默认输出到标准输出)")
+    arg_parser.add_argument("--compare", help="与之前的结果 JSON 对比")
+    arg_parser.add_argument("--threshold", type=float, default=0.10, help="对比时视为退化的变化比例")
+    args = arg_parser.parse_args()
+
+    tk_mode = _choose_tk(args.tk)
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as base:
+        # 应用目录索引写入临时目录，不影响真实缓存
+        os.environ["XDG_CACHE_HOME"] = os.path.join(base, "cache")
+        fixtures = make_fixtures(base, config_lines=args.config_lines, chords=args.chords)
+        for name, run in (("chord", lambda: bench_chord(results, fixtures)),
+                          ("config", lambda: bench_config(results, fixtures, args.repeat)),
+                          ("catalog", lambda: bench_catalog(results, fixtures)),
+                          ("picker", lambda: bench_picker(results, args.sizes)),
+                          ("launch", lambda: bench_launch(results, args.launches))):
+            start = time.perf_counter()
+            run()
+            print(f"{name} 完成 ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tk": tk_mode,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无显示环境下的 tkinter 替身
+只实现 select_window 用到的接口，所有绘制操作都是空操作，
+用于测量选择窗口自身 Python 代码的开销(不含 Tk/X11 的绘制时间)。
+install() 必须在导入 select_window 之前调用
+"""
+
+import select
+import sys
+import types
+from typing import Callable, Dict, List
+
+
+READABLE = 2
+
+
+class _TkApp:
+    """Tcl 解释器替身，只支持文件处理函数"""
+
+    def __init__(self):
+        self.file_handlers: Dict[int, Callable] = {}
+
+    def createfilehandler(self, fd, mask, func):
+        self.file_handlers[fd] = func
+
+    def deletefilehandler(self, fd):
+        self.file_handlers.pop(fd, None)
+
+
+class _Event:
+    def __init__(self, widget, **fields):
+        self.widget = widget
+        self.char = ""
+        self.state = 0
+        self.__dict__.update(fields)
+
+
+class Misc:
+    """所有控件的公共部分"""
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options: Dict[str, object] = dict(options)
+        self.bindings: Dict[str, Callable] = {}
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def cget(self, key):
+        return self.options.get(key)
+
+    def pack(self, **options):
+        pass
+
+    def pack_forget(self):
+        pass
+
+    def bind(self, sequence, func=None, add=None):
+        self.bindings[sequence] = func
+
+    def unbind(self, sequence, funcid=None):
+        self.bindings.pop(sequence, None)
+
+    def focus_set(self):
+        pass
+
+    def focus_force(self):
+        pass
+
+    def event_generate(self, sequence, **fields):
+        """同步调用绑定的处理函数"""
+        handler = self.bindings.get(sequence)
+        if handler is not None:
+            handler(_Event(self, **fields))
+
+
+class Tk(Misc):
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.tk = _TkApp()
+        self._idle: List[Callable] = []
+        self._running = False
+        # 与 Tk 相同: 新建的窗口在第一次空闲时映射，之前调用了 withdraw() 的不映射
+        self._mapped = True
+        self.after_idle(self._map)
+
+    def title(self, text=None):
+        pass
+
+    def geometry(self, spec=None):
+        pass
+
+    def protocol(self, name=None, func=None):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def update(self):
+        self._run_idle()
+
+    def withdraw(self):
+        self._mapped = False
+
+    def deiconify(self):
+        if not self._mapped:
+            self._mapped = True
+            self.after_idle(self._map)
+
+    def _map(self):
+        if self._mapped:
+            self.event_generate("<Map>")
+
+    def lift(self):
+        pass
+
+    def after_idle(self, func, *args):
+        self._idle.append(lambda: func(*args))
+
+    def after(self, ms, func=None, *args):
+        # 替身没有定时器，按空闲回调处理
+        if func is not None:
+            self.after_idle(func, *args)
+
+    def _run_idle(self):
+        while self._idle:
+            self._idle.pop(0)()
+
+    def mainloop(self, n=0):
+        """执行排队的回调和文件处理函数直到 quit()；两者都没有时直接返回，避免空转"""
+        self._running = True
+        while self._running:
+            if self._idle:
+                self._idle.pop(0)()
+                continue
+            handlers = self.tk.file_handlers
+            if not handlers:
+                break
+            ready, _, _ = select.select(list(handlers), [], [])
+            for fd in ready:
+                handler = handlers.get(fd)
+                if handler is not None and self._running:
+                    handler(fd, READABLE)
+        self._running = False
+
+    def quit(self):
+        self._running = False
+
+    def destroy(self):
+        self._running = False
+        self._idle.clear()
+
+
+class Button(Misc):
+    pass
+
+
+class TclError(Exception):
+    pass
+
+
+class PhotoImage:
+    """只记录尺寸和来源，不解码"""
+
+    def __init__(self, name=None, cnf=None, master=None, **options):
+        self.options = options
+
+    def width(self):
+        return self.options.get("width", 0)
+
+    def height(self):
+        return self.options.get("height", 0)
+
+
+class Style:
+    def __init__(self, master=None):
+        self.styles: Dict[str, dict] = {}
+
+    def configure(self, style, **options):
+        self.styles.setdefault(style, {}).update(options)
+
+
+class Frame(Misc):
+    pass
+
+
+class Label(Misc):
+    pass
+
+
+def install():
+    """用替身替换 tkinter 和 tkinter.ttk"""
+    tk_module = types.ModuleType("tkinter")
+    tk_module.Tk = Tk
+    tk_module.Button = Button
+    tk_module.Misc = Misc
+    tk_module.PhotoImage = PhotoImage
+    tk_module.TclError = TclError
+    tk_module.READABLE = READABLE
+    ttk_module = types.ModuleType("tkinter.ttk")
+    ttk_module.Style = Style
+    ttk_module.Frame = Frame
+    ttk_module.Label = Label
+    tk_module.ttk = ttk_module
+    sys.modules["tkinter"] = tk_module
+    sys.modules["tkinter.ttk"] = ttk_module
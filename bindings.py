@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用快捷键
+每个应用可以绑定一个组合键或按顺序输入的多个组合键，例如 "alt_l+space, e"。
+所有绑定编译为一棵以组合键(按键的 frozenset)为边的前缀树，按键回调中每个事件只做常数次集合和字典操作，
+与绑定数量无关；序列中两次按键间隔超过超时时间时重新开始匹配
+"""
+
+import time
+from itertools import combinations
+from typing import Callable, Dict, FrozenSet, Hashable, List, Mapping, Optional
+
+Chord = FrozenSet[Hashable]
+
+# 加号和逗号是快捷键语法的一部分，这两个键本身用名称表示
+_KEY_ALIASES = {"plus": "+", "comma": ","}
+
+
+def parse_binding(text: str) -> List[List[str]]:
+    """把 "ctrl+alt+t, e" 解析为 [["ctrl", "alt", "t"], ["e"]]"""
+    steps = []
+    for step in text.split(","):
+        names = [name.strip() for name in step.split("+")]
+        if not all(names):
+            raise ValueError(f"无效的快捷键: {text!r}")
+        steps.append([_KEY_ALIASES.get(name, name) for name in names])
+    return steps
+
+
+class BindingNode:
+    """前缀树节点，编译完成后不再修改"""
+
+    __slots__ = ("children", "partial", "action", "path")
+
+    def __init__(self, path: str = ""):
+        self.children: Dict[Chord, "BindingNode"] = {}
+        # 子节点组合键的真子集: 正在按下组合键的过程中，不算匹配失败
+        self.partial = set()
+        self.action: Optional[str] = None
+        self.path = path
+
+
+def compile_bindings(bindings: Mapping[str, str], resolve: Callable[[str], Hashable]) -> BindingNode:
+    """编译 {快捷键: 应用名}，resolve 把键名转换为按键对象"""
+    root = BindingNode()
+    for text, action in bindings.items():
+        node = root
+        for step in parse_binding(text):
+            chord = frozenset(resolve(name) for name in step)
+            child = node.children.get(chord)
+            if child is None:
+                child = node.children[chord] = BindingNode(f"{node.path}, {'+'.join(step)}".lstrip(", "))
+                for size in range(1, len(chord)):
+                    node.partial.update(frozenset(keys) for keys in combinations(chord, size))
+            node = child
+            if node.action is not None:
+                raise ValueError(f"快捷键 {text!r} 以 {node.path!r} ({node.action}) 开头")
+        if node.children:
+            raise ValueError(f"快捷键 {text!r} 是其他快捷键的前缀")
+        node.action = action
+    return root
+
+
+class SequenceMatcher:
+    """按键事件驱动的快捷键匹配
+
+    按下一个键后，当前按住的全部键组成的组合键与当前节点的子节点比较:
+    完全相同则前进一步，到达叶子时调用 on_action(应用名) 并回到根；
+    是某个子节点的一部分则继续等待；否则从根重新匹配。只在监听线程中调用
+    """
+
+    def __init__(self, root: BindingNode, on_action: Callable[[str], None], timeout: float = 1.0):
+        self.root = root
+        self.on_action = on_action
+        self.timeout = timeout
+        self.pressed = set()
+        self.node = root
+        # 当前序列的超时时刻(monotonic)
+        self.deadline = 0.0
+
+    def set_root(self, root: BindingNode, timeout: Optional[float] = None):
+        """换用重新编译的绑定，进行中的序列作废"""
+        self.root = self.node = root
+        if timeout is not None:
+            self.timeout = timeout
+
+    def on_press(self, key) -> Optional[str]:
+        """处理按下事件，返回本次触发的应用名"""
+        if key in self.pressed:
+            return None
+        self.pressed.add(key)
+        node = self.node
+        if node is not self.root and time.monotonic() > self.deadline:
+            node = self.node = self.root
+        chord = frozenset(self.pressed)
+        child = node.children.get(chord)
+        if child is None:
+            if chord in node.partial:
+                return None
+            if node is self.root:
+                return None
+            # 匹配失败，这次按键可能是新序列的开始
+            node = self.node = self.root
+            child = node.children.get(chord)
+            if child is None:
+                return None
+        if child.action is not None:
+            self.node = self.root
+            self.on_action(child.action)
+            return child.action
+        self.node = child
+        self.deadline = time.monotonic() + self.timeout
+        return None
+
+    def on_release(self, key):
+        self.pressed.discard(key)
+
+    def reset(self):
+        self.pressed.clear()
+        self.node = self.root
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用目录
+扫描 XDG .desktop 文件和 $PATH 中的可执行文件，结果按目录 mtime 缓存到磁盘索引，
+之后启动时只重新读取发生变化的目录
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from paths import atomic_write, cache_dir
+
+# 条目的生成规则变化时加 1，旧索引整体重建
+INDEX_VERSION = 2
+DESKTOP = "desktop"
+EXECUTABLE = "path"
+
+# Exec 中的字段代码，启动器不传文件参数，全部去掉；%% 是转义的 %，需要在同一遍替换中处理
+_FIELD_CODE = re.compile(r"%(%|[fFuUdDnNickvm])")
+
+
+def desktop_dirs() -> List[str]:
+    """按优先级排列的 applications 目录"""
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    return [os.path.join(base, "applications") for base in [data_home] + data_dirs.split(":") if base]
+
+
+def path_dirs() -> List[str]:
+    """$PATH 中的目录，去重并保持顺序"""
+    return list(dict.fromkeys(d for d in os.environ.get("PATH", "").split(os.pathsep) if d))
+
+
+def _locale_keys(key: str) -> List[str]:
+    """本地化键名，例如 Name[zh_CN]、Name[zh]、Name"""
+    lang = os.environ.get("LC_ALL") or os.environ.get("LC_MESSAGES") or os.environ.get("LANG") or ""
+    lang = lang.split(".", 1)[0].split("@", 1)[0]
+    keys = []
+    if lang and lang != "C":
+        keys.append(f"{key}[{lang}]")
+        if "_" in lang:
+            keys.append(f"{key}[{lang.split('_', 1)[0]}]")
+    keys.append(key)
+    return keys
+
+
+def parse_desktop_file(file_path: str) -> Optional[Dict[str, str]]:
+    """解析 .desktop 文件的 [Desktop Entry] 段"""
+    fields = {}
+    in_entry = False
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('['):
+                    if in_entry:
+                        break
+                    in_entry = line == "[Desktop Entry]"
+                    continue
+                if in_entry and '=' in line:
+                    key, value = line.split('=', 1)
+                    fields[key.strip()] = value.strip()
+    except OSError:
+        return None
+    return fields
+
+
+def _desktop_entry(desktop_id: str, fields: Dict[str, str]) -> list:
+    """把 .desktop 字段转换为索引条目 [id, 名称, 命令, 图标, 是否隐藏]"""
+    hidden = fields.get("Hidden") == "true" or fields.get("NoDisplay") == "true"
+    if fields.get("Type", "Application") != "Application":
+        hidden = True
+    name = next((fields[k] for k in _locale_keys("Name") if fields.get(k)), "")
+    command = _FIELD_CODE.sub(lambda m: "%" if m.group(1) == "%" else "", fields.get("Exec", "")).strip()
+    if not name or not command:
+        hidden = True
+    return [desktop_id, name, command, fields.get("Icon", ""), hidden]
+
+
+def scan_desktop_dir(directory: str, root: str) -> Tuple[List[list], List[str]]:
+    """扫描一个 applications 目录，返回条目和子目录(子目录作为独立目录索引)"""
+    entries = []
+    subdirs = []
+    prefix = os.path.relpath(directory, root).replace(os.sep, "-") + "-" if directory != root else ""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir():
+                subdirs.append(entry.path)
+            elif entry.name.endswith(".desktop") and entry.is_file():
+                fields = parse_desktop_file(entry.path)
+                if fields is not None:
+                    entries.append(_desktop_entry(prefix + entry.name, fields))
+    entries.sort()
+    subdirs.sort()
+    return entries, subdirs
+
+
+def scan_path_dir(directory: str) -> List[list]:
+    """扫描一个 $PATH 目录中的可执行文件"""
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                if entry.is_file() and os.access(entry.path, os.X_OK):
+                    entries.append([entry.name, entry.name, entry.name, "", False])
+            except OSError:
+                continue
+    return entries
+
+
+class AppCatalog:
+    """带持久化索引的应用目录"""
+
+    def __init__(self, desktop: bool = True, executables: bool = False,
+                 desktop_roots: Optional[List[str]] = None, executable_dirs: Optional[List[str]] = None,
+                 index_path: Optional[str] = None):
+        if desktop_roots is None:
+            desktop_roots = desktop_dirs()
+        if executable_dirs is None:
+            executable_dirs = path_dirs()
+        self.desktop_roots = desktop_roots if desktop else []
+        self.executable_dirs = executable_dirs if executables else []
+        self.index_path = index_path or os.path.join(cache_dir(), "catalog.json")
+        self.index: Dict[str, dict] = {}
+        # 最近一次 load 重新扫描的目录数
+        self.rescanned = 0
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("dirs", {})
+
+    def _save_index(self):
+        data = json.dumps({"version": INDEX_VERSION, "dirs": self.index}, ensure_ascii=False,
+                          separators=(",", ":"))
+        try:
+            atomic_write(self.index_path, data.encode('utf-8'))
+        except OSError as e:
+            print(f"无法保存应用索引: {e}")
+
+    def _refresh_dir(self, old_index: dict, directory: str, kind: str, root: str = "") -> Optional[dict]:
+        """目录 mtime 未变时沿用旧记录，否则重新扫描"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        cached = old_index.get(directory)
+        if cached and cached["mtime"] == mtime and cached["kind"] == kind:
+            self.index[directory] = cached
+            return cached
+        try:
+            if kind == DESKTOP:
+                entries, subdirs = scan_desktop_dir(directory, root)
+            else:
+                entries, subdirs = scan_path_dir(directory), []
+        except OSError:
+            return None
+        record = {"mtime": mtime, "kind": kind, "entries": entries, "subdirs": subdirs}
+        self.index[directory] = record
+        self.rescanned += 1
+        return record
+
+    def load(self, force: bool = False) -> Dict[str, str]:
+        """加载目录，返回 {名称: 命令}
+
+        目录的 mtime 只在增删、重命名文件时变化，原地修改的 .desktop 文件需要 force=True 才会重新读取
+        """
+        old_index = {} if force else self._load_index()
+        self.index = {}
+        self.rescanned = 0
+        for root in self.desktop_roots:
+            pending = [root]
+            while pending:
+                directory = pending.pop(0)
+                if directory in self.index:
+                    # 符号链接造成的重复目录
+                    continue
+                record = self._refresh_dir(old_index, directory, DESKTOP, root)
+                if record:
+                    pending.extend(record["subdirs"])
+        for directory in self.executable_dirs:
+            self._refresh_dir(old_index, directory, EXECUTABLE)
+
+        if self.rescanned or list(old_index) != list(self.index):
+            self._save_index()
+        return self.apps()
+
+    def apps(self) -> Dict[str, str]:
+        """按 XDG 优先级合并条目: 同一 desktop id 以先出现的为准，隐藏条目会屏蔽后面的同 id 条目"""
+        result: Dict[str, str] = {}
+        seen_ids = set()
+        for kind in (DESKTOP, EXECUTABLE):
+            for data in self.index.values():
+                if data["kind"] != kind:
+                    continue
+                for entry_id, name, command, _icon, hidden in data["entries"]:
+                    key = (kind, entry_id)
+                    if key in seen_ids:
+                        continue
+                    seen_ids.add(key)
+                    if not hidden and name not in result:
+                        result[name] = command
+        return result
+
+    def icons(self) -> Dict[str, str]:
+        """{名称: 图标名或路径}"""
+        result = {}
+        for data in self.index.values():
+            for _entry_id, name, _command, icon, hidden in data["entries"]:
+                if icon and not hidden and name not in result:
+                    result[name] = icon
+        return result
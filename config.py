@@ -5,8 +5,76 @@
 采用独特的配置格式，与主流格式不兼容
 """
 
+import hashlib
+import marshal
+import mmap
+import os
 import re
-from typing import Dict, Any, Union
+import struct
+import time
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+from expr_eval import evaluate
+from paths import atomic_write
+
+_KEY_PATTERN = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+# 段名中含有这些字符时，写出的段定义行会被解析成另一个段名
+_BAD_SECTION_PATTERN = re.compile(r'[\]\r\n]')
+# 一行: 注释、段定义或键值对，解析和 ConfigDocument 共用；
+# 合法键名和值前面的空白在匹配时就处理掉，不合法的键名落入 bad_key
+_SCAN_PATTERN = re.compile(r'^[^\S\n]*(?:##|\[(?P<section>.*)\][^\S\n]*$|'
+                           r'(?:(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)[^\S\n]*|(?P<bad_key>[^=\n]*))=[^\S\n]*(?P<value>.*))',
+                           re.M)
+_INT_PATTERN = re.compile(r'-?\d+')
+_FLOAT_PATTERN = re.compile(r'-?\d+\.\d+')
+_STRING_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"', re.S)
+_ESCAPE_PATTERN = re.compile(r'\\(.)', re.S)
+# 嵌套结构中的裸值一直延续到 , ] } 为止；遇到引号和括号时需要单独处理
+_BARE_CHUNK_PATTERN = re.compile(r'[^,\]}()"]*')
+_WHITESPACE_PATTERN = re.compile(r'\s*')
+# 列表元素/字典值的快速路径: 引号字符串或不含括号引号的裸值，后接分隔符(或行尾)
+_ITEM_PATTERN = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|([^\s,\[\]{}()"]+(?:\s+[^\s,\[\]{}()"]+)*))?\s*([,\]}]|\Z)?',
+                           re.S)
+_DICT_KEY_PATTERN = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"\s*|([^:,}"]*))([:,}]|\Z)?', re.S)
+# 不含嵌套的列表/字典(绝大多数情况)整体校验后用 findall 一次取出所有元素
+_FLAT_ITEM = r'\s*(?:("(?:[^"\\]|\\.)*")|([^\s,\[\]{}()"]+(?:\s+[^\s,\[\]{}()"]+)*))?\s*'
+_FLAT_KEY = r'\s*(?:("(?:[^"\\]|\\.)*")|([^\s:,\[\]{}()"]+(?:\s+[^\s:,\[\]{}()"]+)*))\s*:'
+_FLAT_LIST_ITEMS_PATTERN = re.compile(rf'{_FLAT_ITEM}[,\]]', re.S)
+_FLAT_DICT_ITEMS_PATTERN = re.compile(rf'(?:{_FLAT_KEY}{_FLAT_ITEM}|\s*)[,}}]', re.S)
+# 校验用的版本，与上面相同但不含捕获组
+_FLAT_ITEM_NC = r'\s*(?:"(?:[^"\\]|\\.)*"|[^\s,\[\]{}()"]+(?:\s+[^\s,\[\]{}()"]+)*)?\s*'
+_FLAT_KEY_NC = r'\s*(?:"(?:[^"\\]|\\.)*"|[^\s:,\[\]{}()"]+(?:\s+[^\s:,\[\]{}()"]+)*)\s*:'
+_FLAT_LIST_PATTERN = re.compile(rf'\[(?:{_FLAT_ITEM_NC},)*{_FLAT_ITEM_NC}\]', re.S)
+_FLAT_DICT_PATTERN = re.compile(
+    rf'\{{(?:(?:{_FLAT_KEY_NC}{_FLAT_ITEM_NC}|\s*),)*(?:{_FLAT_KEY_NC}{_FLAT_ITEM_NC}|\s*)\}}', re.S)
+# 惰性模式下只扫描段定义行，记录字节偏移
+_SECTION_HEADER_PATTERN = re.compile(rb'^[^\S\n]*\[(.*)\][^\S\n]*$', re.M)
+# 写入时含有这些字符的字符串需要加引号
+_QUOTE_CHARS_PATTERN = re.compile(r'[\s",\[\]{}():]')
+
+# 快照文件头: 魔数(含格式版本), 源文件大小, 源文件 mtime_ns, 源文件内容哈希；
+# 后面是 marshal 后的 (解析结果, 段中表达式值的 [段, 键, 段, 键, ...], 嵌套的表达式值的路径列表)
+# 解析规则变化时需要修改魔数，让旧快照失效
+_SNAPSHOT_MAGIC = b'CCFSNAP3'
+_SNAPSHOT_HEADER = struct.Struct('<8sQq16s')
+# 源文件 mtime 与快照写入时间相差不到这个值时，同一时间戳内可能又被修改过，需要核对哈希
+_RACY_WINDOW_NS = 2_000_000_000
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+_MISSING = object()
+_NUMBER_START = frozenset('-0123456789')
+_BOOLEANS = {'yes': True, 'true': True, 'on': True, 'no': False, 'false': False, 'off': False}
+
+
+class Expr(str):
+    """expr: 前缀的值，内容是去掉前缀的表达式文本；get_expr 只对这种值求值"""
+    __slots__ = ()
+
+
+def _unescape(match) -> str:
+    char = match.group(1)
+    return _ESCAPES.get(char, '\\' + char)
 
 
 class CustomConfigParser:
@@ -15,129 +83,398 @@ class CustomConfigParser:
     def __init__(self):
         self.config = {}
 
-    def parse_file(self, file_path: str) -> Dict[str, Any]:
-        """解析配置文件"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    def parse_file(self, file_path: str, snapshot: bool = True, lazy: bool = False) -> Dict[str, Any]:
+        """解析配置文件
+
+        snapshot 为真时在源文件旁边保存解析结果的二进制快照(.文件名.snap)，
+        源文件未变化时直接加载快照，不再解析文本。
+        lazy 为真时只映射文件并建立段索引，返回只读的 LazySections，每个段第一次访问时才解析
+        """
+        if lazy:
+            self.config = LazySections(self, file_path)
+            return self.config
+        if not snapshot:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return self.parse_string(f.read())
+
+        stat = os.stat(file_path)
+        snapshot_path = self.snapshot_path(file_path)
+        header, payload, snapshot_mtime = self._read_snapshot(snapshot_path)
+        if header and header[1] == stat.st_size and header[2] == stat.st_mtime_ns \
+                and snapshot_mtime - stat.st_mtime_ns >= _RACY_WINDOW_NS:
+            # 大小和 mtime 都没变，并且快照写入时源文件已经稳定
+            config = self._load_payload(payload)
+            if config is not None:
+                self.config = config
+                return config
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        config = self._load_payload(payload) if header and header[3] == digest else None
+        if config is not None:
+            # 只是 mtime 变了(touch、检出等)，内容相同
+            self.config = config
+        else:
+            self.parse_string(data.decode('utf-8'))
+            payload = self._dump_payload(self.config)
+        self._write_snapshot(snapshot_path, stat, digest, payload)
+        return self.config
 
-        return self.parse_string(content)
+    @staticmethod
+    def snapshot_path(file_path: str) -> str:
+        """配置文件对应的快照路径"""
+        directory, name = os.path.split(file_path)
+        return os.path.join(directory, f".{name}.snap")
+
+    @staticmethod
+    def _read_snapshot(snapshot_path: str) -> Tuple[Optional[tuple], memoryview, int]:
+        """读取快照，返回 (文件头, 数据, 快照 mtime_ns)；不存在或格式不符时文件头为 None"""
+        try:
+            with open(snapshot_path, 'rb') as f:
+                snapshot_mtime = os.fstat(f.fileno()).st_mtime_ns
+                data = f.read()
+        except OSError:
+            return None, memoryview(b''), 0
+        if len(data) < _SNAPSHOT_HEADER.size:
+            return None, memoryview(b''), 0
+        header = _SNAPSHOT_HEADER.unpack_from(data)
+        if header[0] != _SNAPSHOT_MAGIC:
+            return None, memoryview(b''), 0
+        return header, memoryview(data)[_SNAPSHOT_HEADER.size:], snapshot_mtime
+
+    @staticmethod
+    def _dump_payload(config: Dict[str, Any]) -> bytes:
+        """序列化解析结果；marshal 不支持 Expr，表达式换成普通字符串，位置单独记录"""
+        try:
+            # 没有表达式值时不需要复制
+            return marshal.dumps((config, [], []))
+        except ValueError:
+            pass
+        # 绝大多数表达式直接是段中的值，只记录段和键，载入时不用逐层查找
+        section_exprs = []
+        nested_paths = []
+
+        def plain(value, path):
+            if isinstance(value, Expr):
+                if len(path) == 2:
+                    section_exprs.extend(path)
+                else:
+                    nested_paths.append(path)
+                return str(value)
+            if isinstance(value, dict):
+                return {k: plain(v, path + (k,)) for k, v in value.items()}
+            if isinstance(value, list):
+                return [plain(v, path + (i,)) for i, v in enumerate(value)]
+            return value
+
+        return marshal.dumps((plain(config, ()), section_exprs, nested_paths))
+
+    @staticmethod
+    def _load_payload(payload) -> Optional[Dict[str, Any]]:
+        """反序列化快照数据并恢复表达式值，损坏时返回 None"""
+        try:
+            config, section_exprs, nested_paths = marshal.loads(payload)
+            if not isinstance(config, dict):
+                return None
+            names = iter(section_exprs)
+            for section, key in zip(names, names):
+                items = config[section]
+                items[key] = Expr(items[key])
+            for path in nested_paths:
+                container = config
+                for step in path[:-1]:
+                    container = container[step]
+                container[path[-1]] = Expr(container[path[-1]])
+        except (EOFError, ValueError, TypeError, LookupError):
+            return None
+        return config
+
+    @staticmethod
+    def _write_snapshot(snapshot_path: str, stat: os.stat_result, digest: bytes, payload: bytes):
+        header = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, stat.st_size, stat.st_mtime_ns, digest)
+        try:
+            atomic_write(snapshot_path, header + payload)
+        except OSError as e:
+            # 配置目录只读时每次都重新解析
+            print(f"无法保存配置快照: {e}")
 
     def parse_string(self, content: str) -> Dict[str, Any]:
-        """解析配置字符串"""
+        """解析配置字符串
+
+        整个文本由一个编译好的行模式单遍扫描，空行、注释和无法解析的行不会产生匹配；
+        行号只在出错时根据偏移量计算
+        """
         self.config = {}
-        lines = content.strip().split('\n')
+        self._scan(content, self.config)
+        return self.config
 
-        current_section = None
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
+    def _scan(self, content: str, sections: Dict[str, Any], current_section: Optional[dict] = None,
+              first_line: int = 1):
+        """扫描文本，段写入 sections，段定义之前的键值对写入 current_section
 
-            # 跳过空行和注释
-            if not line or line.startswith('##'):
-                continue
+        first_line 为 content 第一行在文件中的行号，用于错误信息
+        """
+        for match in _SCAN_PATTERN.finditer(content):
+            section, key, value = match.group('section', 'key', 'value')
 
             # 解析段定义: [SECTION_NAME]
-            if line.startswith('[') and line.endswith(']'):
-                current_section = line[1:-1]
-                self.config[current_section] = {}
-                continue
-
-            # 解析键值对
-            if '=' in line:
-                key, value = self._parse_key_value(line)
-                if current_section is None:
-                    raise ValueError(f"第{line_num}行: 必须在段内定义键值对")
-
-                self.config[current_section][key] = value
-            else:
-                # 忽略无法解析的行，而不是抛出错误
+            if section is not None:
+                current_section = sections[section] = {}
                 continue
 
-        return self.config
+            if key is None:
+                # 跳过注释
+                if value is None:
+                    continue
+                # 键名格式已由行模式验证，没有匹配上的是无效键名
+                line = self._line_number(content, match) + first_line - 1
+                raise ValueError(f"第{line}行: 无效的键名: {match.group('bad_key').strip()}")
+            if current_section is None:
+                line = self._line_number(content, match) + first_line - 1
+                raise ValueError(f"第{line}行: 必须在段内定义键值对")
 
-    def _parse_key_value(self, line: str) -> tuple:
-        """解析键值对"""
-        parts = line.split('=', 1)
-        key = parts[0].strip()
-        value = parts[1].strip()
-
-        # 验证键名格式
-        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', key):
-            raise ValueError(f"无效的键名: {key}")
+            current_section[key] = self._parse_value(value.rstrip())
 
-        # 根据值的格式进行解析
-        return key, self._parse_value(value)
+    @staticmethod
+    def _line_number(content: str, match) -> int:
+        return content.count('\n', 0, match.start()) + 1
 
     def _parse_value(self, value: str) -> Union[str, int, float, bool, list, dict]:
-        """解析不同类型的值"""
-        # 字符串值 (有引号)
-        if value.startswith('"') and value.endswith('"'):
-            return value[1:-1].replace('\\n', '\n').replace('\\t', '\t').replace('\\"', '"')
+        """解析不同类型的值
+
+        字符串、列表和字典由 _read_value 逐字符扫描，支持转义和任意嵌套；
+        引号或括号没有闭合、结构后面还有多余内容时整体作为普通字符串，与旧版行为一致
+        """
+        if value and value[0] in '"[{':
+            if value[0] == '"':
+                match = _STRING_PATTERN.fullmatch(value)
+                if match is not None:
+                    return self._unescape(match.group(1))
+            elif value[0] == '[' and _FLAT_LIST_PATTERN.fullmatch(value):
+                convert = self._convert_flat
+                return [item for item in (convert(q, b) for q, b in _FLAT_LIST_ITEMS_PATTERN.findall(value, 1))
+                        if item is not _MISSING]
+            elif value[0] == '{' and _FLAT_DICT_PATTERN.fullmatch(value):
+                return self._flat_dict(value)
+            try:
+                result, pos = self._read_value(value, 0)
+            except ValueError:
+                pos = -1
+            if pos == len(value):
+                return result
+        return self._parse_scalar(value)
+
+    @staticmethod
+    def _parse_scalar(text: str) -> Union[str, int, float, bool]:
+        """解析不带引号的标量"""
+        if not text:
+            return text
+        first = text[0]
+        # 整数值 / 小数值
+        if first in _NUMBER_START:
+            if _INT_PATTERN.fullmatch(text):
+                return int(text)
+            if _FLOAT_PATTERN.fullmatch(text):
+                return float(text)
 
-        # 整数值
-        if re.match(r'^\d+$', value):
-            return int(value)
+        # 布尔值
+        if len(text) <= 5:
+            boolean = _BOOLEANS.get(text.lower())
+            if boolean is not None:
+                return boolean
+
+        # 路径值 / 表达式值 (包含特殊前缀)，表达式不求值，标记为 Expr，使用时由 get_expr 求值
+        if text[4:5] == ':':
+            if text[:5] == 'path:':
+                return text[5:]
+            if text[:5] == 'expr:':
+                return Expr(text[5:])
 
-        # 小数值
-        if re.match(r'^\d+\.\d+$', value):
-            return float(value)
+        # 默认作为字符串
+        return text
 
-        # 布尔值
-        if value.lower() in ['yes', 'true', 'on']:
-            return True
-        if value.lower() in ['no', 'false', 'off']:
-            return False
+    def _read_value(self, text: str, pos: int) -> Tuple[Any, int]:
+        """从 pos 开始读取一个值，返回 (值, 结束位置)"""
+        pos = _WHITESPACE_PATTERN.match(text, pos).end()
+        char = text[pos] if pos < len(text) else ''
+
+        # 字符串值 (有引号)
+        if char == '"':
+            match = _STRING_PATTERN.match(text, pos)
+            if match is None:
+                raise ValueError(f"字符串缺少结束引号: {text[pos:]}")
+            return self._unescape(match.group(1)), match.end()
 
         # 列表值 [item1, item2, item3]
-        if value.startswith('[') and value.endswith(']'):
-            items = value[1:-1].split(',')
-            return [self._parse_value(item.strip()) for item in items if item.strip()]
+        if char == '[':
+            return self._read_list(text, pos + 1)
 
         # 字典值 {key1: value1, key2: value2}
-        if value.startswith('{') and value.endswith('}'):
-            items = value[1:-1].split(',')
-            result = {}
-            for item in items:
-                if ':' in item:
-                    k, v = item.split(':', 1)
-                    result[k.strip()] = self._parse_value(v.strip())
-            return result
-
-        # 路径值 (包含特殊前缀)
-        if value.startswith('path:'):
-            return value[5:]
-
-        # 表达式值 (包含特殊前缀)
-        if value.startswith('expr:'):
-            return value[5:]  # 原样返回，使用时再解析
+        if char == '{':
+            return self._read_dict(text, pos + 1)
+
+        end = self._scan_bare(text, pos)
+        return self._parse_scalar(text[pos:end].strip()), end
+
+    def _convert_flat(self, quoted: str, bare: str) -> Any:
+        """findall 取出的 (引号字符串, 裸值) 转换为值"""
+        if quoted:
+            return self._unescape(quoted[1:-1])
+        if bare:
+            return self._parse_scalar(bare)
+        return _MISSING
+
+    def _flat_dict(self, value: str) -> dict:
+        result = {}
+        convert = self._convert_flat
+        for quoted_key, bare_key, quoted, bare in _FLAT_DICT_ITEMS_PATTERN.findall(value, 1):
+            if quoted_key or bare_key:
+                item = convert(quoted, bare)
+                result[self._unescape(quoted_key[1:-1]) if quoted_key else bare_key] = '' if item is _MISSING else item
+        return result
+
+    @staticmethod
+    def _unescape(text: str) -> str:
+        return _ESCAPE_PATTERN.sub(_unescape, text) if '\\' in text else text
+
+    def _read_item(self, text: str, pos: int, closing: str) -> Tuple[Any, int, str]:
+        """读取列表元素或字典值以及其后的分隔符，返回 (值, 结束位置, 分隔符)
+
+        元素为空时值为 _MISSING；分隔符为 ',' 或结束括号
+        """
+        match = _ITEM_PATTERN.match(text, pos)
+        separator = match.group(3)
+        if separator is not None:
+            # 快速路径: 引号字符串或简单裸值，后面紧跟分隔符
+            if separator == '':
+                kind = "列表" if closing == ']' else "字典"
+                raise ValueError(f"{kind}缺少结束的 {closing}")
+            if separator != ',' and separator != closing:
+                raise ValueError(f"值的第{match.end()}个字符: 意外的 {separator!r}")
+            string, bare = match.group(1), match.group(2)
+            if string is not None:
+                value = self._unescape(string)
+            elif bare is not None:
+                value = self._parse_scalar(bare)
+            else:
+                value = _MISSING
+            return value, match.end(), separator
+
+        # 嵌套结构，或者裸值中含有括号、引号
+        value, pos = self._read_value(text, pos)
+        pos = _WHITESPACE_PATTERN.match(text, pos).end()
+        if pos >= len(text):
+            kind = "列表" if closing == ']' else "字典"
+            raise ValueError(f"{kind}缺少结束的 {closing}")
+        separator = text[pos]
+        if separator != ',' and separator != closing:
+            raise ValueError(f"值的第{pos + 1}个字符: 意外的 {separator!r}")
+        return value, pos + 1, separator
+
+    def _read_list(self, text: str, pos: int) -> Tuple[list, int]:
+        result = []
+        while True:
+            item, pos, separator = self._read_item(text, pos, ']')
+            # 空元素忽略
+            if item is not _MISSING:
+                result.append(item)
+            if separator == ']':
+                return result, pos
+
+    def _read_dict(self, text: str, pos: int) -> Tuple[dict, int]:
+        result = {}
+        while True:
+            match = _DICT_KEY_PATTERN.match(text, pos)
+            separator = match.group(3)
+            pos = match.end()
+            if separator == ':':
+                string = match.group(1)
+                key = self._unescape(string) if string is not None else match.group(2).strip()
+                value, pos, separator = self._read_item(text, pos, '}')
+                result[key] = '' if value is _MISSING else value
+            elif not separator:
+                if pos < len(text) and text[pos] == '"':
+                    raise ValueError(f"字符串缺少结束引号: {text[pos:]}")
+                raise ValueError("字典缺少结束的 }")
+            # 没有冒号的元素忽略
+            if separator == '}':
+                return result, pos
+
+    @staticmethod
+    def _scan_bare(text: str, pos: int) -> int:
+        """扫描嵌套结构中的裸值，括号和引号内的逗号不作为分隔符"""
+        depth = 0
+        length = len(text)
+        while True:
+            pos = _BARE_CHUNK_PATTERN.match(text, pos).end()
+            if pos >= length:
+                return pos
+            char = text[pos]
+            if char == '"':
+                match = _STRING_PATTERN.match(text, pos)
+                pos = match.end() if match else length
+            elif char == '(':
+                depth += 1
+                pos += 1
+            elif char == ')':
+                depth = max(depth - 1, 0)
+                pos += 1
+            elif depth:
+                pos += 1
+            else:
+                return pos
 
-        # 默认作为字符串
-        return value
+    def iter_entries(self) -> Iterator[Tuple[str, str, Any]]:
+        """逐条产出 (段, 键, 值)；惰性模式下按文件顺序逐段解析，不保留已产出的段"""
+        if isinstance(self.config, LazySections):
+            yield from self.config.iter_entries()
+            return
+        for section, items in self.config.items():
+            for key, value in items.items():
+                yield section, key, value
 
     def get(self, section: str, key: str, default=None):
         """获取配置值"""
         return self.config.get(section, {}).get(key, default)
 
+    def get_expr(self, section: str, key: str, symbols: Optional[Mapping[str, Any]] = None, default=None):
+        """获取 expr: 值并求值，名称从 symbols 中查找(见 expr_eval)；其他值(包括普通字符串)原样返回"""
+        value = self.get(section, key, _MISSING)
+        if value is _MISSING:
+            return default
+        if isinstance(value, Expr):
+            return evaluate(value, symbols)
+        return value
+
     def get_section(self, section: str, default=None):
         """获取整个段"""
         return self.config.get(section, default or {})
 
     def write_config(self, file_path: str, config_dict: Dict[str, Any]):
-        """写入配置文件"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for section, items in config_dict.items():
-                f.write(f"[{section}]\n")
-                for key, value in items.items():
-                    formatted_value = self._format_value(value)
-                    f.write(f"{key} = {formatted_value}\n")
-                f.write("\n")
+        """写入配置文件
+
+        整个文件在内存中生成后一次写入临时文件再重命名，写到一半崩溃不会损坏原文件；
+        只修改个别键并保留注释时使用 ConfigDocument
+        """
+        parts = []
+        for section, items in config_dict.items():
+            parts.append(f"[{section}]\n")
+            for key, value in items.items():
+                parts.append(f"{key} = {self._format_value(value)}\n")
+            parts.append("\n")
+        atomic_write(file_path, "".join(parts).encode('utf-8'))
 
     def _format_value(self, value: Any) -> str:
         """格式化值为配置格式"""
+        if isinstance(value, Expr):
+            if '\n' in value or '\r' in value:
+                raise ValueError(f"表达式不能包含换行: {value!r}")
+            return 'expr:' + value
         if isinstance(value, str):
-            # 检查是否需要引号
-            if ' ' in value or '\n' in value or '\t' in value or '"' in value:
-                escaped = value.replace('\n', '\\n').replace('\t', '\\t').replace('"', '\\"')
-                return f'"{escaped}"'
+            # 检查是否需要引号: 含空白或结构字符，或者不加引号会被解析成其他类型
+            if not value or _QUOTE_CHARS_PATTERN.search(value) or self._parse_scalar(value) is not value:
+                return self._quote(value)
             return value
         elif isinstance(value, bool):
             return 'yes' if value else 'no'
@@ -147,11 +484,316 @@ class CustomConfigParser:
             items = [self._format_value(item) for item in value]
             return f"[{', '.join(items)}]"
         elif isinstance(value, dict):
-            items = [f"{k}: {self._format_value(v)}" for k, v in value.items()]
+            items = [f"{self._quote(k) if _QUOTE_CHARS_PATTERN.search(k) else k}: {self._format_value(v)}"
+                     for k, v in value.items()]
             return f"{{{', '.join(items)}}}"
         else:
             return str(value)
 
+    @staticmethod
+    def _quote(value: str) -> str:
+        escaped = value.replace('\\', '\\\\').replace('\n', '\\n').replace('\t', '\\t').replace('\r', '\\r')
+        return '"' + escaped.replace('"', '\\"') + '"'
+
+
+class LazySections(Mapping):
+    """惰性解析的配置段
+
+    打开时用 mmap 映射文件，一次扫描记录每个段定义行的字节偏移，段的内容在第一次访问时才解析并缓存。
+    同名的段以最后一个为准，与完整解析一致；语法错误只在访问到出错的段时才会报告。
+    映射期间源文件不能被原地截断(先写临时文件再重命名替换不受影响)
+    """
+
+    def __init__(self, parser: CustomConfigParser, file_path: str):
+        self.parser = parser
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # 空文件不能映射
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        # 按文件顺序排列的 (段名, 内容起始偏移, 内容结束偏移)
+        self._spans: List[Tuple[str, int, int]] = []
+        # 第一个段定义行之前的部分，只能有注释和空行
+        self._preamble_end = len(self._data)
+        previous = None
+        for match in _SECTION_HEADER_PATTERN.finditer(self._data):
+            if previous is not None:
+                self._spans.append((previous[0], previous[1], match.start()))
+            else:
+                self._preamble_end = match.start()
+            previous = (match.group(1).decode('utf-8'), match.end())
+        if previous is not None:
+            self._spans.append((previous[0], previous[1], len(self._data)))
+        self._index = {name: (start, end) for name, start, end in self._spans}
+        self._parsed: Dict[str, dict] = {}
+
+    def __getitem__(self, section: str) -> dict:
+        parsed = self._parsed.get(section)
+        if parsed is None:
+            start, end = self._index[section]
+            parsed = self._parsed[section] = self._parse_span(start, end)
+        return parsed
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, section) -> bool:
+        return section in self._index
+
+    def _parse_span(self, start: int, end: int) -> dict:
+        items: dict = {}
+        try:
+            self.parser._scan(self._data[start:end].decode('utf-8'), {}, items)
+        except ValueError as e:
+            # 行号只在出错时计算，需要加上段在文件中的起始行
+            first_line = self._data[:start].count(b'\n') + 1
+            raise ValueError(self._shift_line(str(e), first_line)) from None
+        return items
+
+    @staticmethod
+    def _shift_line(message: str, first_line: int) -> str:
+        match = re.match(r'第(\d+)行: ', message)
+        if match is None:
+            return message
+        return f"第{int(match.group(1)) + first_line - 1}行: {message[match.end():]}"
+
+    def iter_entries(self) -> Iterator[Tuple[str, str, Any]]:
+        """按文件顺序逐段解析并产出 (段, 键, 值)，已缓存的段直接使用
+
+        与完整解析一致: 被后面同名段覆盖的段不产出，段定义之前的键值对报错
+        """
+        self.parser._scan(self._data[:self._preamble_end].decode('utf-8'), {})
+        for name, start, end in self._spans:
+            if self._index[name] != (start, end):
+                continue
+            items = self._parsed.get(name)
+            if items is None:
+                items = self._parse_span(start, end)
+            for key, value in items.items():
+                yield name, key, value
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+
+class ConfigDocument:
+    """保留原文的可编辑配置
+
+    记住每个键值在原文中的位置，set() 只替换对应的值(或在段末插入一行)，
+    注释、空行、键的顺序和其他值的写法都保持不变；save() 一次写入临时文件后重命名
+    """
+
+    def __init__(self, text: str = "", file_path: Optional[str] = None):
+        self.text = text
+        self.file_path = file_path
+        self.parser = CustomConfigParser()
+        self.dirty = False
+        # 插入的行沿用原文第一行的换行符
+        first = text.find('\n')
+        self.newline = '\r\n' if first > 0 and text[first - 1] == '\r' else '\n'
+        # 段名 -> [插入位置]: 段内最后一个键值行(或段定义行)之后
+        self._sections: Dict[str, List[int]] = {}
+        # (段名, 键) -> [值起始, 值结束]，不含值两侧的空白
+        self._entries: Dict[Tuple[str, str], List[int]] = {}
+        self._index()
+
+    @classmethod
+    def load(cls, file_path: str) -> "ConfigDocument":
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            return cls(f.read(), file_path)
+
+    def _line_end(self, pos: int) -> int:
+        """pos 所在行的下一行开头"""
+        newline = self.text.find('\n', pos)
+        return len(self.text) if newline < 0 else newline + 1
+
+    def _index(self):
+        self._sections.clear()
+        self._entries.clear()
+        current = None
+        for match in _SCAN_PATTERN.finditer(self.text):
+            section, key, value = match.group('section', 'key', 'value')
+            if section is not None:
+                current = section
+                if section in self._sections:
+                    # 同名的段以最后一个为准，与解析结果一致
+                    for entry in [entry for entry in self._entries if entry[0] == section]:
+                        del self._entries[entry]
+                self._sections[section] = [self._line_end(match.end())]
+                continue
+            # 注释、无效的键名(完整解析时报错)和段定义之前的行不建索引
+            if key is None or current is None:
+                continue
+            start = match.start('value')
+            end = start + len(value.rstrip())
+            if start == end:
+                # 空值的位置放在行尾的 \r 之前，替换时不会拆开 \r\n
+                while start > match.start() and self.text[start - 1] == '\r':
+                    start -= 1
+                end = start
+            self._entries[(current, key)] = [start, end]
+            self._sections[current][0] = self._line_end(match.end())
+
+    def _splice(self, start: int, end: int, replacement: str):
+        """替换 text[start:end]，并平移位于其后的所有位置"""
+        self.text = self.text[:start] + replacement + self.text[end:]
+        delta = len(replacement) - (end - start)
+        if delta:
+            for offsets in list(self._entries.values()) + list(self._sections.values()):
+                for i, offset in enumerate(offsets):
+                    if offset >= end:
+                        offsets[i] = offset + delta
+        self.dirty = True
+
+    def get(self, section: str, key: str, default=None):
+        span = self._entries.get((section, key))
+        if span is None:
+            return default
+        return self.parser._parse_value(self.text[span[0]:span[1]])
+
+    def set(self, section: str, key: str, value: Any):
+        """设置值: 已有的键原地替换，新键追加到段末，新段追加到文件末尾"""
+        if not _KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"无效的键名: {key}")
+        if _BAD_SECTION_PATTERN.search(section):
+            raise ValueError(f"无效的段名: {section!r}")
+        formatted = self.parser._format_value(value)
+        span = self._entries.get((section, key))
+        if span is not None:
+            start, end = span
+            if self.text[start:end] != formatted:
+                # 原来的值为空时 = 后面可能没有空格
+                separator = " " if start == end and self.text[start - 1] == '=' else ""
+                self._splice(start, end, separator + formatted)
+                # 空值的起始位置等于结束位置，也被 _splice 平移了，重新设置
+                span[0] = start + len(separator)
+                span[1] = span[0] + len(formatted)
+            return
+
+        newline = self.newline
+        if section not in self._sections:
+            prefix = "" if not self.text or self.text.endswith(newline * 2) else \
+                newline if self.text.endswith("\n") else newline * 2
+            header = f"{prefix}[{section}]{newline}"
+            self._splice(len(self.text), len(self.text), header)
+            self._sections[section] = [len(self.text)]
+
+        insert_at = self._sections[section][0]
+        line = f"{key} = {formatted}{newline}"
+        if insert_at > 0 and self.text[insert_at - 1] != "\n":
+            # 段的最后一行是文件末尾且没有换行
+            line = newline + line
+        self._splice(insert_at, insert_at, line)
+        end = insert_at + len(line) - len(newline)
+        self._entries[(section, key)] = [end - len(formatted), end]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """完整解析当前文本"""
+        return self.parser.parse_string(self.text)
+
+    def save(self, file_path: Optional[str] = None):
+        """写入临时文件后重命名替换；没有修改并且写回原文件时不做任何事"""
+        file_path = file_path or self.file_path
+        if file_path is None:
+            raise ValueError("没有指定保存路径")
+        if not self.dirty and file_path == self.file_path:
+            return
+        atomic_write(file_path, self.text.encode('utf-8'))
+        self.file_path = file_path
+        self.dirty = False
+
+
+def merge_config(layers) -> Dict[str, Any]:
+    """按顺序合并多份配置: 同名段合并，同名键以后面的为准，两边都是字典的值递归合并，列表整体替换
+
+    不修改输入的配置，只复制被合并到的字典
+    """
+    merged: Dict[str, Any] = {}
+    # 合并过程中新建的字典，可以原地修改；其他字典属于输入，修改前先复制
+    owned = set()
+
+    def merge_into(target: dict, source: dict):
+        for key, value in source.items():
+            old = target.get(key)
+            if isinstance(value, dict) and isinstance(old, dict):
+                if id(old) not in owned:
+                    old = target[key] = dict(old)
+                    owned.add(id(old))
+                merge_into(old, value)
+            else:
+                target[key] = value
+
+    for layer in layers:
+        for section, items in layer.items():
+            existing = merged.get(section)
+            if existing is None:
+                existing = merged[section] = dict(items)
+                owned.add(id(existing))
+            else:
+                merge_into(existing, items)
+    return merged
+
+
+class DropInConfig:
+    """主配置文件加上 drop-in 目录(config.ccf 对应 config.d)中的 *.ccf 片段
+
+    片段按文件名排序，依次合并在主配置之后(见 merge_config)。每个文件的解析结果按 (inode, 大小, mtime_ns)
+    缓存在内存中，重新加载时只解析变化的文件，然后重新合并；未变化但进程刚启动的文件由磁盘快照加速
+    """
+
+    SUFFIX = ".ccf"
+
+    def __init__(self, file_path: str, drop_in_dir: Optional[str] = None, snapshot: bool = True):
+        self.file_path = file_path
+        self.drop_in_dir = drop_in_dir if drop_in_dir is not None else os.path.splitext(file_path)[0] + ".d"
+        self.snapshot = snapshot
+        # 文件路径 -> ((inode, 大小, mtime_ns) 或 None, 解析结果)
+        self._cache: Dict[str, Tuple[Optional[Tuple[int, int, int]], Dict[str, Any]]] = {}
+        # 最近一次 load 实际解析的文件数
+        self.reparsed = 0
+
+    def files(self) -> List[str]:
+        """主配置文件和排好序的片段；片段目录不存在时只有主配置文件"""
+        try:
+            names = sorted(name for name in os.listdir(self.drop_in_dir)
+                           if name.endswith(self.SUFFIX) and not name.startswith('.'))
+        except FileNotFoundError:
+            names = []
+        return [self.file_path] + [os.path.join(self.drop_in_dir, name) for name in names]
+
+    def _parse(self, file_path: str) -> Tuple[Optional[Tuple[int, int, int]], Dict[str, Any]]:
+        stat = os.stat(file_path)
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._cache.get(file_path)
+        if cached is not None and cached[0] == key:
+            return cached
+        try:
+            config = CustomConfigParser().parse_file(file_path, snapshot=self.snapshot)
+        except ValueError as e:
+            raise ValueError(f"{file_path}: {e}")
+        self.reparsed += 1
+        if time.time_ns() - stat.st_mtime_ns < _RACY_WINDOW_NS:
+            # 刚修改过的文件在同一个 mtime 内可能再次被修改，不记录 key，下次仍然重新解析
+            return None, config
+        return key, config
+
+    def load(self) -> Dict[str, Any]:
+        """重新检查所有文件并返回合并后的配置；出错时不修改缓存"""
+        self.reparsed = 0
+        cache = {}
+        layers = []
+        for file_path in self.files():
+            key, config = self._parse(file_path)
+            cache[file_path] = (key, config)
+            layers.append(config)
+        merged = merge_config(layers)
+        self._cache = cache
+        return merged
+
 
 def load_config(file_path: str) -> Dict[str, Any]:
     """快捷函数：加载配置文件"""
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单实例控制接口
+守护进程在 Unix 域套接字上接受一行文本命令(show、hide、launch <名称>、reload、stats)，
+回复以 "ok" 或 "error <原因>" 开头，随后是可选的正文，回复完即关闭连接。
+日常使用 tools/perflaunchctl(C 编写，不需要启动 Python)；本模块也可以作为客户端: python control.py show
+"""
+
+import fcntl
+import os
+import socket
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+from paths import runtime_dir, socket_path
+
+# 单条命令的最大长度
+MAX_REQUEST = 4096
+# 客户端发送命令的超时时间(秒)，防止卡住的客户端占用服务线程
+CLIENT_TIMEOUT = 1.0
+
+# 处理函数接收命令参数(可能为空字符串)，返回回复正文；抛出 ValueError 时回复 error
+Handler = Callable[[str], str]
+
+
+class AlreadyRunning(Exception):
+    """已经有一个实例在运行"""
+
+
+def acquire_instance_lock() -> int:
+    """获取单实例锁，返回锁文件描述符(需要在进程生命周期内保持打开)"""
+    fd = os.open(os.path.join(runtime_dir(), "instance.lock"), os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        raise AlreadyRunning() from None
+    return fd
+
+
+class ControlServer:
+    """在后台线程中处理控制命令"""
+
+    def __init__(self, handlers: Dict[str, Handler], path: Optional[str] = None):
+        self.handlers = handlers
+        self.path = path or socket_path()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """绑定套接字并开始服务，调用前应已持有单实例锁，残留的旧套接字直接删除"""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self._sock.listen(16)
+        self._thread = threading.Thread(target=self._serve, name="control", daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                continue
+            with conn:
+                self._handle(conn)
+
+    def _handle(self, conn: socket.socket):
+        conn.settimeout(CLIENT_TIMEOUT)
+        try:
+            request = self._read_request(conn)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"控制命令读取失败: {e}")
+            return
+        command, _, argument = request.strip().partition(' ')
+        handler = self.handlers.get(command)
+        if handler is None:
+            reply = f"error 未知命令: {command}\n"
+        else:
+            try:
+                body = handler(argument.strip())
+                reply = "ok\n" + (body + "\n" if body else "")
+            except ValueError as e:
+                reply = f"error {e}\n"
+        try:
+            conn.sendall(reply.encode('utf-8'))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _read_request(conn: socket.socket) -> str:
+        """读取一行命令(客户端也可以不带换行直接关闭写端)"""
+        data = b''
+        while b'\n' not in data and len(data) < MAX_REQUEST:
+            chunk = conn.recv(MAX_REQUEST)
+            if not chunk:
+                break
+            data += chunk
+        return data.split(b'\n', 1)[0].decode('utf-8')
+
+
+def send_command(command: str, path: Optional[str] = None, timeout: float = 5.0) -> str:
+    """向守护进程发送命令，返回完整回复；守护进程未运行时抛出 OSError"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path or socket_path())
+        sock.sendall(command.encode('utf-8') + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b''.join(chunks).decode('utf-8')
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: control.py show | hide | launch <名称> | reload | stats", file=sys.stderr)
+        sys.exit(2)
+    try:
+        reply = send_command(" ".join(sys.argv[1:]))
+    except OSError as e:
+        print(f"无法连接 perflaunch: {e}", file=sys.stderr)
+        sys.exit(1)
+    status, _, body = reply.partition('\n')
+    if body:
+        sys.stdout.write(body)
+    if status != "ok":
+        print(status, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
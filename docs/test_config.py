@@ -4,7 +4,8 @@
 测试自定义配置文件解析器
 """
 
-from config import CustomConfigParser, load_config
+from config import CustomConfigParser, Expr, load_config
+from expr_eval import compile_expr, evaluate
 
 
 def test_parser():
@@ -114,9 +115,90 @@ mixed_list = ["string", 123, yes, {nested: value}]
             print(f"  {key} = {repr(value)} ({type(value).__name__})")
 
 
+def test_value_syntax():
+    """测试值的语法: 引号内的逗号、嵌套、转义，以及不完整的值"""
+    print("\n" + "="*50)
+    print("=== 测试6: 值的语法 ===")
+
+    cases = [
+        # 引号内的逗号、冒号和括号不是分隔符
+        ('["a,b", "c"]', ["a,b", "c"]),
+        ('{"k,1": "v:1", k2: "[x]"}', {"k,1": "v:1", "k2": "[x]"}),
+        # 嵌套结构
+        ('[[1, 2], {a: [3, {b: no}]}, []]', [[1, 2], {"a": [3, {"b": False}]}, []]),
+        ('{cmd: run(a, b), n: -1.5}', {"cmd": "run(a, b)", "n": -1.5}),
+        # 转义
+        (r'"tab\there \"q\" back\\slash"', 'tab\there "q" back\\slash'),
+        (r'["a\"b", "c\nd"]', ['a"b', 'c\nd']),
+        (r'"\x"', '\\x'),
+        # 引号或括号没有闭合、结构后面有多余内容时整体作为字符串
+        ('"abc', '"abc'),
+        ('[1, 2', '[1, 2'),
+        ('{a: [1, 2}', '{a: [1, 2}'),
+        ('["a", "b]', '["a", "b]'),
+        ('[1] x', '[1] x'),
+    ]
+    parser = CustomConfigParser()
+    for text, expected in cases:
+        value = parser.parse_string(f"[s]\nv = {text}\n")["s"]["v"]
+        assert value == expected, f"{text}: 期望 {expected!r}，实际 {value!r}"
+        print(f"  {text} -> {value!r}")
+
+    # 键名和段外的键值对仍然报错
+    for text, message in [("[s]\n1x = 1\n", "第2行: 无效的键名: 1x"),
+                          ("x = 1\n[s]\n", "第1行: 必须在段内定义键值对")]:
+        try:
+            parser.parse_string(text)
+        except ValueError as e:
+            assert str(e) == message, f"期望错误 {message!r}，实际 {e}"
+            print(f"  {text!r} -> {e}")
+        else:
+            raise AssertionError(f"{text!r} 应该报错")
+
+
+def test_expressions():
+    """测试 expr: 值的求值和表达式白名单"""
+    print("\n" + "="*50)
+    print("=== 测试7: 表达式 ===")
+
+    parser = CustomConfigParser()
+    parser.parse_string('[s]\ntotal = expr:base * 2 + len(items)\n'
+                        'log = path:/tmp\nname = "CCF"\nquoted = "expr:1 + 1"\nnested = [expr:base]\n')
+    symbols = {"base": 20, "items": [1, 2], "len": len}
+    # 只对 expr: 值求值，路径和普通字符串(包括引号中的 "expr:")原样返回
+    for key, expected in [("total", 42), ("log", "/tmp"), ("name", "CCF"), ("quoted", "expr:1 + 1"),
+                          ("missing", None)]:
+        value = parser.get_expr("s", key, symbols)
+        assert value == expected, f"{key}: 期望 {expected!r}，实际 {value!r}"
+        print(f"  {key} -> {value!r}")
+    assert isinstance(parser.get("s", "nested")[0], Expr)
+
+    # 白名单之外的语法在编译时就被拒绝，不会执行
+    for source in ["x.__class__", "().__class__.__bases__[0].__subclasses__()", "__import__('os')",
+                   "name.upper()", "x.pop()", "len.__call__(x)",
+                   "[i for i in x]", "{i: i for i in x}", "(i for i in x)",
+                   "lambda: 1", "(lambda: 1)()", "f'{x.__class__}'"]:
+        try:
+            compile_expr(source)
+        except ValueError as e:
+            print(f"  {source} -> {e}")
+        else:
+            raise AssertionError(f"{source} 应该被拒绝")
+
+    # 没有内置函数，符号表之外的名称求值时报错
+    try:
+        evaluate("getattr(x, '__class__')", {"x": [1]})
+    except ValueError as e:
+        print(f"  getattr(x, '__class__') -> {e}")
+    else:
+        raise AssertionError("getattr 不应该可用")
+
+
 if __name__ == "__main__":
     test_parser()
     test_advanced_features()
+    test_value_syntax()
+    test_expressions()
 
     print("\n" + "="*50)
     print("所有测试完成！配置文件格式已验证成功。")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置表达式求值
+expr: 值和 trigger_keys 中的 keyboard.Key.alt_l 这类表达式只允许白名单内的语法:
+常量、名称、非下划线开头的属性、下标、运算、比较、条件表达式、容器和 f-string；
+函数调用只能调用符号表中直接给出的名称。名称只从调用方传入的符号表中查找，没有内置函数。
+每个表达式只解析、检查、编译一次，之后按源文本复用代码对象
+"""
+
+import ast
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Mapping, Optional
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Attribute, ast.Subscript, ast.Slice,
+    ast.Tuple, ast.List, ast.Dict, ast.Set,
+    ast.UnaryOp, ast.UAdd, ast.USub, ast.Not, ast.Invert,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.BitOr, ast.BitAnd, ast.BitXor,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.IfExp, ast.JoinedStr, ast.FormattedValue, ast.Call, ast.keyword,
+)
+
+# 没有内置函数，名称只能来自符号表
+_GLOBALS = {"__builtins__": {}}
+_EMPTY: Mapping[str, Any] = {}
+
+
+def _check(tree: ast.AST, source: str):
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"表达式中不允许 {type(node).__name__}: {source}")
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            raise ValueError(f"表达式中不允许访问下划线开头的属性 {node.attr}: {source}")
+        if isinstance(node, ast.Name) and node.id.startswith("_"):
+            raise ValueError(f"表达式中不允许下划线开头的名称 {node.id}: {source}")
+        if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+            # obj.method() 可以绕过符号表调用任意方法
+            raise ValueError(f"表达式只能调用符号表中的函数: {source}")
+
+
+@lru_cache(maxsize=4096)
+def compile_expr(source: str) -> CodeType:
+    """解析、检查并编译表达式，结果按源文本缓存"""
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"表达式语法错误: {source} ({e.msg})")
+    _check(tree, source)
+    return compile(tree, "<expr>", "eval")
+
+
+def evaluate(source: str, symbols: Optional[Mapping[str, Any]] = None) -> Any:
+    """求值表达式，名称从 symbols 中查找"""
+    code = compile_expr(source)
+    try:
+        return eval(code, _GLOBALS, symbols or _EMPTY)
+    except NameError as e:
+        raise ValueError(f"表达式中有未知的名称 {e.name}: {source}")
+    except (ArithmeticError, AttributeError, LookupError, TypeError) as e:
+        raise ValueError(f"表达式求值失败: {source} ({e})")
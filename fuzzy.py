@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模糊搜索索引
+为一组名称预先构建小写前缀表和 1~3 元组倒排表，
+输入时在上一次的结果上继续收窄，而不是重新扫描全部条目。
+同一组名称只是换了顺序(例如按使用记录重新排序)时复用已经构建的表，只重新计算顺序
+"""
+
+import copy
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+GRAM_SIZE = 3
+_EMPTY: FrozenSet[int] = frozenset()
+
+
+class FuzzyIndex:
+    """可复用的模糊搜索索引
+
+    查询按空白拆分为若干词，每个词都必须作为子串出现在名称中(不区分大小写，顺序无关)。
+    结果中以整个查询开头的条目排在前面，其余保持原列表顺序。
+    """
+
+    def __init__(self, items: Iterable[str]):
+        self.items = list(items)
+        self._keys = [item.lower() for item in self.items]
+        # 内部编号 -> 在 items 中的下标；None 表示两者相同(没有重新排序过)
+        self._order: Optional[List[int]] = None
+
+        # 前缀表: 排序后的小写名称，二分查找得到前缀区间
+        self._sorted_ids = sorted(range(len(self._keys)), key=self._keys.__getitem__)
+        self._sorted_keys = [self._keys[i] for i in self._sorted_ids]
+
+        # n 元组倒排表，n = 1..3
+        postings: Dict[str, List[int]] = {}
+        for item_id, key in enumerate(self._keys):
+            grams = set()
+            for n in range(1, GRAM_SIZE + 1):
+                for start in range(len(key) - n + 1):
+                    grams.add(key[start:start + n])
+            for gram in grams:
+                postings.setdefault(gram, []).append(item_id)
+        self._grams: Dict[str, FrozenSet[int]] = {gram: frozenset(ids) for gram, ids in postings.items()}
+
+        self._prepare()
+
+    def _prepare(self):
+        # 单字符查询命中面最大，结果在构建时就排好序
+        self._single_char_results: Dict[str, List[int]] = {
+            gram: self._rank(gram, ids) for gram, ids in self._grams.items() if len(gram) == 1
+        }
+
+        self._last_tokens: Optional[List[str]] = None
+        self._last_hits: Optional[AbstractSet[int]] = None
+        self._last_query = None
+        self._all_ids = list(range(len(self.items)))
+        self._last_result: List[int] = self._all_ids
+
+    def __len__(self):
+        return len(self.items)
+
+    def same_items(self, items: List[str]) -> bool:
+        """items 是否与索引中的条目相同(顺序可以不同)"""
+        return len(items) == len(self.items) and (items == self.items or Counter(items) == Counter(self.items))
+
+    def reordered(self, items: List[str]) -> "FuzzyIndex":
+        """同一组条目换了顺序后的索引，共享倒排表和前缀表，结果下标对应新的顺序；条目不同时重新构建"""
+        if not self.same_items(items):
+            return FuzzyIndex(items)
+        index = copy.copy(self)
+        index.items = list(items)
+        # 重名的条目按出现顺序依次对应
+        slots: Dict[str, List[int]] = {}
+        for i in range(len(items) - 1, -1, -1):
+            slots.setdefault(items[i], []).append(i)
+        # _keys 按内部编号排列，原来的条目列表按同样的编号排列
+        index._order = [slots[item].pop() for item in self._source_items()]
+        index._prepare()
+        return index
+
+    def _source_items(self) -> List[str]:
+        """按内部编号排列的条目"""
+        if self._order is None:
+            return self.items
+        items = [""] * len(self.items)
+        for item_id, i in enumerate(self._order):
+            items[item_id] = self.items[i]
+        return items
+
+    def _match_token(self, token: str, candidates: Optional[AbstractSet[int]],
+                     extended_from: str = "") -> AbstractSet[int]:
+        """在候选集合中筛选包含 token 的条目，candidates 为 None 表示全部条目"""
+        if len(token) <= GRAM_SIZE:
+            posting = self._grams.get(token, _EMPTY)
+            return posting if candidates is None else candidates & posting
+
+        if candidates is not None and extended_from and token.startswith(extended_from):
+            # 候选已经包含 token 的前缀，只需检查新增的三元组
+            new_grams = {token[start:start + GRAM_SIZE]
+                         for start in range(max(0, len(extended_from) - GRAM_SIZE + 1),
+                                            len(token) - GRAM_SIZE + 1)}
+        else:
+            new_grams = {token[start:start + GRAM_SIZE] for start in range(len(token) - GRAM_SIZE + 1)}
+
+        # 从最短的倒排表开始求交集
+        hits = candidates
+        for posting in sorted((self._grams.get(gram, _EMPTY) for gram in new_grams), key=len):
+            hits = posting if hits is None else hits & posting
+            if not hits:
+                return set()
+        keys = self._keys
+        return {i for i in hits if token in keys[i]}
+
+    def search(self, query: str) -> List[int]:
+        """返回匹配条目在 items 中的下标"""
+        query = query.lower()
+        if query == self._last_query:
+            return self._last_result
+        tokens = query.split()
+        if not tokens:
+            hits = None
+        elif len(tokens) == 1 and len(tokens[0]) == 1:
+            result = self._single_char_results.get(tokens[0], [])
+            self._last_query = query
+            self._last_tokens = tokens
+            self._last_hits = self._grams.get(tokens[0], _EMPTY)
+            self._last_result = result
+            return result
+        elif self._last_hits is not None and self._extends_last(tokens):
+            # 在上一次结果上收窄，只处理变化的最后一个词
+            last = self._last_tokens
+            if len(tokens) == len(last):
+                hits = self._match_token(tokens[-1], self._last_hits, last[-1])
+            else:
+                hits = self._match_token(tokens[-1], self._last_hits)
+        else:
+            hits = None
+            for token in sorted(tokens, key=len, reverse=True):
+                hits = self._match_token(token, hits)
+                if not hits:
+                    break
+
+        self._last_query = query
+        self._last_tokens = tokens
+        self._last_hits = hits
+        self._last_result = self._all_ids if hits is None else self._rank(query.strip(), hits)
+        return self._last_result
+
+    def filter(self, query: str) -> List[str]:
+        """返回匹配的条目"""
+        items = self.items
+        return [items[i] for i in self.search(query)]
+
+    def _extends_last(self, tokens: List[str]) -> bool:
+        """判断查询是否只是在上一次查询的基础上继续输入"""
+        last = self._last_tokens
+        if not last:
+            return False
+        if len(tokens) == len(last):
+            return tokens[:-1] == last[:-1] and tokens[-1].startswith(last[-1])
+        return len(tokens) == len(last) + 1 and tokens[:-1] == last
+
+    def _positions(self, ids: Iterable[int]) -> List[int]:
+        """内部编号转换为 items 中的下标并排序"""
+        order = self._order
+        return sorted(ids) if order is None else sorted(map(order.__getitem__, ids))
+
+    def _rank(self, query: str, hits: AbstractSet[int]) -> List[int]:
+        """以查询开头的条目在前，其余保持原顺序"""
+        lo = bisect_left(self._sorted_keys, query)
+        hi = bisect_right(self._sorted_keys, query + "\U0010ffff", lo)
+        if lo == hi:
+            return self._positions(hits)
+        prefixed = hits.intersection(self._sorted_ids[lo:hi])
+        return self._positions(prefixed) + self._positions(hits - prefixed)
+
+
+class BackgroundIndex:
+    """在后台线程中为最新的条目列表准备索引
+
+    update() 可在任何线程调用，只保留最新一次请求；条目与上一次相同只是顺序不同时用 reordered()，
+    不重新构建倒排表。完成后在工作线程中调用 on_ready(条目, 索引)
+    """
+
+    def __init__(self, on_ready: Optional[Callable[[List[str], FuzzyIndex], None]] = None):
+        self.on_ready = on_ready
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._ready: Optional[FuzzyIndex] = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fuzzy-index")
+
+    def update(self, items: List[str]):
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._pool.submit(self._build, list(items), generation)
+
+    def _build(self, items: List[str], generation: int):
+        if generation != self._generation:
+            # 已经有更新的请求
+            return
+        ready = self._ready
+        try:
+            if ready is not None and ready.items == items:
+                index = ready
+            elif ready is not None and ready.same_items(items):
+                index = ready.reordered(items)
+            else:
+                index = FuzzyIndex(items)
+        except Exception as e:
+            print(f"构建搜索索引失败: {e}")
+            return
+        self._ready = index
+        if self.on_ready is not None:
+            self.on_ready(items, index)
+
+    def get(self, items: List[str]) -> Optional[FuzzyIndex]:
+        """已经为这组条目(相同顺序)准备好的索引，没有时返回 None"""
+        ready = self._ready
+        return ready if ready is not None and ready.items == items else None
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动组
+配置中的 [group:名称] 段定义一组一起启动的应用:
+
+    [group:dev]
+    apps = [Terminal, Editor, Browser]
+    ## 依赖: Editor 在 Terminal 启动之后才启动
+    after = {Editor: Terminal}
+    ## 依赖满足(或组开始)之后再等待的时间
+    delay_ms = {Browser: 500}
+    ## 同时进行的启动数，默认使用 [launch] parallel
+    parallel = 4
+
+调度器在线程池中并行启动没有依赖关系的应用，不超过并行上限，并记录每个应用的启动耗时和整组耗时
+"""
+
+import heapq
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+SECTION_PREFIX = "group:"
+# 选择窗口和控制命令中启动组的名称前缀，与应用名区分
+ITEM_PREFIX = "@"
+DEFAULT_PARALLEL = 4
+
+
+class LaunchGroup(NamedTuple):
+    """一个启动组，按配置中的顺序排列"""
+    name: str
+    apps: Tuple[str, ...]
+    # 应用 -> 必须先启动的应用
+    after: Mapping[str, Tuple[str, ...]]
+    # 应用 -> 依赖满足后的等待时间(秒)
+    delays: Mapping[str, float]
+    parallel: int
+
+
+class GroupEntry(NamedTuple):
+    """一个应用的启动结果"""
+    app: str
+    pid: Optional[int]
+    # 相对组开始的启动时刻和启动调用耗时(秒)
+    started_at: float
+    spawn_time: float
+    error: Optional[str]
+
+
+class GroupReport(NamedTuple):
+    name: str
+    entries: List[GroupEntry]
+    wall_time: float
+
+    def summary(self) -> str:
+        """每个应用一行，最后一行是整组耗时"""
+        lines = []
+        for entry in self.entries:
+            result = f"pid {entry.pid}" if entry.error is None else f"失败: {entry.error}"
+            lines.append(f"{entry.app}: +{entry.started_at * 1e3:.1f}ms "
+                         f"spawn {entry.spawn_time * 1e3:.2f}ms {result}")
+        lines.append(f"group {self.name}: {len(self.entries)} 个应用, {self.wall_time * 1e3:.1f}ms")
+        return "\n".join(lines)
+
+
+def _as_tuple(value) -> Tuple[str, ...]:
+    return tuple(value) if isinstance(value, list) else (value,)
+
+
+def parse_groups(config: Mapping[str, Mapping], default_parallel: int = DEFAULT_PARALLEL) -> Dict[str, LaunchGroup]:
+    """从配置的 [group:名称] 段解析启动组，依赖缺失或成环时抛出 ValueError"""
+    groups = {}
+    for section, items in config.items():
+        if not section.startswith(SECTION_PREFIX):
+            continue
+        name = section[len(SECTION_PREFIX):]
+        apps = tuple(str(app) for app in items.get("apps", []))
+        if not name or not apps:
+            raise ValueError(f"启动组 [{section}] 缺少名称或 apps")
+        if len(set(apps)) != len(apps):
+            raise ValueError(f"启动组 {name} 中有重复的应用")
+        after = {str(app): tuple(str(dep) for dep in _as_tuple(deps))
+                 for app, deps in items.get("after", {}).items()}
+        delays = {str(app): delay / 1000 for app, delay in items.get("delay_ms", {}).items()}
+        for app in (*after, *(dep for deps in after.values() for dep in deps), *delays):
+            if app not in apps:
+                raise ValueError(f"启动组 {name} 引用了不在 apps 中的应用: {app}")
+        parallel = items.get("parallel", default_parallel)
+        if not isinstance(parallel, int) or parallel < 1:
+            raise ValueError(f"启动组 {name} 的 parallel 必须是正整数")
+        group = LaunchGroup(name, apps, after, delays, parallel)
+        _check_acyclic(group)
+        groups[name] = group
+    return groups
+
+
+def _check_acyclic(group: LaunchGroup):
+    remaining = {app: set(group.after.get(app, ())) for app in group.apps}
+    while remaining:
+        ready = [app for app, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"启动组 {group.name} 的依赖成环: {', '.join(remaining)}")
+        for app in ready:
+            del remaining[app]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_group(group: LaunchGroup, launch: Callable[[str], int]) -> GroupReport:
+    """按依赖和延迟启动整组应用，返回启动报告；launch(应用名) 返回 pid，失败时抛出异常
+
+    在调用线程中调度，启动调用在最多 parallel 个工作线程中执行；依赖启动失败的应用不再启动
+    """
+    start = time.monotonic()
+    dependents: Dict[str, List[str]] = {app: [] for app in group.apps}
+    waiting = {}
+    for app in group.apps:
+        deps = group.after.get(app, ())
+        waiting[app] = len(deps)
+        for dep in deps:
+            dependents[dep].append(app)
+    order = {app: i for i, app in enumerate(group.apps)}
+    # (可以开始的时刻, 配置中的顺序, 应用)
+    ready: List[Tuple[float, int, str]] = [(start + group.delays.get(app, 0.0), order[app], app)
+                                           for app in group.apps if not waiting[app]]
+    heapq.heapify(ready)
+    results: Dict[str, GroupEntry] = {}
+    running: Dict[Future, str] = {}
+
+    def timed_launch(app: str) -> Tuple[float, float, int]:
+        started = time.monotonic()
+        pid = launch(app)
+        return started - start, time.monotonic() - started, pid
+
+    def finish(app: str, entry: GroupEntry):
+        results[app] = entry
+        for dependent in dependents[app]:
+            if entry.error is not None:
+                if dependent not in results:
+                    finish(dependent, GroupEntry(dependent, None, time.monotonic() - start, 0.0,
+                                                 f"依赖 {app} 启动失败"))
+                continue
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                heapq.heappush(ready, (time.monotonic() + group.delays.get(dependent, 0.0),
+                                       order[dependent], dependent))
+
+    with ThreadPoolExecutor(max_workers=group.parallel, thread_name_prefix=f"group-{group.name}") as pool:
+        while ready or running:
+            now = time.monotonic()
+            while ready and ready[0][0] <= now and len(running) < group.parallel:
+                _, _, app = heapq.heappop(ready)
+                if app not in results:
+                    running[pool.submit(timed_launch, app)] = app
+            timeout = max(0.0, ready[0][0] - now) if ready and len(running) < group.parallel else None
+            if not running:
+                if timeout:
+                    time.sleep(timeout)
+                continue
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                app = running.pop(future)
+                try:
+                    started_at, spawn_time, pid = future.result()
+                except Exception as e:
+                    finish(app, GroupEntry(app, None, time.monotonic() - start, 0.0, str(e)))
+                else:
+                    finish(app, GroupEntry(app, pid, started_at, spawn_time, None))
+
+    entries = [results[app] for app in group.apps]
+    return GroupReport(group.name, entries, time.monotonic() - start)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全局热键组合检测
+直接在 pynput 回调中完成组合键匹配，不再需要轮询
+"""
+
+from typing import Callable, Hashable, Iterable
+
+
+class ChordDetector:
+    """事件驱动的组合键检测器
+
+    触发键在构造时编译为 frozenset，按键状态以集合维护，
+    每次按下/释放只做 O(1) 的集合操作和计数，组合键凑齐时立即调用 on_trigger。
+    """
+
+    def __init__(self, trigger_keys: Iterable[Hashable], on_trigger: Callable[[], None]):
+        self.on_trigger = on_trigger
+        self.pressed = set()
+        self.trigger_keys = frozenset()
+        self._matched = 0
+        self._fired = False
+        self.set_trigger_keys(trigger_keys)
+
+    def set_trigger_keys(self, trigger_keys: Iterable[Hashable]):
+        """重新编译触发键"""
+        keys = frozenset(trigger_keys)
+        self._matched = len(keys & self.pressed)
+        self._fired = bool(keys) and self._matched == len(keys)
+        self.trigger_keys = keys
+
+    def on_press(self, key) -> bool:
+        """处理按下事件，返回本次是否触发了组合键"""
+        if key in self.pressed:
+            # 长按产生的重复按下事件
+            return False
+        self.pressed.add(key)
+        if key not in self.trigger_keys:
+            return False
+        self._matched += 1
+        if self._matched == len(self.trigger_keys) and not self._fired:
+            self._fired = True
+            self.on_trigger()
+            return True
+        return False
+
+    def on_release(self, key):
+        """处理释放事件"""
+        if key not in self.pressed:
+            # 监听开始前就按下的键，或者重复的释放事件
+            return
+        self.pressed.discard(key)
+        if key in self.trigger_keys:
+            self._matched -= 1
+            self._fired = False
+
+    def reset(self):
+        """清空按键状态"""
+        self.pressed.clear()
+        self._matched = 0
+        self._fired = False
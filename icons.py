@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用图标
+图标名按 XDG 图标主题规范查找，解码和缩放在线程池中完成，缩放后的 PNG 缩略图保存在缓存目录，
+文件名由源文件路径、mtime 和尺寸决定，源文件更新后自动失效。
+界面线程只从缩略图创建 PhotoImage，并保存在有上限的 LRU 中。
+PIL 在第一次解码时才导入，SVG 需要可选的 cairosvg，没有时只使用位图图标
+"""
+
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional
+
+from paths import atomic_write, cache_dir
+
+DEFAULT_SIZE = 24
+# 优先使用不小于目标尺寸的最接近尺寸，缩小比放大清晰
+_THEME_SIZES = (16, 22, 24, 32, 48, 64, 96, 128, 256, 512)
+_EXTENSIONS = (".png", ".svg", ".xpm")
+
+
+def icon_dirs() -> List[str]:
+    """按优先级排列的图标根目录"""
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [os.path.expanduser("~/.icons")]
+    dirs += [os.path.join(base, "icons") for base in [data_home] + data_dirs.split(":") if base]
+    return dirs
+
+
+def _candidates(name: str, size: int, themes: List[str], roots: List[str]):
+    sizes = sorted(_THEME_SIZES, key=lambda s: (s < size, abs(s - size)))
+    for theme in themes:
+        for root in roots:
+            theme_dir = os.path.join(root, theme)
+            for s in sizes:
+                for extension in (".png", ".xpm"):
+                    yield os.path.join(theme_dir, f"{s}x{s}", "apps", name + extension)
+            yield os.path.join(theme_dir, "scalable", "apps", name + ".svg")
+    for extension in _EXTENSIONS:
+        yield os.path.join("/usr/share/pixmaps", name + extension)
+
+
+def find_icon(name: str, size: int = DEFAULT_SIZE, themes: Optional[List[str]] = None,
+              roots: Optional[List[str]] = None) -> Optional[str]:
+    """把 .desktop 中的 Icon 值解析为文件路径，找不到时返回 None"""
+    if not name:
+        return None
+    if os.path.isabs(name):
+        return name if os.path.isfile(name) else None
+    themes = themes or ["hicolor"]
+    roots = roots if roots is not None else icon_dirs()
+    for path in _candidates(name, size, themes, roots):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _decode(source: str, size: int):
+    """解码并缩放为 size x size 的 RGBA 图像"""
+    from PIL import Image
+    if source.endswith(".svg"):
+        try:
+            import cairosvg
+        except ImportError:
+            return None
+        data = cairosvg.svg2png(url=source, output_width=size, output_height=size)
+        return Image.open(io.BytesIO(data)).convert("RGBA")
+    with Image.open(source) as image:
+        image = image.convert("RGBA")
+    image.thumbnail((size, size), Image.LANCZOS)
+    if image.size != (size, size):
+        # 非正方形图标居中放到透明背景上，保证每行对齐
+        canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        canvas.paste(image, ((size - image.width) // 2, (size - image.height) // 2))
+        image = canvas
+    return image
+
+
+def thumbnail_path(source: str, size: int, directory: Optional[str] = None) -> str:
+    """缩略图在缓存中的路径"""
+    mtime = os.stat(source).st_mtime_ns
+    digest = hashlib.blake2b(f"{source}\0{mtime}\0{size}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(directory or os.path.join(cache_dir(), "icons"), f"{digest}.png")
+
+
+def make_thumbnail(source: str, size: int, directory: Optional[str] = None) -> Optional[str]:
+    """返回缓存中的缩略图路径，不存在时解码生成；无法解码时返回 None"""
+    try:
+        path = thumbnail_path(source, size, directory)
+    except OSError:
+        return None
+    if os.path.exists(path):
+        return path
+    try:
+        image = _decode(source, size)
+    except (OSError, ValueError) as e:
+        print(f"无法读取图标 {source}: {e}")
+        return None
+    if image is None:
+        return None
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, buffer.getvalue())
+    except OSError as e:
+        print(f"无法保存图标缓存: {e}")
+        return None
+    return path
+
+
+def cached_image(key: str, draw: Callable[[], object], directory: Optional[str] = None):
+    """返回缓存的 PIL 图像，第一次调用时用 draw() 生成并保存；key 变化即重新生成"""
+    from PIL import Image
+    path = os.path.join(directory or os.path.join(cache_dir(), "icons"), f"{key}.png")
+    try:
+        with Image.open(path) as image:
+            return image.copy()
+    except (OSError, ValueError):
+        pass
+    image = draw()
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, buffer.getvalue())
+    except OSError as e:
+        print(f"无法保存图标缓存: {e}")
+    return image
+
+
+class IconCache:
+    """应用名 -> Tk 图像
+
+    request() 只能在界面线程中调用: 命中 LRU 时直接返回图像，否则返回 None，
+    并在线程池中准备缩略图，完成后通过 post(函数, *参数) 回到界面线程创建图像并调用 on_ready
+    """
+
+    def __init__(self, post: Callable, size: int = DEFAULT_SIZE, capacity: int = 256, workers: int = 2,
+                 names: Optional[Mapping[str, str]] = None, directory: Optional[str] = None):
+        self.post = post
+        self.size = size
+        self.capacity = capacity
+        self.directory = directory
+        # 应用名 -> 图标名或路径
+        self.names: Mapping[str, str] = names or {}
+        self._images: "OrderedDict[str, object]" = OrderedDict()
+        # 正在加载的图标名 -> 等待的回调
+        self._pending: Dict[str, List[Callable]] = {}
+        # 找不到或无法解码的图标名，不再重复尝试
+        self._missing = set()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="icons")
+        self._placeholder = None
+        self.hits = 0
+        self.misses = 0
+
+    def placeholder(self):
+        """透明占位图，图标到达前保持行的布局不变"""
+        if self._placeholder is None:
+            import tkinter
+            self._placeholder = tkinter.PhotoImage(width=self.size, height=self.size)
+        return self._placeholder
+
+    def request(self, app_name: str, on_ready: Optional[Callable[[object], None]] = None):
+        """返回应用的图标；尚未加载时返回 None，加载完成后调用 on_ready(图像)"""
+        icon = self.names.get(app_name)
+        if not icon or icon in self._missing:
+            return None
+        image = self._images.get(icon)
+        if image is not None:
+            self._images.move_to_end(icon)
+            self.hits += 1
+            return image
+        self.misses += 1
+        waiting = self._pending.get(icon)
+        if waiting is None:
+            waiting = self._pending[icon] = []
+            self._pool.submit(self._load, icon)
+        if on_ready is not None:
+            waiting.append(on_ready)
+        return None
+
+    def prefetch(self, app_names):
+        """提前加载一批图标，例如选择窗口的第一屏"""
+        for app_name in app_names:
+            self.request(app_name)
+
+    def _load(self, icon: str):
+        """在工作线程中运行"""
+        path = None
+        try:
+            source = find_icon(icon, self.size)
+            if source is not None:
+                path = make_thumbnail(source, self.size, self.directory)
+        except Exception as e:
+            print(f"加载图标 {icon} 失败: {e!r}")
+        self.post(self._deliver, icon, path)
+
+    def _deliver(self, icon: str, path: Optional[str]):
+        """在界面线程中运行"""
+        callbacks = self._pending.pop(icon, [])
+        if path is None:
+            self._missing.add(icon)
+            return
+        import tkinter
+        try:
+            image = tkinter.PhotoImage(file=path)
+        except tkinter.TclError as e:
+            print(f"无法显示图标 {path}: {e}")
+            self._missing.add(icon)
+            return
+        self._images[icon] = image
+        if len(self._images) > self.capacity:
+            self._images.popitem(last=False)
+        for on_ready in callbacks:
+            on_ready(image)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程启动引擎
+不经过 /bin/sh 直接 posix_spawn 启动程序，子进程在新会话中运行、标准输入输出指向 /dev/null，
+由后台线程通过 pidfd 回收，不会留下僵尸进程。
+按应用记录仍在运行的子进程，可以阻止重复启动，并统计运行时长和异常退出次数。
+start_app 是选择窗口、快捷键、托盘和控制命令共用的启动流程，负责日志、launch.spawn 直方图和使用记录
+"""
+
+import os
+import re
+import selectors
+import shlex
+import shutil
+import signal
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import get_metrics
+from usage import get_usage
+
+# 含有这些字符的命令需要 shell 解释(管道、重定向、变量、通配符等)
+_SHELL_SYNTAX = re.compile(r"[|&;<>()$`*?~\n]")
+
+_FILE_ACTIONS = [
+    (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+    (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+    (os.POSIX_SPAWN_DUP2, 1, 2),
+]
+# Python 忽略了 SIGPIPE/SIGXFSZ，被忽略的信号会跨 exec 继承，子进程中恢复默认处理
+_DEFAULT_SIGNALS = tuple(s for s in (getattr(signal, "SIGPIPE", None), getattr(signal, "SIGXFSZ", None)) if s)
+
+ExitCallback = Callable[[int, int], None]
+
+# 重复启动策略: 每次都启动 / 已在运行时不启动 / 距上次启动不足 debounce 秒时不启动
+ALWAYS = "always"
+SINGLE = "single"
+DEBOUNCE = "debounce"
+POLICIES = (ALWAYS, SINGLE, DEBOUNCE)
+
+_launch_spawn = get_metrics().histogram("launch.spawn", "posix_spawn 耗时")
+
+
+def parse_command(command: str) -> Tuple[str, List[str]]:
+    """把命令解析为 (可执行文件路径, argv)"""
+    argv = shlex.split(command) if command.strip() else []
+    if not argv:
+        raise ValueError(f"空命令: {command!r}")
+    if '=' in argv[0]:
+        # 以环境变量赋值开头，不能直接加 exec
+        return "/bin/sh", ["/bin/sh", "-c", command]
+    if _SHELL_SYNTAX.search(command):
+        return "/bin/sh", ["/bin/sh", "-c", f"exec {command}"]
+    executable = shutil.which(argv[0])
+    if executable is None:
+        raise FileNotFoundError(f"找不到可执行文件: {argv[0]}")
+    return executable, argv
+
+
+class ChildReaper:
+    """后台回收子进程
+
+    优先使用 pidfd + epoll，单个线程等待所有子进程；不支持 pidfd 时每个子进程用一个 waitpid 线程
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, pid: int, on_exit: Optional[ExitCallback] = None):
+        """登记子进程，退出时回收并调用 on_exit(pid, 退出状态)"""
+        try:
+            pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            threading.Thread(target=self._wait_blocking, args=(pid, on_exit), daemon=True).start()
+            return
+        with self._lock:
+            if self._selector is None:
+                self._selector = selectors.DefaultSelector()
+            self._selector.register(pidfd, selectors.EVENT_READ, (pid, on_exit))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="child-reaper", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            for key, _ in self._selector.select():
+                with self._lock:
+                    self._selector.unregister(key.fd)
+                os.close(key.fd)
+                pid, on_exit = key.data
+                self._reap(pid, on_exit, os.WNOHANG)
+
+    def _wait_blocking(self, pid: int, on_exit: Optional[ExitCallback]):
+        self._reap(pid, on_exit, 0)
+
+    @staticmethod
+    def _reap(pid: int, on_exit: Optional[ExitCallback], options: int):
+        try:
+            _, status = os.waitpid(pid, options)
+        except ChildProcessError:
+            return
+        if on_exit:
+            on_exit(pid, os.waitstatus_to_exitcode(status))
+
+
+class AlreadyLaunched(Exception):
+    """按启动策略跳过了这次启动"""
+
+    def __init__(self, message: str, pid: Optional[int] = None):
+        super().__init__(message)
+        # 仍在运行的同一应用的子进程
+        self.pid = pid
+
+
+class AppStats:
+    """一个应用的启动和退出统计"""
+
+    __slots__ = ("launches", "suppressed", "exits", "crashes", "total_lifetime", "last_exit_code")
+
+    def __init__(self):
+        self.launches = 0
+        self.suppressed = 0
+        self.exits = 0
+        # 非零退出码或被信号终止
+        self.crashes = 0
+        self.total_lifetime = 0.0
+        self.last_exit_code: Optional[int] = None
+
+
+class ProcessTable:
+    """按应用名记录启动的子进程，子进程退出时由 ChildReaper 的回调移除，不轮询"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # 每个应用一把锁，保证同一应用的检查、启动、登记不交错，不同应用可以同时启动
+        self._app_locks: Dict[str, threading.Lock] = {}
+        # 应用名 -> {pid: 启动时刻(monotonic)}
+        self.running: Dict[str, Dict[int, float]] = {}
+        self.last_launch: Dict[str, float] = {}
+        self.stats: Dict[str, AppStats] = {}
+        # 所有应用的启动次数
+        self.total_launches = 0
+
+    def app_lock(self, app_name: str) -> threading.Lock:
+        with self.lock:
+            lock = self._app_locks.get(app_name)
+            if lock is None:
+                lock = self._app_locks[app_name] = threading.Lock()
+            return lock
+
+    def check(self, app_name: str, policy: str, debounce: float):
+        """按策略判断能否启动，不能时抛出 AlreadyLaunched；调用方需持有 lock"""
+        if policy == SINGLE:
+            children = self.running.get(app_name)
+            if children:
+                self._stats(app_name).suppressed += 1
+                pid = next(iter(children))
+                raise AlreadyLaunched(f"{app_name} 已在运行 (pid {pid})", pid)
+        elif policy == DEBOUNCE:
+            elapsed = time.monotonic() - self.last_launch.get(app_name, float("-inf"))
+            if elapsed < debounce:
+                self._stats(app_name).suppressed += 1
+                children = self.running.get(app_name)
+                raise AlreadyLaunched(f"{app_name} 刚在 {elapsed * 1e3:.0f}ms 前启动过",
+                                      next(iter(children)) if children else None)
+
+    def started(self, app_name: str, pid: int):
+        """登记子进程；调用方需持有 lock"""
+        now = time.monotonic()
+        self.running.setdefault(app_name, {})[pid] = now
+        self.last_launch[app_name] = now
+        self._stats(app_name).launches += 1
+        self.total_launches += 1
+
+    def exited(self, app_name: str, pid: int, exit_code: int):
+        """子进程退出，在回收线程中调用"""
+        # 子进程立即退出时，等到启动它的线程登记完成
+        with self.app_lock(app_name), self.lock:
+            children = self.running.get(app_name, {})
+            started_at = children.pop(pid, None)
+            if not children:
+                self.running.pop(app_name, None)
+            stats = self._stats(app_name)
+            stats.exits += 1
+            stats.last_exit_code = exit_code
+            if exit_code != 0:
+                stats.crashes += 1
+            if started_at is not None:
+                stats.total_lifetime += time.monotonic() - started_at
+
+    def _stats(self, app_name: str) -> AppStats:
+        stats = self.stats.get(app_name)
+        if stats is None:
+            stats = self.stats[app_name] = AppStats()
+        return stats
+
+    def dump(self) -> str:
+        """每个应用一行统计，用于 stats 控制命令"""
+        lines = []
+        with self.lock:
+            for app_name, stats in sorted(self.stats.items()):
+                mean_lifetime = stats.total_lifetime / stats.exits if stats.exits else 0.0
+                lines.append(f"app {app_name!r} running {len(self.running.get(app_name, ()))} "
+                             f"launches {stats.launches} suppressed {stats.suppressed} exits {stats.exits} "
+                             f"crashes {stats.crashes} last_exit {stats.last_exit_code} "
+                             f"mean_lifetime_s {mean_lifetime:.1f}")
+        return "\n".join(lines)
+
+
+class Launcher:
+    """解析结果按命令缓存，启动时直接 posix_spawn"""
+
+    def __init__(self):
+        self._commands: Dict[str, Tuple[str, List[str]]] = {}
+        self.reaper = ChildReaper()
+        self.processes = ProcessTable()
+        # 最近一次 posix_spawn 的耗时(秒)
+        self.last_spawn_time = 0.0
+
+    def prepare(self, command: str) -> Tuple[str, List[str]]:
+        """解析命令并缓存可执行文件路径"""
+        prepared = self._commands.get(command)
+        if prepared is None:
+            prepared = self._commands[command] = parse_command(command)
+        return prepared
+
+    def launch(self, command: str, on_exit: Optional[ExitCallback] = None) -> int:
+        """启动命令，返回子进程 pid"""
+        return self.spawn(command, on_exit)[0]
+
+    def spawn(self, command: str, on_exit: Optional[ExitCallback] = None) -> Tuple[int, float]:
+        """启动命令，返回 (pid, posix_spawn 耗时)；多个线程同时启动时用这个耗时而不是 last_spawn_time"""
+        executable, argv = self.prepare(command)
+        start = time.perf_counter()
+        try:
+            pid = self._spawn(executable, argv)
+        except FileNotFoundError:
+            # 可执行文件被移动或升级，重新解析一次
+            self._commands.pop(command, None)
+            executable, argv = self.prepare(command)
+            pid = self._spawn(executable, argv)
+        spawn_time = self.last_spawn_time = time.perf_counter() - start
+        self.reaper.watch(pid, on_exit)
+        return pid, spawn_time
+
+    def launch_app(self, app_name: str, command: str, policy: str = ALWAYS, debounce: float = 0.0,
+                   on_exit: Optional[ExitCallback] = None) -> Tuple[int, float]:
+        """按应用的启动策略启动命令，返回 (pid, posix_spawn 耗时)；被策略跳过时抛出 AlreadyLaunched"""
+        processes = self.processes
+
+        def exited(pid: int, exit_code: int):
+            processes.exited(app_name, pid, exit_code)
+            if on_exit:
+                on_exit(pid, exit_code)
+
+        # 同一应用的检查和登记在同一把锁内完成，同时到达的两次启动只有一次生效；
+        # 子进程立即退出时，回收线程的 exited 会等到登记完成后才执行
+        with processes.app_lock(app_name):
+            with processes.lock:
+                processes.check(app_name, policy, debounce)
+            pid, spawn_time = self.spawn(command, exited)
+            with processes.lock:
+                processes.started(app_name, pid)
+        return pid, spawn_time
+
+    @staticmethod
+    def _spawn(executable: str, argv: List[str]) -> int:
+        return os.posix_spawn(executable, argv, os.environ, file_actions=_FILE_ACTIONS,
+                              setsid=True, setsigdef=_DEFAULT_SIGNALS)
+
+
+_default_launcher = Launcher()
+
+
+def get_launcher() -> Launcher:
+    """进程内共享的启动器"""
+    return _default_launcher
+
+
+def launch(command: str) -> int:
+    """使用共享启动器启动命令"""
+    return get_launcher().launch(command)
+
+
+def launch_configured(app_name: str, settings) -> Tuple[str, int, float]:
+    """按配置中的命令和启动策略用共享启动器启动应用，返回 (命令, pid, posix_spawn 耗时)
+
+    settings 是 settings.Settings；耗时计入 launch.spawn 直方图。启动组中的应用直接用这个，不单独记入使用记录
+    """
+    command = settings.apps.get(app_name)
+    if command is None:
+        raise ValueError(f"没有这个应用: {app_name}")
+    pid, spawn_time = get_launcher().launch_app(app_name, command, settings.launch_policy(app_name),
+                                                settings.debounce)
+    _launch_spawn.observe(spawn_time)
+    return command, pid, spawn_time
+
+
+def start_app(app_name: str, settings) -> Tuple[int, float]:
+    """选择窗口、快捷键、托盘和控制命令启动单个应用的共同流程: launch_configured，输出日志，记入使用记录
+
+    返回 (pid, posix_spawn 耗时)；失败时抛出 OSError、ValueError 或 AlreadyLaunched
+    """
+    command, pid, spawn_time = launch_configured(app_name, settings)
+    print(f"Launching {command} (pid {pid}, spawn {spawn_time * 1e3:.2f}ms)")
+    get_usage().record(app_name)
+    return pid, spawn_time
+
+
+def report_launch_error(app_name: str, error: Exception):
+    """输出启动失败或按策略跳过的原因"""
+    if isinstance(error, AlreadyLaunched):
+        print(f"跳过启动: {error}")
+    else:
+        print(f"启动 {app_name} 失败: {error}")
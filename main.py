@@ -1,67 +1,355 @@
-import time
+from profiler import startup
+from control import AlreadyRunning, ControlServer, acquire_instance_lock, send_command
+from bindings import SequenceMatcher
+from fuzzy import BackgroundIndex
+from groups import ITEM_PREFIX, run_group
+from hotkey import ChordDetector
+from launcher import AlreadyLaunched, get_launcher, launch_configured, report_launch_error
+from launcher import start_app as start_configured_app
+from prefetch import Prefetcher
+from settings import get_settings
+from usage import get_usage
+from metrics import get_metrics
+import tracing
+import ui
+import argparse
 import os
-from pynput import keyboard
-from select_window import MaterialSelectWindow
-from config import CustomConfigParser
+import sys
 import threading
-import tray_icon
+import time
+from concurrent.futures import Future
+
+# pynput、tkinter、PIL、pystray 都在第一次使用时才导入
+startup.record("imports", startup.origin)
 
 # items = ["选项一", "选项二", "选项三", "选项四", "选项五"]
 
-apps = {"Microsoft Edge":"microsoft-edge-stable"}
-trigger_keys = []
-parser = CustomConfigParser()
-config = parser.parse_file('config.ccf')
-for key in parser.get("general","trigger_keys"):
-    trigger_keys.append(eval(key))
-for app in parser.get("general","apps"):
-    apps[app] = parser.get("general","apps")[app]
+# 当前配置，配置文件修改后自动替换
+with startup.phase("config"):
+    settings = get_settings()
+
+# 使用记录，决定选择窗口中的顺序
+with startup.phase("usage"):
+    usage = get_usage()
+
+def prefetch_commands():
+    """有使用记录的应用中分数最高的几个的命令，在预读线程中调用"""
+    current = settings.current
+    if not current.prefetch_top:
+        return []
+    used = [app for app in usage.rank(current.apps) if app in usage.apps]
+    return [current.apps[app] for app in used[:current.prefetch_top]]
+
+# 选择窗口打开时唤醒，也可以按配置定时预读
+prefetcher = Prefetcher(prefetch_commands, lambda: settings.current.prefetch_interval)
+
+# 选择窗口的搜索索引在后台构建；启动后排序变化时复用已有的表，不在按键时构建
+picker_index = BackgroundIndex()
+
+def picker_items():
+    """选择窗口的条目和已经准备好的索引，索引还没准备好时在后台准备，完成后交给窗口"""
+    items = usage.rank(settings.current.launch_items())
+    index = picker_index.get(items)
+    if index is None:
+        picker_index.update(items)
+    return items, index
+
+def update_picker_index():
+    """使用记录改变了排序，为下次打开选择窗口准备索引"""
+    picker_index.update(usage.rank(settings.current.launch_items()))
+
+# 按键事件只写入追踪缓冲区，由后台线程输出，键盘钩子线程里不做 I/O
+tracer = tracing.get_tracer()
+KEY_PRESS = tracing.register_event("key.press")
+KEY_RELEASE = tracing.register_event("key.release")
+
+# 端到端延迟: 组合键凑齐 -> 界面线程唤醒 -> 窗口可见 -> 用户确认 -> 子进程启动
+metrics = get_metrics()
+trigger_wakeup = metrics.histogram("trigger.wakeup", "组合键凑齐到界面线程唤醒")
+picker_visible = metrics.histogram("picker.visible", "组合键凑齐到选择窗口映射到屏幕")
+picker_decision = metrics.histogram("picker.decision", "选择窗口可见到用户确认")
+launch_total = metrics.histogram("launch.total", "组合键凑齐到子进程启动")
+launch_group = metrics.histogram("launch.group", "启动组整组耗时")
+# 本次触发各阶段的时刻(perf_counter)，窗口关闭后清空
+phase_times = {"trigger": None, "visible": None}
+
+def on_trigger():
+    """请求显示选择窗口，可在任何线程调用"""
+    ui_loop = ui.get_ui()
+    if ui_loop is None:
+        # 选择窗口还没创建好
+        return
+    if phase_times["trigger"] is None:
+        phase_times["trigger"] = time.perf_counter()
+    ui_loop.post(ui.SHOW)
+
+def on_binding(app_name):
+    """应用快捷键匹配成功，在界面线程中启动，不经过选择窗口"""
+    ui_loop = ui.get_ui()
+    if ui_loop is None:
+        launch_app(app_name)
+    else:
+        ui_loop.call(launch_app, app_name)
 
-current_press_keys = []
-showing_gui = False
+# 组合键凑齐时由监听线程向界面线程提交显示命令
+chord_detector = ChordDetector(settings.current.trigger_keys, on_trigger)
+binding_matcher = SequenceMatcher(settings.current.bindings, on_binding, settings.current.binding_timeout)
+# 检测器当前使用的触发键和快捷键来自哪一份配置
+chord_settings = settings.current
 
 def on_press(key):
-    try:
-        if key not in current_press_keys:
-            print('字母键： {} 被按下'.format(key.char))
-            current_press_keys.append(key)
-    except AttributeError:
-        print('特殊键： {} 被按下'.format(key))
-        current_press_keys.append(key)
+    global chord_settings
+    # 配置重新加载后，在监听线程中切换触发键和快捷键，检测器只由这个线程修改
+    current = settings.current
+    if current is not chord_settings:
+        chord_settings = current
+        chord_detector.set_trigger_keys(current.trigger_keys)
+        binding_matcher.set_root(current.bindings, current.binding_timeout)
+    if tracer.level <= tracing.DEBUG:
+        tracer.emit(KEY_PRESS, key)
+    chord_detector.on_press(key)
+    binding_matcher.on_press(key)
 
 def on_release(key):
-    print('{} 释放了'.format(key))
-    current_press_keys.remove(key)
+    if tracer.level <= tracing.DEBUG:
+        tracer.emit(KEY_RELEASE, key)
+    chord_detector.on_release(key)
+    binding_matcher.on_release(key)
+
+def start_app(app_name):
+    """按应用的启动策略启动，返回 pid；失败时抛出 OSError、ValueError 或 AlreadyLaunched
+
+    启动、日志和使用记录与托盘共用 launcher.start_app，这里只加上端到端延迟和搜索索引更新
+    """
+    pid, _ = start_configured_app(app_name, settings.current)
+    if phase_times["trigger"] is not None:
+        launch_total.observe(time.perf_counter() - phase_times["trigger"])
+    update_picker_index()
+    return pid
+
+def start_group(group):
+    """启动整组应用，阻塞到全部启动完成，返回启动报告"""
+    current = settings.current
+    # 启动组的线程可能同时在启动，耗时用每次调用自己的返回值，不读共享的 last_spawn_time
+    report = run_group(group, lambda app_name: launch_configured(app_name, current)[1])
+    launch_group.observe(report.wall_time)
+    usage.record(ITEM_PREFIX + group.name)
+    update_picker_index()
+    print(report.summary())
+    return report
+
+def start_group_async(group) -> Future:
+    """在后台线程中启动整组应用，返回得到启动报告的 Future"""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(start_group(group))
+        except Exception as e:
+            print(f"启动组 {group.name} 失败: {e}")
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"group-{group.name}", daemon=True).start()
+    return future
 
 def launch_app(app_name):
+    """启动应用，返回 pid，失败或按策略跳过时返回 None；启动组在后台线程中启动，返回 None"""
     if not app_name:
+        return None
+    group = settings.current.group_for_item(app_name)
+    if group is not None:
+        start_group_async(group)
+        return None
+    try:
+        return start_app(app_name)
+    except (AlreadyLaunched, OSError, ValueError) as e:
+        report_launch_error(app_name, e)
+    return None
+
+def on_picker_confirm(app_name):
+    if app_name and phase_times["visible"] is not None:
+        picker_decision.observe(time.perf_counter() - phase_times["visible"])
+    launch_app(app_name)
+    phase_times["trigger"] = phase_times["visible"] = None
+
+def on_picker_mapped(event, window):
+    if event.widget is not window.root or phase_times["visible"] is not None:
         return
-    print(f"Launching {apps[app_name]}...")
-    os.popen(f"exec {apps[app_name]}", mode='r', buffering=-1)
+    phase_times["visible"] = time.perf_counter()
+    if phase_times["trigger"] is not None:
+        picker_visible.observe(phase_times["visible"] - phase_times["trigger"])
+
+# 界面命令，只在界面线程中执行
+def show_picker(window):
+    if phase_times["trigger"] is not None and phase_times["visible"] is None:
+        trigger_wakeup.observe(time.perf_counter() - phase_times["trigger"])
+    if window.visible:
+        # 窗口已经显示时不打断正在进行的输入，只提到最前
+        window.root.lift()
+        window.root.focus_force()
+        return
+    current = settings.current
+    if current.prefetch_top:
+        # 用户挑选的这段时间里预读常用应用
+        prefetcher.request()
+    window.icons.names = current.app_icons
+    window.present(*picker_items())
+
+def hide_picker(window):
+    window.hide()
+    phase_times["trigger"] = phase_times["visible"] = None
+
+def refresh_picker(window):
+    if window.visible:
+        current = settings.current
+        window.icons.names = current.app_icons
+        window.set_items(*picker_items())
+
+# 控制命令，由 perflaunchctl 通过控制套接字调用
+started_at = time.monotonic()
+# control_launch 等待启动组完成的上限(秒)；控制命令在同一个线程中逐个处理，超过后先回复，不阻塞其他命令
+CONTROL_GROUP_WAIT = 2.0
+
+def control_show(_argument):
+    on_trigger()
+    return ""
+
+def control_hide(_argument):
+    ui_loop = ui.get_ui()
+    if ui_loop is not None:
+        ui_loop.post(ui.HIDE)
+    return ""
+
+def control_launch(app_name):
+    group = settings.current.group_for_item(app_name)
+    if group is not None:
+        # 启动组在后台线程中启动，最多等 CONTROL_GROUP_WAIT 秒，完成时回复每个应用的启动耗时
+        future = start_group_async(group)
+        try:
+            return future.result(timeout=CONTROL_GROUP_WAIT).summary()
+        except TimeoutError:
+            return f"启动组 {group.name} 仍在启动中，完成后的报告见日志"
+        except Exception as e:
+            raise ValueError(f"启动组 {group.name} 失败: {e}")
+    if app_name not in settings.current.apps:
+        raise ValueError(f"没有这个应用: {app_name}")
+    try:
+        return str(start_app(app_name))
+    except AlreadyLaunched as e:
+        raise ValueError(f"跳过启动: {e}")
+    except OSError as e:
+        raise ValueError(f"启动 {app_name} 失败: {e}")
+
+def control_reload(_argument):
+    if not settings.reload():
+        raise ValueError("配置加载失败，继续使用旧配置")
+    ui_loop = ui.get_ui()
+    if ui_loop is not None:
+        ui_loop.post(ui.REFRESH)
+    return f"version {settings.version}"
+
+def control_stats(_argument):
+    current = settings.current
+    return "\n".join([
+        f"pid {os.getpid()}",
+        f"uptime {time.monotonic() - started_at:.1f}",
+        f"config_version {settings.version}",
+        f"apps {len(current.apps)}",
+        f"launches {get_launcher().processes.total_launches}",
+        f"last_spawn_ms {get_launcher().last_spawn_time * 1e3:.2f}",
+        f"prefetch {prefetcher.runs} runs {prefetcher.files_advised} files {prefetcher.bytes_advised >> 20}MiB",
+        get_launcher().processes.dump(),
+        metrics.dump(),
+    ])
+
+CONTROL_HANDLERS = {
+    "show": control_show,
+    "hide": control_hide,
+    "launch": control_launch,
+    "reload": control_reload,
+    "stats": control_stats,
+}
+
+# 单实例锁的文件描述符；描述符是普通整数，不会因为没有引用而被关闭，锁一直持有到进程退出
+_instance_lock = None
+
+def run_tray():
+    with startup.phase("tray"):
+        import tray_icon
+        icon = tray_icon.create_tray_icon()
+    icon.run()
 
 def main():
-    global showing_gui
-    listener = keyboard.Listener(
-        on_press=on_press,
-        on_release=on_release)
-    listener.start()
+    global _instance_lock
+    arg_parser = argparse.ArgumentParser(description="perflaunch 应用启动器")
+    arg_parser.add_argument("--startup-profile", action="store_true", help="打印启动各阶段耗时")
+    arg_parser.add_argument("--trace", choices=list(tracing.LEVELS), default="off",
+                            help="事件追踪级别，debug 会记录每次按键")
+    arg_parser.add_argument("--metrics-file", help="定期把延迟直方图以 Prometheus 文本格式写入此文件")
+    args = arg_parser.parse_args()
+
+    # 已经有实例在运行时，让它显示选择窗口后退出
+    try:
+        _instance_lock = acquire_instance_lock()
+    except AlreadyRunning:
+        try:
+            send_command("show")
+        except OSError as e:
+            print(f"perflaunch 已在运行，但无法连接: {e}")
+            sys.exit(1)
+        print("perflaunch 已在运行")
+        return
+
+    with startup.phase("control"):
+        ControlServer(CONTROL_HANDLERS).start()
+
+    tracer.level = tracing.LEVELS[args.trace]
+    if tracer.level < tracing.OFF:
+        tracer.start_flusher()
+
+    if args.metrics_file:
+        metrics.start_exporter(args.metrics_file)
+
+    with startup.phase("listener"):
+        from pynput import keyboard
+        listener = keyboard.Listener(
+            on_press=on_press,
+            on_release=on_release)
+        listener.start()
+
+    # 监视配置文件，修改后无需重启
+    with startup.phase("watcher"):
+        settings.watch()
+
+    prefetcher.start()
 
     # 启动托盘图标
-    tray_thread = threading.Thread(target=tray_icon.start_tray_icon, daemon=True)
+    tray_thread = threading.Thread(target=run_tray, name="tray", daemon=True)
     tray_thread.start()
 
+    # 启动时创建常驻选择窗口，主线程即界面线程，其他线程只通过 ui 提交命令
+    with startup.phase("first picker"):
+        from select_window import MaterialSelectWindow
+        window = MaterialSelectWindow(usage.rank(settings.current.launch_items()), on_picker_confirm, "请选择一个选项",
+                                      persistent=True)
+        window.root.bind("<Map>", lambda event: on_picker_mapped(event, window))
+        ui_loop = ui.install(window.root)
+        # 图标在线程池中加载，完成后回到界面线程
+        from icons import IconCache
+        window.icons = IconCache(ui_loop.call, names=settings.current.app_icons)
+        # 隐藏状态下先请求第一屏的图标
+        window.render_rows()
+        # 搜索索引在后台构建好后交给界面线程
+        picker_index.on_ready = lambda items, index: ui_loop.call(window.set_index, items, index)
+        picker_index.update(window.items)
+        ui_loop.register(ui.SHOW, lambda: show_picker(window), coalesce=True)
+        ui_loop.register(ui.HIDE, lambda: hide_picker(window), coalesce=True)
+        ui_loop.register(ui.REFRESH, lambda: refresh_picker(window), coalesce=True)
+
     print("Hello from perflaunch!")
-    while True:
-        time.sleep(0.01)
-        # print(f"Currently pressed keys: {current_press_keys}")
-        if set(trigger_keys) <= set(current_press_keys):
-            if not showing_gui:
-                showing_gui = True
-                window = MaterialSelectWindow(list(apps.keys()), launch_app, "请选择一个选项")
-                window.show()
-                showing_gui = False
-        else:
-            showing_gui = False
+    if args.startup_profile:
+        startup.report(wait_for=["tray"])
+    window.root.mainloop()
 
 
 if __name__ == "__main__":
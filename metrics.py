@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟直方图
+固定桶边界的直方图，记录一次只做一次二分查找和几个整数加法，可以在生产环境常开；
+结果以文本(stats 命令)或 Prometheus 文本格式输出
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from paths import atomic_write
+
+# 每个数量级 10 个对数等距的桶(相邻边界相差约 26%)，50 微秒到约 63 秒
+DEFAULT_BUCKETS = tuple(float(f"{10 ** (e / 10):.3g}") for e in range(-43, 19))
+
+
+class Histogram:
+    """固定桶的延迟直方图(单位: 秒)
+
+    计数不加锁: 多个线程同时记录时在 GIL 下极少丢失一次计数，对统计没有影响
+    """
+
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.bounds = tuple(buckets)
+        # 最后一个桶是 +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """按桶内线性插值估算分位数，没有数据时返回 nan"""
+        total = self.count
+        if not total:
+            return math.nan
+        rank = q * total
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                if i == len(self.bounds):
+                    # 落在 +Inf 桶里，只能报告最后一个边界
+                    return lower
+                return lower + (self.bounds[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+    def summary(self) -> str:
+        if not self.count:
+            return f"{self.name} count=0"
+        return (f"{self.name} count={self.count} mean={self.sum / self.count * 1e3:.2f}ms "
+                f"p50={self.quantile(0.5) * 1e3:.2f}ms p95={self.quantile(0.95) * 1e3:.2f}ms "
+                f"p99={self.quantile(0.99) * 1e3:.2f}ms")
+
+    def prometheus(self, prefix: str) -> List[str]:
+        name = f"{prefix}_{self.name.replace('.', '_')}_seconds"
+        lines = [f"# HELP {name} {self.help_text}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class Metrics:
+    """按名称管理直方图"""
+
+    def __init__(self, prefix: str = "perflaunch"):
+        self.prefix = prefix
+        self.histograms: Dict[str, Histogram] = {}
+        self._exporter: Optional[threading.Thread] = None
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """获取或创建直方图"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(name, help_text, buckets)
+        return histogram
+
+    def dump(self) -> str:
+        """每个直方图一行的文本摘要"""
+        return "\n".join(histogram.summary() for histogram in self.histograms.values())
+
+    def prometheus(self) -> str:
+        lines = []
+        for histogram in self.histograms.values():
+            lines.extend(histogram.prometheus(self.prefix))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path: str):
+        """写入 Prometheus 文本文件(可以交给 node_exporter 的 textfile collector)"""
+        atomic_write(file_path, self.prometheus().encode('utf-8'))
+
+    def start_exporter(self, file_path: str, interval: float = 10.0):
+        """后台线程定期写入 Prometheus 文本文件"""
+        if self._exporter is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_prometheus(file_path)
+                except OSError as e:
+                    print(f"无法写入指标文件: {e}")
+
+        self._exporter = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+
+
+_default_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """进程内共享的指标"""
+    return _default_metrics
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据目录与文件写入工具
+缓存、状态等文件的位置遵循 XDG 基础目录规范
+"""
+
+import os
+import tempfile
+
+APP_NAME = "perflaunch"
+
+
+def _xdg_dir(env_name: str, fallback: str) -> str:
+    base = os.environ.get(env_name) or os.path.expanduser(fallback)
+    path = os.path.join(base, APP_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_dir() -> str:
+    """缓存目录，可随时删除"""
+    return _xdg_dir("XDG_CACHE_HOME", "~/.cache")
+
+
+def state_dir() -> str:
+    """状态目录，保存使用记录等"""
+    return _xdg_dir("XDG_STATE_HOME", "~/.local/state")
+
+
+def runtime_dir() -> str:
+    """运行时目录，存放控制套接字和单实例锁；没有 XDG_RUNTIME_DIR 时使用 $TMPDIR(默认 /tmp)下按用户区分的目录
+
+    不用 tempfile.gettempdir()，它还会读取 TEMP/TMP 并在目录不可写时换成别的目录，与 perflaunchctl 不一致
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base:
+        path = os.path.join(base, APP_NAME)
+    else:
+        path = os.path.join(os.environ.get("TMPDIR") or "/tmp", f"{APP_NAME}-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.stat(path).st_uid != os.getuid():
+        # /tmp 是共享的，不能使用其他用户预先创建的目录
+        raise PermissionError(f"运行时目录不属于当前用户: {path}")
+    return path
+
+
+def socket_path() -> str:
+    """控制套接字路径，必须与 tools/perflaunchctl.c 中的规则一致"""
+    return os.path.join(runtime_dir(), "control.sock")
+
+
+def atomic_write(file_path: str, data: bytes):
+    """一次写入临时文件后重命名替换，写到一半崩溃也不会损坏原文件"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # 保留原文件的权限，mkstemp 默认只有 0600
+        try:
+            os.chmod(tmp_path, os.stat(file_path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可执行文件预读
+长时间空闲后第一次启动大型应用(例如 microsoft-edge-stable)，主要时间花在从磁盘读取可执行文件和共享库上。
+预读器按使用记录取最常用的几个应用，找到可执行文件，沿 ELF 的 PT_INTERP 和 DT_NEEDED 递归找出要加载的共享库
+(查找顺序与 ld.so 相同: DT_RPATH、LD_LIBRARY_PATH、DT_RUNPATH、ld.so.conf 中的目录、默认目录)，
+对每个文件调用 posix_fadvise(WILLNEED) 让内核在后台读入页缓存。
+#! 脚本会继续解析解释器。预读在一个最低 CPU 和 I/O 优先级的后台线程中进行，
+选择窗口打开时唤醒，也可以按固定间隔执行
+"""
+
+import glob
+import os
+import shlex
+import shutil
+import struct
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from launcher import parse_command
+
+PT_LOAD = 1
+PT_DYNAMIC = 2
+PT_INTERP = 3
+DT_NULL = 0
+DT_NEEDED = 1
+DT_STRTAB = 5
+DT_STRSZ = 10
+DT_RPATH = 15
+DT_RUNPATH = 29
+
+# 同一个应用在这段时间内预读过就跳过，页缓存大概率还在
+DEFAULT_MIN_INTERVAL = 300.0
+# 内核每次 WILLNEED 最多读入设备预读窗口大小(read_ahead_kb，默认 128KiB)，大文件按这个大小分段提交
+_ADVISE_WINDOW = 128 << 10
+# 没有 posix_fadvise 时直接读一遍文件
+_READ_CHUNK = 1 << 20
+
+# ioprio_set 的系统调用号，Python 没有封装
+_SYS_IOPRIO_SET = {"x86_64": 251, "aarch64": 30, "i386": 289, "i686": 289}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+
+# ELF 文件头和程序头中用到的字段，按 (位数, 字节序) 区分
+_HEADER = {32: "HHIIIIIHHH", 64: "HHIQQQIHHH"}
+_PHDR = {32: "IIIIIIII", 64: "IIQQQQQQ"}
+_DYN = {32: "iI", 64: "qQ"}
+
+
+class ElfInfo(NamedTuple):
+    elf_class: int
+    machine: int
+    # PT_INTERP 指定的动态链接器
+    interpreter: Optional[str]
+    needed: Tuple[str, ...]
+    rpath: Tuple[str, ...]
+    runpath: Tuple[str, ...]
+
+
+def _read_at(f, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(size)
+
+
+def read_elf(file_path: str) -> Optional[ElfInfo]:
+    """读取 ELF 的动态链接信息，不是 ELF 文件时返回 None，格式损坏时抛出 ValueError"""
+    with open(file_path, 'rb') as f:
+        ident = f.read(16)
+        if len(ident) < 16 or ident[:4] != b"\x7fELF":
+            return None
+        elf_class = {1: 32, 2: 64}.get(ident[4])
+        order = {1: "<", 2: ">"}.get(ident[5])
+        if elf_class is None or order is None:
+            raise ValueError(f"无法识别的 ELF 格式: {file_path}")
+        header_format = order + _HEADER[elf_class]
+        header = struct.unpack(header_format, f.read(struct.calcsize(header_format)))
+        machine, phoff, phentsize, phnum = header[1], header[4], header[8], header[9]
+
+        phdr_format = order + _PHDR[elf_class]
+        if phentsize < struct.calcsize(phdr_format):
+            raise ValueError(f"ELF 程序头过短: {file_path}")
+        table = _read_at(f, phoff, phentsize * phnum)
+        if len(table) < phentsize * phnum:
+            raise ValueError(f"ELF 程序头不完整: {file_path}")
+        loads = []
+        interpreter = None
+        dynamic = None
+        for i in range(phnum):
+            fields = struct.unpack_from(phdr_format, table, i * phentsize)
+            if elf_class == 64:
+                p_type, _, offset, vaddr, _, filesz = fields[:6]
+            else:
+                p_type, offset, vaddr, _, filesz = fields[:5]
+            if p_type == PT_LOAD:
+                loads.append((vaddr, filesz, offset))
+            elif p_type == PT_INTERP:
+                interpreter = _read_at(f, offset, filesz).split(b"\0", 1)[0].decode('utf-8', 'surrogateescape')
+            elif p_type == PT_DYNAMIC:
+                dynamic = (offset, filesz)
+        if dynamic is None:
+            # 静态链接
+            return ElfInfo(elf_class, machine, interpreter, (), (), ())
+
+        dyn_format = order + _DYN[elf_class]
+        dyn_size = struct.calcsize(dyn_format)
+        data = _read_at(f, *dynamic)
+        entries = []
+        for offset in range(0, len(data) - dyn_size + 1, dyn_size):
+            tag, value = struct.unpack_from(dyn_format, data, offset)
+            if tag == DT_NULL:
+                break
+            entries.append((tag, value))
+        values = dict(entries)
+        if DT_STRTAB not in values:
+            return ElfInfo(elf_class, machine, interpreter, (), (), ())
+        # DT_STRTAB 是虚拟地址，按 PT_LOAD 段换算为文件偏移
+        address = values[DT_STRTAB]
+        for vaddr, filesz, offset in loads:
+            if vaddr <= address < vaddr + filesz:
+                strtab = _read_at(f, offset + address - vaddr, values.get(DT_STRSZ, vaddr + filesz - address))
+                break
+        else:
+            raise ValueError(f"ELF 字符串表不在任何 PT_LOAD 段中: {file_path}")
+
+    def string(index: int) -> str:
+        return strtab[index:strtab.find(b"\0", index)].decode('utf-8', 'surrogateescape')
+
+    def paths(tag: int) -> Tuple[str, ...]:
+        return tuple(path for tag_, value in entries if tag_ == tag for path in string(value).split(":") if path)
+
+    needed = tuple(string(value) for tag, value in entries if tag == DT_NEEDED)
+    return ElfInfo(elf_class, machine, interpreter, needed, paths(DT_RPATH), paths(DT_RUNPATH))
+
+
+def _parse_ld_so_conf(file_path: str, seen: set) -> List[str]:
+    if file_path in seen:
+        return []
+    seen.add(file_path)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    dirs = []
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("hwcap "):
+            continue
+        if line.startswith("include "):
+            for pattern in shlex.split(line[len("include "):]):
+                pattern = os.path.join(os.path.dirname(file_path), pattern)
+                for included in sorted(glob.glob(pattern)):
+                    dirs.extend(_parse_ld_so_conf(included, seen))
+        else:
+            dirs.append(line)
+    return dirs
+
+
+@lru_cache(maxsize=None)
+def system_library_dirs(elf_class: int = 64) -> Tuple[str, ...]:
+    """ld.so.conf 中的目录和默认目录，相当于 ld.so.cache 覆盖的范围"""
+    dirs = _parse_ld_so_conf("/etc/ld.so.conf", set())
+    if elf_class == 64:
+        dirs += ["/lib64", "/usr/lib64"]
+    dirs += ["/lib", "/usr/lib"]
+    return tuple(dict.fromkeys(dirs))
+
+
+def _expand_origin(paths: Sequence[str], origin: str, elf_class: int) -> List[str]:
+    lib = "lib64" if elf_class == 64 else "lib"
+    return [path.replace("$ORIGIN", origin).replace("${ORIGIN}", origin)
+            .replace("$LIB", lib).replace("${LIB}", lib) for path in paths]
+
+
+def find_library(name: str, info: ElfInfo, origin: str) -> Optional[str]:
+    """按 ld.so 的顺序查找 DT_NEEDED 中的库，只接受位数和架构相同的文件"""
+    if "/" in name:
+        return name if os.path.isfile(name) else None
+    dirs: List[str] = []
+    if not info.runpath:
+        dirs += _expand_origin(info.rpath, origin, info.elf_class)
+    dirs += [path for path in os.environ.get("LD_LIBRARY_PATH", "").replace(";", ":").split(":") if path]
+    dirs += _expand_origin(info.runpath, origin, info.elf_class)
+    dirs += system_library_dirs(info.elf_class)
+    for directory in dirs:
+        candidate = os.path.join(directory, name)
+        try:
+            library = read_elf(candidate)
+        except (OSError, ValueError):
+            continue
+        if library is not None and (library.elf_class, library.machine) == (info.elf_class, info.machine):
+            return candidate
+    return None
+
+
+def _script_interpreter(file_path: str) -> Optional[str]:
+    """#! 脚本的解释器，/usr/bin/env 时继续在 PATH 中查找"""
+    with open(file_path, 'rb') as f:
+        line = f.readline(256)
+    if not line.startswith(b"#!"):
+        return None
+    words = line[2:].decode('utf-8', 'surrogateescape').split()
+    if not words:
+        return None
+    if os.path.basename(words[0]) == "env":
+        names = [word for word in words[1:] if not word.startswith("-")]
+        return shutil.which(names[0]) if names else words[0]
+    return words[0]
+
+
+def resolve_files(executable: str) -> List[str]:
+    """可执行文件启动时要读取的文件: 自身、解释器、动态链接器和全部依赖库(去重后的真实路径)"""
+    files: Dict[str, None] = {}
+    pending = [executable]
+    while pending:
+        path = os.path.realpath(pending.pop())
+        if path in files:
+            continue
+        try:
+            info = read_elf(path)
+            if info is None:
+                interpreter = _script_interpreter(path)
+                files[path] = None
+                if interpreter is not None:
+                    pending.append(interpreter)
+                continue
+        except (OSError, ValueError):
+            continue
+        files[path] = None
+        if info.interpreter is not None:
+            pending.append(info.interpreter)
+        origin = os.path.dirname(path)
+        for name in reversed(info.needed):
+            library = find_library(name, info, origin)
+            if library is not None:
+                pending.append(library)
+    return list(files)
+
+
+def command_executable(command: str) -> Optional[str]:
+    """命令对应的可执行文件，需要 shell 的命令取第一个不是环境变量赋值的词"""
+    try:
+        executable, argv = parse_command(command)
+        if executable != "/bin/sh" or argv[:2] != ["/bin/sh", "-c"]:
+            return executable
+        words = [word for word in shlex.split(command) if "=" not in word]
+    except (OSError, ValueError):
+        return None
+    return shutil.which(words[0]) if words else None
+
+
+def prefetch_file(file_path: str) -> int:
+    """让内核把整个文件读入页缓存，不等待读取完成，返回文件大小"""
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    try:
+        size = os.fstat(fd).st_size
+        if hasattr(os, "posix_fadvise"):
+            for offset in range(0, size, _ADVISE_WINDOW):
+                os.posix_fadvise(fd, offset, _ADVISE_WINDOW, os.POSIX_FADV_WILLNEED)
+        else:
+            buffer = bytearray(_READ_CHUNK)
+            while os.readv(fd, [buffer]) == _READ_CHUNK:
+                pass
+        return size
+    finally:
+        os.close(fd)
+
+
+def lower_thread_priority():
+    """把当前线程降到最低 CPU 优先级和空闲 I/O 优先级，不支持时忽略"""
+    tid = threading.get_native_id()
+    try:
+        os.sched_setscheduler(tid, os.SCHED_IDLE, os.sched_param(0))
+    except (AttributeError, OSError):
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, 19)
+        except (AttributeError, OSError):
+            pass
+    number = _SYS_IOPRIO_SET.get(os.uname().machine)
+    if number is None:
+        return
+    try:
+        # 只有预读线程用到，不在启动时导入
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.syscall(number, _IOPRIO_WHO_PROCESS, tid, _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT)
+    except (AttributeError, OSError):
+        pass
+
+
+class Prefetcher:
+    """后台预读线程
+
+    commands() 返回要预读的命令(已经按使用记录排好序并截取前几个)，在预读线程中调用；
+    interval() 返回定时预读的间隔(秒)，0 表示只在 request() 时预读
+    """
+
+    def __init__(self, commands: Callable[[], List[str]], interval: Callable[[], float] = lambda: 0.0,
+                 min_interval: float = DEFAULT_MIN_INTERVAL):
+        self.commands = commands
+        self.interval = interval
+        self.min_interval = min_interval
+        self._condition = threading.Condition()
+        self._requested = False
+        self._thread: Optional[threading.Thread] = None
+        # 可执行文件 -> ((inode, 大小, mtime), 要预读的文件)
+        self._files: Dict[str, Tuple[Tuple[int, int, int], List[str]]] = {}
+        # 命令 -> 上次预读的时刻(monotonic)
+        self._last: Dict[str, float] = {}
+        self.runs = 0
+        self.files_advised = 0
+        self.bytes_advised = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """请求尽快预读一次，可在任何线程调用，只是唤醒预读线程"""
+        with self._condition:
+            self._requested = True
+            self._condition.notify()
+
+    def _run(self):
+        lower_thread_priority()
+        while True:
+            with self._condition:
+                if not self._requested:
+                    # 间隔在每次唤醒后重新读取，配置修改后下一轮生效
+                    self._condition.wait(self.interval() or None)
+                self._requested = False
+            try:
+                self.prefetch(self.commands())
+            except Exception as e:
+                print(f"预读失败: {e}")
+
+    def files_for(self, executable: str) -> List[str]:
+        """可执行文件要预读的文件，可执行文件没有变化时使用上次的结果"""
+        st = os.stat(executable)
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        cached = self._files.get(executable)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        files = resolve_files(executable)
+        self._files[executable] = (key, files)
+        return files
+
+    def prefetch(self, commands: Sequence[str]) -> int:
+        """预读这些命令用到的文件，返回提交预读的字节数"""
+        now = time.monotonic()
+        total = 0
+        for command in commands:
+            last = self._last.get(command)
+            if last is not None and now - last < self.min_interval:
+                continue
+            self._last[command] = now
+            executable = command_executable(command)
+            if executable is None:
+                continue
+            try:
+                files = self.files_for(executable)
+            except OSError:
+                continue
+            for file_path in files:
+                try:
+                    total += prefetch_file(file_path)
+                except OSError:
+                    continue
+                self.files_advised += 1
+        self.runs += 1
+        self.bytes_advised += total
+        return total
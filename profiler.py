@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析
+按阶段记录启动过程的耗时，--startup-profile 时打印各阶段明细，便于发现启动变慢
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+
+# 本模块被导入的时刻，作为各阶段的时间原点
+_ORIGIN = time.perf_counter()
+
+
+def _process_age() -> Optional[float]:
+    """进程从创建到现在的秒数(含解释器启动)，只在 Linux 上可用"""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            # comm 字段可能含空格，从最后一个 ")" 之后开始数: starttime 是第 22 个字段
+            fields = f.read().rsplit(b")", 1)[1].split()
+        start_ticks = int(fields[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+_INTERPRETER_TIME = _process_age()
+
+
+class StartupProfiler:
+    """启动阶段计时
+
+    阶段可以在任意线程中记录；report 会等待仍在进行的阶段(例如托盘线程)结束后再输出
+    """
+
+    def __init__(self):
+        self.origin = _ORIGIN
+        # (阶段名, 开始时刻, 耗时, 线程名)
+        self.phases: List[Tuple[str, float, float, str]] = []
+        self._open = 0
+        self._condition = threading.Condition()
+
+    def record(self, name: str, start: float):
+        """记录从 start 到现在的阶段"""
+        elapsed = time.perf_counter() - start
+        with self._condition:
+            self.phases.append((name, start - self.origin, elapsed, threading.current_thread().name))
+            self._condition.notify_all()
+
+    @contextmanager
+    def phase(self, name: str):
+        """with 块作为一个阶段计时"""
+        with self._condition:
+            self._open += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+            with self._condition:
+                self._open -= 1
+                self._condition.notify_all()
+
+    def report(self, wait_for: Iterable[str] = (), timeout: float = 5.0):
+        """打印各阶段耗时，wait_for 中的阶段(可能还没开始)记录完成后再输出"""
+        wait_for = set(wait_for)
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._open == 0 and wait_for <= {phase[0] for phase in self.phases}, timeout)
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        total = time.perf_counter() - self.origin
+        print("启动耗时分析:")
+        if _INTERPRETER_TIME is not None:
+            print(f"  {'解释器启动':<14} {'':>9} {_INTERPRETER_TIME * 1e3:9.1f}ms")
+        for name, offset, elapsed, thread_name in phases:
+            thread = "" if thread_name == "MainThread" else f"  [{thread_name}]"
+            print(f"  {name:<14} +{offset * 1e3:7.1f}ms {elapsed * 1e3:9.1f}ms{thread}")
+        print(f"  {'合计':<14} {'':>9} {total * 1e3:9.1f}ms")
+
+
+startup = StartupProfiler()
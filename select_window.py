@@ -6,16 +6,36 @@
 # @Software: PyCharm
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Callable, Any
+from typing import List, Callable, Any, Optional
+
+from fuzzy import FuzzyIndex
 
 class MaterialSelectWindow:
-    def __init__(self, list_items: List[str], callback: Callable[[Any], None], title: str = "Select Item"):
+    def __init__(self, list_items: List[str], callback: Callable[[Any], None], title: str = "Select Item",
+                 persistent: bool = False, visible_rows: int = 5, index: Optional[FuzzyIndex] = None,
+                 icons=None):
         self.item_labels = None
         self.style = None
         self.main_frame = None
         self.items = list_items
         self.callback = callback
         self.selected_index = 0
+        # 输入过滤: 索引由调用方在后台准备好后传入(index= 或 set_index)；
+        # 没有传入时才在第一次输入时构建。view 为当前显示条目在 items 中的下标
+        self.index = index
+        self.query = ""
+        self.query_label = None
+        self.view = list(range(len(self.items)))
+        # 虚拟列表: 只为可见行创建固定数量的标签，滚动时复用
+        self.visible_rows = visible_rows
+        self.first_visible = 0
+        # 图标(icons.IconCache)，在后台加载，到达后只重绘对应的行
+        self.icons = icons
+        # 常驻模式: 确认/取消后只隐藏窗口，下次触发时直接复用
+        self.persistent = persistent
+        # show() 正在运行自己的事件循环；由 UiLoop 驱动时为假，关闭窗口不退出事件循环
+        self.blocking = False
+        self.visible = not self.persistent
 
         # 创建主窗口
         self.root = tk.Tk()
@@ -31,6 +51,12 @@ class MaterialSelectWindow:
         # 初始化选择状态
         self.update_selection()
 
+        if self.persistent:
+            # 预先完成布局计算，然后隐藏等待触发
+            self.root.protocol("WM_DELETE_WINDOW", self.cancel)
+            self.root.update_idletasks()
+            self.root.withdraw()
+
     def setup_styles(self):
         """设置Material Design样式"""
         self.style = ttk.Style()
@@ -39,6 +65,8 @@ class MaterialSelectWindow:
                              font=("Roboto", 12))
         self.style.configure("Selected.TLabel", background="#e3f2fd", foreground="#1976d2",
                              font=("Roboto", 12, "bold"))
+        self.style.configure("Query.TLabel", background="#ffffff", foreground="#757575",
+                             font=("Roboto", 11))
 
     def create_widgets(self):
         """创建界面组件"""
@@ -46,14 +74,14 @@ class MaterialSelectWindow:
         self.main_frame = ttk.Frame(self.root, style="Material.TFrame")
         self.main_frame.pack(fill="both", expand=True, padx=16, pady=16)
 
-        # 创建列表项
+        # 搜索输入显示
+        self.query_label = ttk.Label(self.main_frame, style="Query.TLabel", padding=(16, 4))
+        self.query_label.pack(fill="x")
+        self.update_query_label()
+
+        # 创建列表行
         self.item_labels = []
-        for i, item in enumerate(self.items):
-            label = ttk.Label(self.main_frame, text=item, style="Material.TLabel",
-                              padding=(16, 12), cursor="hand2")
-            label.pack(fill="x", pady=2)
-            label.bind("<Button-1>", lambda e, idx=i: self.on_item_click(idx))
-            self.item_labels.append(label)
+        self.create_rows()
 
         # 底部按钮区域
         button_frame = ttk.Frame(self.main_frame, style="Material.TFrame")
@@ -71,61 +99,201 @@ class MaterialSelectWindow:
 
         button_frame.pack_forget()
 
+    def create_rows(self):
+        """创建固定数量的行标签，与列表长度无关"""
+        for row in range(self.visible_rows):
+            label = ttk.Label(self.main_frame, style="Material.TLabel",
+                              padding=(16, 12), cursor="hand2")
+            label.pack(fill="x", pady=2)
+            label.bind("<Button-1>", lambda e, r=row: self.on_row_click(r))
+            self.item_labels.append(label)
+        self.render_rows()
+
+    def render_rows(self):
+        """把 view 中从 first_visible 开始的条目填入行标签"""
+        for row, label in enumerate(self.item_labels):
+            position = self.first_visible + row
+            if position < len(self.view):
+                text = self.items[self.view[position]]
+            else:
+                text = ""
+            self.style_row(row, position == self.selected_index and position < len(self.view), text,
+                           self.row_icon(row, text))
+
+    def row_icon(self, row: int, text: str):
+        """行的图标，尚未加载时先用占位图，加载完成后只更新这一行"""
+        if self.icons is None:
+            return None
+        if not text:
+            return ""
+        image = self.icons.request(text, lambda loaded: self.on_icon_ready(row, text, loaded))
+        return image if image is not None else self.icons.placeholder()
+
+    def on_icon_ready(self, row: int, text: str, image):
+        # 图标到达前这一行可能已经滚动到其他条目
+        if self.item_labels[row].cget("text") == text:
+            self.item_labels[row].configure(image=image)
+
+    def style_row(self, row: int, selected: bool, text: Optional[str] = None, image=None):
+        """设置一行的样式，text 为 None 时保留原文字，image 为 None 时保留原图标"""
+        options = {"style": "Selected.TLabel", "background": "#e3f2fd"} if selected else \
+            {"style": "Material.TLabel", "background": "#ffffff"}
+        if text is not None:
+            options["text"] = text
+        if image is not None:
+            options["image"] = image
+            options["compound"] = "left"
+        self.item_labels[row].configure(**options)
+
+    def set_items(self, list_items: List[str], index: Optional[FuzzyIndex] = None):
+        """更新列表内容，内容未变化时保留索引；index 必须是按 list_items 的顺序准备的索引"""
+        self.selected_index = 0
+        if list_items is not self.items and list_items != self.items:
+            self.items = list(list_items)
+            self.index = index
+            self.query = ""
+            self.view = list(range(len(self.items)))
+            self.update_query_label()
+        else:
+            if self.index is None:
+                self.index = index
+            if self.query:
+                self.set_query("")
+                return
+        self.first_visible = 0
+        self.render_rows()
+
+    def set_index(self, list_items: List[str], index: FuzzyIndex):
+        """后台准备好的索引，列表在此期间没有变化时才使用"""
+        if self.index is None and list_items == self.items:
+            self.index = index
+
+    def set_query(self, query: str):
+        """按输入过滤列表"""
+        self.query = query
+        if self.index is None:
+            self.index = FuzzyIndex(self.items)
+        self.view = self.index.search(query)
+        self.selected_index = 0
+        self.first_visible = 0
+        self.update_query_label()
+        self.render_rows()
+
+    def update_query_label(self):
+        """更新搜索输入显示"""
+        self.query_label.configure(text=f"🔍 {self.query}" if self.query else "🔍 输入以搜索")
+
+    def on_key_input(self, event):
+        """输入可打印字符时追加到搜索词"""
+        # 忽略 Control / Alt 组合键
+        if event.char and event.char.isprintable() and not event.state & 0x000C:
+            self.set_query(self.query + event.char)
+
+    def on_backspace(self, event=None):
+        """删除搜索词最后一个字符"""
+        if self.query:
+            self.set_query(self.query[:-1])
+        str(event)
+
     def bind_events(self):
         """绑定键盘事件"""
         self.root.bind("<Up>", self.move_up)
         self.root.bind("<Down>", self.move_down)
         self.root.bind("<Return>", lambda e: self.confirm())
         self.root.bind("<Escape>", lambda e: self.cancel())
+        self.root.bind("<BackSpace>", self.on_backspace)
+        self.root.bind("<Key>", self.on_key_input)
+        self.root.bind("<Button-4>", self.move_up)
+        self.root.bind("<Button-5>", self.move_down)
         self.root.focus_set()
 
-    def update_selection(self):
-        """更新选择状态显示"""
-        for i, label in enumerate(self.item_labels):
-            if i == self.selected_index:
-                label.configure(style="Selected.TLabel")
-                label.configure(background="#e3f2fd")  # 滚动到可视区域
-                label.update_idletasks()
-            else:
-                label.configure(style="Material.TLabel")
-                label.configure(background="#ffffff")
+    def update_selection(self, previous_index: Optional[int] = None):
+        """更新选择状态显示，只重绘新旧两行；选择移出可见区域时滚动"""
+        if not self.view:
+            return
+        if self.selected_index < self.first_visible:
+            self.first_visible = self.selected_index
+            self.render_rows()
+        elif self.selected_index >= self.first_visible + self.visible_rows:
+            self.first_visible = self.selected_index - self.visible_rows + 1
+            self.render_rows()
+        else:
+            if previous_index is not None and 0 <= previous_index - self.first_visible < self.visible_rows:
+                self.style_row(previous_index - self.first_visible, False)
+            self.style_row(self.selected_index - self.first_visible, True)
 
     def move_up(self, event=None):
         """向上移动选择"""
         if self.selected_index > 0:
             self.selected_index -= 1
-            self.update_selection()
+            self.update_selection(self.selected_index + 1)
         str(event)
 
     def move_down(self, event=None):
         """向下移动选择"""
-        if self.selected_index < len(self.items) - 1:
+        if self.selected_index < len(self.view) - 1:
             self.selected_index += 1
-            self.update_selection()
+            self.update_selection(self.selected_index - 1)
         str(event)
 
-    def on_item_click(self, index):
-        """点击项目"""
-        self.selected_index = index
-        self.update_selection()
+    def on_row_click(self, row):
+        """点击某一行"""
+        position = self.first_visible + row
+        if position >= len(self.view):
+            return
+        previous_index, self.selected_index = self.selected_index, position
+        self.update_selection(previous_index)
         self.confirm()
 
     def confirm(self):
         """确认选择"""
-        selected_item = self.items[self.selected_index]
-        self.root.destroy()
+        selected_item = self.items[self.view[self.selected_index]] if self.view else None
+        self.close()
         if self.callback:
             self.callback(selected_item)
 
     def cancel(self):
         """取消选择"""
-        self.root.destroy()
+        self.close()
         if self.callback:
             self.callback(None)
 
-    def show(self):
-        """显示窗口"""
-        self.root.mainloop()
+    def close(self):
+        """关闭窗口，常驻模式下只隐藏，并退出 show() 的事件循环"""
+        self.visible = False
+        if self.persistent:
+            self.root.withdraw()
+            if self.blocking:
+                self.root.quit()
+        else:
+            self.root.destroy()
+
+    def present(self, list_items: Optional[List[str]] = None, index: Optional[FuzzyIndex] = None):
+        """显示常驻窗口但不进入事件循环，用于已经在运行的事件循环中(见 ui.UiLoop)"""
+        if list_items is not None:
+            self.set_items(list_items, index)
+        self.visible = True
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+
+    def hide(self):
+        """隐藏窗口，不调用回调"""
+        self.visible = False
+        self.root.withdraw()
+
+    def show(self, list_items: Optional[List[str]] = None, index: Optional[FuzzyIndex] = None):
+        """显示窗口，关闭前不返回"""
+        if self.persistent:
+            self.present(list_items, index)
+        elif list_items is not None:
+            self.set_items(list_items, index)
+        self.blocking = True
+        try:
+            self.root.mainloop()
+        finally:
+            self.blocking = False
+        self.visible = not self.persistent
 
 # 使用示例
 def example_callback(selected_item):
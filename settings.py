@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行时配置
+配置文件解析为不可变的 Settings 对象，修改后在后台重新解析并整体替换；
+读取方每次使用时取一次 current，不需要加锁
+"""
+
+import os
+import threading
+import time
+from types import MappingProxyType, SimpleNamespace
+from typing import Dict, FrozenSet, Hashable, List, Mapping, NamedTuple, Optional
+
+from bindings import BindingNode, compile_bindings
+from catalog import AppCatalog
+from config import CustomConfigParser, DropInConfig
+from expr_eval import evaluate
+from groups import DEFAULT_PARALLEL, ITEM_PREFIX, LaunchGroup, parse_groups
+from launcher import DEBOUNCE, POLICIES
+from watcher import DirectoryWatcher, FileWatcher
+
+CONFIG_PATH = 'config.ccf'
+# 配置文件中没有任何应用时的默认值
+DEFAULT_APPS = {"Microsoft Edge": "microsoft-edge-stable"}
+# 没有为应用单独配置时的重复启动策略和去抖间隔(毫秒)
+DEFAULT_POLICY = DEBOUNCE
+DEFAULT_DEBOUNCE_MS = 500
+# 快捷键序列中两次按键的最大间隔(毫秒)
+DEFAULT_BINDING_TIMEOUT_MS = 1000
+# 预读最常用的几个应用，0 表示不预读；定时预读的间隔(秒)，0 表示只在选择窗口打开时预读
+DEFAULT_PREFETCH_TOP = 0
+DEFAULT_PREFETCH_INTERVAL = 0
+
+
+class Settings(NamedTuple):
+    """一次解析得到的完整配置，创建后不再修改"""
+    trigger_keys: FrozenSet[Hashable]
+    apps: Mapping[str, str]
+    desktop_entries: bool
+    path_executables: bool
+    # 应用名 -> 图标名或路径，来自 .desktop 文件
+    app_icons: Mapping[str, str]
+    launch_policies: Mapping[str, str]
+    default_policy: str
+    # 去抖间隔(秒)
+    debounce: float
+    # 应用快捷键编译成的前缀树，以及序列超时(秒)
+    bindings: BindingNode
+    binding_timeout: float
+    # 启动组名 -> 启动组
+    groups: Mapping[str, LaunchGroup]
+    prefetch_top: int
+    prefetch_interval: float
+
+    def launch_policy(self, app_name: str) -> str:
+        return self.launch_policies.get(app_name, self.default_policy)
+
+    def launch_items(self) -> List[str]:
+        """选择窗口中可以启动的条目: 应用名和带 @ 前缀的启动组名"""
+        return list(self.apps) + [ITEM_PREFIX + name for name in self.groups]
+
+    def group_for_item(self, item: str) -> Optional[LaunchGroup]:
+        """条目对应的启动组，不是启动组时返回 None"""
+        if item.startswith(ITEM_PREFIX):
+            return self.groups.get(item[len(ITEM_PREFIX):])
+        return None
+
+
+_key_symbols: Optional[Dict[str, object]] = None
+
+
+def key_symbols() -> Dict[str, object]:
+    """按键表达式可以使用的名称: 只有 keyboard.Key 和 keyboard.KeyCode，不是整个 pynput 模块"""
+    global _key_symbols
+    if _key_symbols is None:
+        from pynput import keyboard
+        _key_symbols = {"keyboard": SimpleNamespace(Key=keyboard.Key, KeyCode=keyboard.KeyCode)}
+    return _key_symbols
+
+
+def resolve_key(name: str):
+    """把配置中的 keyboard.Key.alt_l 这类表达式转换为 pynput 按键对象"""
+    return evaluate(name, key_symbols())
+
+
+def resolve_key_name(name: str):
+    """把快捷键中的键名转换为 pynput 按键对象: 单个字符、Key 的成员名(alt_l、space)或 keyboard.Key.xxx"""
+    from pynput import keyboard
+    if name.startswith("keyboard."):
+        return resolve_key(name)
+    if len(name) == 1:
+        return keyboard.KeyCode.from_char(name)
+    try:
+        return keyboard.Key[name]
+    except KeyError:
+        raise ValueError(f"未知的键名: {name}")
+
+
+class LiveSettings:
+    """持有当前配置，文件变化时重新加载
+
+    新配置完全构建好之后才替换 current，读取方看到的总是某个完整版本；
+    解析失败时保留上一份可用的配置
+    """
+
+    def __init__(self, file_path: str = CONFIG_PATH):
+        self.file_path = file_path
+        self._catalog: Optional[AppCatalog] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[FileWatcher] = None
+        self._drop_in_watcher: Optional[DirectoryWatcher] = None
+        # 主配置文件加上 config.d/*.ccf 片段，未变化的文件不重新解析
+        self._config = DropInConfig(file_path)
+        self.current: Settings = self._load()
+        # 配置版本号，每次成功加载加 1
+        self.version = 1
+
+    def _load(self) -> Settings:
+        parser = CustomConfigParser()
+        parser.config = self._config.load()
+        trigger_keys = frozenset(resolve_key(key) for key in parser.get("general", "trigger_keys", []))
+        apps: Dict[str, str] = dict(DEFAULT_APPS)
+        apps.update(parser.get("general", "apps", {}))
+        app_icons: Dict[str, str] = {}
+        desktop_entries = bool(parser.get("catalog", "desktop_entries", False))
+        path_executables = bool(parser.get("catalog", "path_executables", False))
+        # 自动发现的应用排在配置的应用之后，同名时以配置为准
+        if desktop_entries or path_executables:
+            catalog = self._catalog
+            if catalog is None or (bool(catalog.desktop_roots), bool(catalog.executable_dirs)) != \
+                    (desktop_entries, path_executables):
+                catalog = self._catalog = AppCatalog(desktop=desktop_entries, executables=path_executables)
+            for app, command in catalog.load().items():
+                apps.setdefault(app, command)
+            app_icons = catalog.icons()
+        default_policy = parser.get("launch", "default", DEFAULT_POLICY)
+        launch_policies: Dict[str, str] = dict(parser.get("launch", "policies", {}))
+        for policy in (default_policy, *launch_policies.values()):
+            if policy not in POLICIES:
+                raise ValueError(f"未知的启动策略: {policy} (可选 {', '.join(POLICIES)})")
+        debounce = parser.get("launch", "debounce_ms", DEFAULT_DEBOUNCE_MS) / 1000
+        bindings = compile_bindings(parser.get("bindings", "apps", {}), resolve_key_name)
+        binding_timeout = parser.get("bindings", "timeout_ms", DEFAULT_BINDING_TIMEOUT_MS) / 1000
+        groups = parse_groups(parser.config, parser.get("launch", "parallel", DEFAULT_PARALLEL))
+        prefetch_top = parser.get("prefetch", "top", DEFAULT_PREFETCH_TOP)
+        prefetch_interval = parser.get("prefetch", "interval_s", DEFAULT_PREFETCH_INTERVAL)
+        if not isinstance(prefetch_top, int) or prefetch_top < 0 or prefetch_interval < 0:
+            raise ValueError("[prefetch] 的 top 必须是非负整数，interval_s 不能为负数")
+        return Settings(trigger_keys, MappingProxyType(apps), desktop_entries, path_executables,
+                        MappingProxyType(app_icons),
+                        MappingProxyType(launch_policies), default_policy, debounce,
+                        bindings, binding_timeout, MappingProxyType(groups),
+                        prefetch_top, float(prefetch_interval))
+
+    def reload(self) -> bool:
+        """重新加载配置，返回是否成功"""
+        with self._reload_lock:
+            start = time.perf_counter()
+            try:
+                settings = self._load()
+            except Exception as e:
+                # 语法错误、找不到按键名、文件暂时不存在等，继续使用旧配置
+                print(f"配置加载失败，继续使用旧配置: {e}")
+                return False
+            self.current = settings
+            self.version += 1
+        print(f"配置已重新加载 (版本 {self.version}, 重新解析 {self._config.reparsed} 个文件, "
+              f"{(time.perf_counter() - start) * 1e3:.1f}ms)")
+        return True
+
+    def watch(self):
+        """开始监视配置文件和片段目录(启动时存在的话)"""
+        if self._watcher is None:
+            self._watcher = FileWatcher(self.file_path, self.reload)
+            self._watcher.start()
+        if self._drop_in_watcher is None and os.path.isdir(self._config.drop_in_dir):
+            self._drop_in_watcher = DirectoryWatcher(self._config.drop_in_dir, DropInConfig.SUFFIX, self.reload)
+            self._drop_in_watcher.start()
+
+
+_live_settings: Optional[LiveSettings] = None
+_live_settings_lock = threading.Lock()
+
+
+def get_settings() -> LiveSettings:
+    """进程内共享的配置"""
+    global _live_settings
+    if _live_settings is None:
+        with _live_settings_lock:
+            if _live_settings is None:
+                _live_settings = LiveSettings()
+    return _live_settings
@@ -0,0 +1,133 @@
+/*
+ * perflaunchctl - perflaunch 控制客户端
+ *
+ * 把命令行参数拼成一行发送到守护进程的控制套接字，打印回复正文。
+ * 不需要启动 Python，适合绑定到窗口管理器快捷键或在脚本中调用:
+ *
+ *     cc -O2 -o perflaunchctl tools/perflaunchctl.c
+ *     perflaunchctl show
+ *     perflaunchctl launch "Microsoft Edge"
+ *     perflaunchctl reload
+ *     perflaunchctl stats
+ *
+ * 套接字路径规则与 paths.socket_path() 一致:
+ * $XDG_RUNTIME_DIR/perflaunch/control.sock，没有 XDG_RUNTIME_DIR 时为
+ * $TMPDIR(默认 /tmp)/perflaunch-<uid>/control.sock
+ *
+ * 退出码: 0 成功，1 守护进程返回错误，2 用法错误，3 无法连接
+ */
+
+#include <errno.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/socket.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+#define REQUEST_MAX 4096
+
+static int socket_path(char *buf, size_t size)
+{
+    const char *runtime = getenv("XDG_RUNTIME_DIR");
+    int n;
+
+    if (runtime && *runtime) {
+        n = snprintf(buf, size, "%s/perflaunch/control.sock", runtime);
+    } else {
+        const char *tmp = getenv("TMPDIR");
+        if (!tmp || !*tmp)
+            tmp = "/tmp";
+        n = snprintf(buf, size, "%s/perflaunch-%u/control.sock", tmp, (unsigned)getuid());
+    }
+    return n > 0 && (size_t)n < size ? 0 : -1;
+}
+
+static int write_all(int fd, const char *data, size_t len)
+{
+    while (len > 0) {
+        ssize_t n = write(fd, data, len);
+        if (n < 0) {
+            if (errno == EINTR)
+                continue;
+            return -1;
+        }
+        data += n;
+        len -= (size_t)n;
+    }
+    return 0;
+}
+
+int main(int argc, char **argv)
+{
+    char request[REQUEST_MAX];
+    char reply[8192];
+    struct sockaddr_un addr;
+    size_t len = 0;
+    int fd, i, ok = -1, in_body = 0;
+    ssize_t n;
+
+    if (argc < 2) {
+        fprintf(stderr, "用法: %s show | hide | launch <名称> | reload | stats\n", argv[0]);
+        return 2;
+    }
+
+    for (i = 1; i < argc; i++) {
+        size_t arg_len = strlen(argv[i]);
+        if (len + arg_len + 2 > sizeof(request)) {
+            fprintf(stderr, "命令过长\n");
+            return 2;
+        }
+        if (i > 1)
+            request[len++] = ' ';
+        memcpy(request + len, argv[i], arg_len);
+        len += arg_len;
+    }
+    request[len++] = '\n';
+
+    memset(&addr, 0, sizeof(addr));
+    addr.sun_family = AF_UNIX;
+    if (socket_path(addr.sun_path, sizeof(addr.sun_path)) < 0) {
+        fprintf(stderr, "套接字路径过长\n");
+        return 3;
+    }
+
+    fd = socket(AF_UNIX, SOCK_STREAM | SOCK_CLOEXEC, 0);
+    if (fd < 0 || connect(fd, (struct sockaddr *)&addr, sizeof(addr)) < 0) {
+        fprintf(stderr, "无法连接 perflaunch (%s): %s\n", addr.sun_path, strerror(errno));
+        return 3;
+    }
+    if (write_all(fd, request, len) < 0) {
+        fprintf(stderr, "发送失败: %s\n", strerror(errno));
+        return 3;
+    }
+    shutdown(fd, SHUT_WR);
+
+    /* 第一行是状态: "ok" 或 "error <原因>"，之后的内容原样输出 */
+    while ((n = read(fd, reply, sizeof(reply))) != 0) {
+        char *start = reply;
+        if (n < 0) {
+            if (errno == EINTR)
+                continue;
+            fprintf(stderr, "读取失败: %s\n", strerror(errno));
+            return 3;
+        }
+        if (!in_body) {
+            char *newline = memchr(reply, '\n', (size_t)n);
+            size_t status_len = newline ? (size_t)(newline - reply) : (size_t)n;
+            if (ok < 0)
+                ok = status_len == 2 && memcmp(reply, "ok", 2) == 0;
+            if (!ok)
+                fwrite(reply, 1, status_len, stderr);
+            if (!newline)
+                continue;
+            if (!ok)
+                fputc('\n', stderr);
+            in_body = 1;
+            start = newline + 1;
+        }
+        fwrite(start, 1, (size_t)(reply + n - start), stdout);
+    }
+    close(fd);
+    return ok == 1 ? 0 : 1;
+}
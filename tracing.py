@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+环形缓冲区事件追踪
+热路径上只把 (时间戳, 事件号, 级别, 参数) 写入预分配的槽位，不格式化、不做 I/O；
+格式化和输出在 flush 时进行，可以手动调用，也可以交给后台线程定期执行
+"""
+
+import itertools
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+# 关闭追踪: 比任何级别都高
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error", OFF: "off"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+_event_names: List[str] = []
+_event_ids: Dict[str, int] = {}
+
+
+def register_event(name: str) -> int:
+    """登记事件名，返回事件号；同名事件返回同一个号"""
+    event_id = _event_ids.get(name)
+    if event_id is None:
+        event_id = _event_ids[name] = len(_event_names)
+        _event_names.append(name)
+    return event_id
+
+
+class Tracer:
+    """固定容量的追踪缓冲区
+
+    每个槽位保存一个 (序号, 时间戳, 事件号, 级别, 参数) 元组。序号来自 itertools.count，
+    next() 在 GIL 下是原子的，多个线程同时写入也不会拿到同一个槽位。
+    缓冲区写满后覆盖最旧的事件，flush 时根据序号报告丢失的数量。
+    调用方先检查 level 再调用 emit，关闭时热路径上只有一次属性读取和比较。
+    """
+
+    def __init__(self, capacity: int = 4096, level: int = OFF, stream: Optional[TextIO] = None):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"容量必须是 2 的幂: {capacity}")
+        self.level = level
+        self.stream = stream
+        self._mask = capacity - 1
+        self._ring: List[Optional[tuple]] = [None] * capacity
+        self._counter = itertools.count()
+        # 已输出的事件总数
+        self._flushed = 0
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    def emit(self, event_id: int, arg: Any = None, level: int = DEBUG, _clock=time.perf_counter):
+        """记录一个事件，arg 保存引用，flush 时才转换为字符串"""
+        sequence = next(self._counter)
+        self._ring[sequence & self._mask] = (sequence, _clock(), event_id, level, arg)
+
+    def flush(self) -> int:
+        """输出上次 flush 之后的事件，返回输出的条数"""
+        with self._flush_lock:
+            flushed = self._flushed
+            events = sorted(event for event in self._ring if event is not None and event[0] >= flushed)
+            if not events:
+                return 0
+            lines = []
+            dropped = events[0][0] - flushed
+            if dropped:
+                lines.append(f"[trace] 缓冲区已满，丢失 {dropped} 个事件")
+            for _sequence, timestamp, event_id, level, arg in events:
+                lines.append(f"[trace {timestamp:.6f}] {LEVEL_NAMES.get(level, '?')} {_event_names[event_id]} {arg!s}")
+            self._flushed = events[-1][0] + 1
+        stream = self.stream or sys.stderr
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+        return len(events)
+
+    def start_flusher(self, interval: float = 0.5):
+        """启动后台线程定期 flush"""
+        if self._flusher is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                except (OSError, ValueError):
+                    # 输出流已关闭
+                    return
+
+        self._flusher = threading.Thread(target=run, name="trace-flusher", daemon=True)
+        self._flusher.start()
+
+
+_default_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """进程内共享的追踪器"""
+    return _default_tracer
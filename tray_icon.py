@@ -1,15 +1,14 @@
-import tkinter as tk
-from PIL import Image, ImageDraw
-import pystray
 import threading
-from select_window import MaterialSelectWindow
-from main import apps
+import ui
+from settings import get_settings
+from launcher import AlreadyLaunched, report_launch_error, start_app
 import os
 
 # 应用列表
 
-def create_image():
-    """创建托盘图标图像"""
+def draw_image():
+    """绘制托盘图标"""
+    from PIL import Image, ImageDraw
     # 创建一个简单的图标
     width = 64
     height = 64
@@ -23,31 +22,34 @@ def create_image():
         fill=(255, 255, 255, 255))
     return image
 
+def create_image():
+    """托盘图标图像，第一次启动时绘制并保存到缓存，之后直接读取 PNG"""
+    from icons import cached_image
+    return cached_image("tray-64-v1", draw_image)
+
 def launch_app(app_name):
-    """启动应用程序"""
+    """启动应用程序，与 main 中的选择窗口共用启动流程，同样计入使用记录和 launch.spawn"""
     if not app_name:
         return
-    print(f"Launching {apps[app_name]}...")
-    os.popen(f"exec {apps[app_name]}", mode='r', buffering=-1)
+    try:
+        start_app(app_name, get_settings().current)
+    except (AlreadyLaunched, OSError, ValueError) as e:
+        report_launch_error(app_name, e)
 
 def show_select_window(icon, item):
-    """显示选择窗口"""
-    def run_window():
-        # 在主线程中创建并显示窗口
-        window = MaterialSelectWindow(list(apps.keys()), launch_app, "请选择一个选项")
-        window.show()
-    
-    # 在新线程中运行窗口，避免阻塞托盘图标
-    window_thread = threading.Thread(target=run_window, daemon=True)
-    window_thread.start()
+    """显示选择窗口: 托盘线程不操作 Tk，只向界面线程提交命令"""
+    ui_loop = ui.get_ui()
+    if ui_loop is not None:
+        ui_loop.post(ui.SHOW)
 
 def exit_program(icon, item):
     """退出程序"""
     icon.stop()
     os._exit(0)  # 强制退出程序
 
-def start_tray_icon():
-    """启动托盘图标"""
+def create_tray_icon():
+    """创建托盘图标(不进入事件循环)"""
+    import pystray
     # 创建菜单
     menu = pystray.Menu(
         pystray.MenuItem("打开选择窗口", show_select_window),
@@ -55,15 +57,29 @@ def start_tray_icon():
     )
     
     # 创建图标
-    icon = pystray.Icon("PerfLaunch", create_image(), "PerfLaunch", menu)
+    return pystray.Icon("PerfLaunch", create_image(), "PerfLaunch", menu)
+
+def start_tray_icon():
+    """启动托盘图标"""
+    icon = create_tray_icon()
     
     # 在独立线程中运行图标
     icon.run()
 
 def main():
     """主函数"""
-    # 启动托盘图标
-    start_tray_icon()
+    from select_window import MaterialSelectWindow
+    # 主线程作为界面线程，托盘图标在独立线程中运行
+    window = MaterialSelectWindow(list(get_settings().current.apps), launch_app, "请选择一个选项",
+                                  persistent=True)
+
+    def show():
+        if not window.visible:
+            window.present(list(get_settings().current.apps))
+
+    ui.install(window.root).register(ui.SHOW, show, coalesce=True)
+    threading.Thread(target=start_tray_icon, name="tray", daemon=True).start()
+    window.root.mainloop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面线程命令队列
+Tk 解释器只能由创建它的线程使用。键盘监听、托盘、控制套接字等其他线程不直接操作窗口，
+而是把命令放入队列，并向管道写入一个字节；Tk 事件循环通过 createfilehandler 监听管道，
+在界面线程中取出并执行命令。tkinter 在创建 UiLoop 时才导入
+"""
+
+import os
+import queue
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+# 可合并的命令连续出现多次时只执行最后一次
+SHOW = "show"
+HIDE = "hide"
+REFRESH = "refresh"
+
+
+class UiLoop:
+    """在拥有 Tk 解释器的线程中执行其他线程提交的命令
+
+    post() 可以在任何线程调用；处理函数由 register() 注册，只在界面线程中执行。
+    必须在界面线程中创建，之后由该线程运行 root.mainloop()
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.thread_id = threading.get_ident()
+        self._handlers: Dict[str, Tuple[Callable, bool]] = {}
+        # SimpleQueue.put 不会阻塞，也不会被其他线程的 get 挡住
+        self._queue: "queue.SimpleQueue[Tuple[str, tuple]]" = queue.SimpleQueue()
+        self._read_fd, self._write_fd = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        # 管道中已有未读的唤醒字节时不再写入，避免大量提交时写满管道
+        self._wakeup_pending = False
+        self.executed = 0
+        self.coalesced = 0
+        import tkinter
+        root.tk.createfilehandler(self._read_fd, tkinter.READABLE, self._on_readable)
+
+    def register(self, command: str, handler: Callable, coalesce: bool = False):
+        """注册命令；coalesce 为真时，一次取出的连续同名命令只执行最后一个"""
+        self._handlers[command] = (handler, coalesce)
+
+    def post(self, command: str, *args):
+        """提交命令，可在任何线程调用，不等待执行"""
+        if command not in self._handlers:
+            raise ValueError(f"未知的界面命令: {command}")
+        self._queue.put((command, args))
+        self._wake()
+
+    def call(self, func: Callable, *args):
+        """在界面线程中执行任意函数"""
+        self._queue.put(("", (func,) + args))
+        self._wake()
+
+    def _wake(self):
+        # 先入队再检查标志: 界面线程总是先清除标志再取队列，不会漏掉命令
+        if not self._wakeup_pending:
+            self._wakeup_pending = True
+            try:
+                os.write(self._write_fd, b"\0")
+            except BlockingIOError:
+                pass
+
+    def _on_readable(self, fd, _mask):
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
+        self._wakeup_pending = False
+        self.drain()
+
+    def drain(self):
+        """执行队列中的全部命令，只能在界面线程中调用"""
+        commands = []
+        while True:
+            try:
+                commands.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        last = len(commands) - 1
+        for i, (command, args) in enumerate(commands):
+            if not command:
+                self._run(args[0], args[1:])
+                continue
+            handler, coalesce = self._handlers[command]
+            if coalesce and i < last and commands[i + 1][0] == command:
+                self.coalesced += 1
+                continue
+            self._run(handler, args)
+
+    def _run(self, func: Callable, args: tuple):
+        self.executed += 1
+        try:
+            func(*args)
+        except Exception as e:
+            # 一个命令失败不影响后续命令和事件循环
+            print(f"界面命令执行失败: {e!r}")
+
+    def close(self):
+        self.root.tk.deletefilehandler(self._read_fd)
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+
+_ui: Optional[UiLoop] = None
+
+
+def install(root) -> UiLoop:
+    """在界面线程中创建进程内共享的命令队列"""
+    global _ui
+    if _ui is not None:
+        raise ValueError("界面线程已经存在")
+    _ui = UiLoop(root)
+    return _ui
+
+
+def get_ui() -> Optional[UiLoop]:
+    """进程内共享的命令队列，界面线程尚未启动时为 None"""
+    return _ui
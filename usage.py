@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+使用记录与 frecency 排序
+启动记录追加写入日志，定期压缩为快照；分数按启动次数和时间衰减增量计算
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from paths import atomic_write, state_dir
+
+SNAPSHOT_VERSION = 1
+# 分数半衰期: 一周前的启动只算半次
+HALF_LIFE = 7 * 24 * 3600.0
+# 衰减到这个分数以下的应用在压缩时删除(约 10 个半衰期没有使用)
+MIN_SCORE = 0.001
+
+
+class UsageStore:
+    """应用使用记录
+
+    每个应用只保存 [key, count]，其中 key = log2(分数) + 时间 / 半衰期。
+    当前分数为 2 ** (key - 现在 / 半衰期)，比较不同应用时"现在"会抵消，
+    所以排序直接比较 key，不需要回放历史，也不需要每次重新计算衰减。
+    """
+
+    def __init__(self, directory: Optional[str] = None, half_life: float = HALF_LIFE,
+                 compact_every: int = 1000):
+        directory = directory or state_dir()
+        self.snapshot_path = os.path.join(directory, "usage.json")
+        self.log_path = os.path.join(directory, "usage.log")
+        self.half_life = half_life
+        self.compact_every = compact_every
+        self.apps: Dict[str, List[float]] = {}
+        self._generation = 0
+        self._log_records = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """读取快照，再回放快照之后追加的日志"""
+        self.apps = {}
+        self._generation = 0
+        self._log_records = 0
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = json.loads(f.read())
+            if data.get("version") == SNAPSHOT_VERSION and data.get("half_life") == self.half_life:
+                self.apps = data["apps"]
+                self._generation = data["generation"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                header = f.readline()
+                # 日志代数与快照不一致，说明压缩中途退出，日志内容已经包含在快照里
+                if header.strip() != f"#{self._generation}":
+                    f.close()
+                    self._reset_log()
+                    return
+                for line in f:
+                    timestamp, _, name = line.rstrip('\n').partition('\t')
+                    try:
+                        self._apply(name, float(timestamp))
+                    except ValueError:
+                        continue
+                    self._log_records += 1
+        except OSError:
+            pass
+
+    def _apply(self, name: str, timestamp: float):
+        """把一次启动计入分数"""
+        now_key = timestamp / self.half_life
+        entry = self.apps.get(name)
+        if entry is None:
+            self.apps[name] = [now_key, 1]
+            return
+        # 旧分数衰减到当前时刻后加 1: log2(2 ** x + 1)，按 log-sum-exp 写法避免溢出
+        x = entry[0] - now_key
+        entry[0] = now_key + max(x, 0.0) + math.log2(1.0 + 2.0 ** -abs(x))
+        entry[1] += 1
+
+    def record(self, name: str, timestamp: Optional[float] = None):
+        """记录一次启动，追加到日志"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._apply(name, timestamp)
+            try:
+                if self._log_records == 0 and not os.path.exists(self.log_path):
+                    self._reset_log()
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(f"{timestamp:.0f}\t{name}\n")
+            except OSError as e:
+                print(f"无法写入使用记录: {e}")
+                return
+            self._log_records += 1
+            if self._log_records >= self.compact_every:
+                self._compact()
+
+    def score(self, name: str, now: Optional[float] = None) -> float:
+        """当前分数"""
+        entry = self.apps.get(name)
+        if entry is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return 2.0 ** (entry[0] - now / self.half_life)
+
+    def rank(self, names: Iterable[str]) -> List[str]:
+        """有使用记录的按分数从高到低排在前面，其余保持原顺序"""
+        names = list(names)
+        apps = self.apps
+        used = sorted((name for name in names if name in apps), key=lambda n: apps[n][0], reverse=True)
+        if not used:
+            return names
+        used_set = set(used)
+        return used + [name for name in names if name not in used_set]
+
+    def compact(self):
+        """把日志合并进快照并清空日志"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        min_key = time.time() / self.half_life + math.log2(MIN_SCORE)
+        self.apps = {name: entry for name, entry in self.apps.items() if entry[0] >= min_key}
+        self._generation += 1
+        data = {"version": SNAPSHOT_VERSION, "half_life": self.half_life,
+                "generation": self._generation, "apps": self.apps}
+        try:
+            atomic_write(self.snapshot_path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+            self._reset_log()
+        except OSError as e:
+            print(f"无法压缩使用记录: {e}")
+            return
+        self._log_records = 0
+
+    def _reset_log(self):
+        atomic_write(self.log_path, f"#{self._generation}\n".encode('utf-8'))
+
+
+_default_store: Optional[UsageStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_usage() -> UsageStore:
+    """进程内共享的使用记录"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = UsageStore()
+    return _default_store
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件变化监视
+Linux 上通过 inotify 监视文件所在目录，编辑器"写临时文件再重命名"的保存方式也能收到通知；
+inotify 不可用时退回定时 stat 轮询
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# 目录中文件的删除和移出也会改变结果
+_DIRECTORY_MASK = _WATCH_MASK | IN_MOVED_FROM | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+# 收到第一个事件后再等这么久，把一次保存产生的多个事件合并为一次回调
+COALESCE_DELAY = 0.02
+POLL_INTERVAL = 0.05
+# 轮询目录需要 stat 其中每个文件，间隔更长
+DIRECTORY_POLL_INTERVAL = 0.5
+
+
+def _file_key(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """用于判断文件是否变化的 (inode, 大小, mtime_ns)"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _inotify_fd(directory: str, mask: int = _WATCH_MASK) -> Optional[int]:
+    """创建监视 directory 的 inotify 描述符，不支持时返回 None"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class FileWatcher:
+    """在后台线程中监视单个文件，内容变化时调用 on_change()"""
+
+    def __init__(self, file_path: str, on_change: Callable[[], None], poll_interval: float = POLL_INTERVAL):
+        self.file_path = os.path.abspath(file_path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._key = _file_key(self.file_path)
+        self._thread: Optional[threading.Thread] = None
+        # 实际使用的方式: "inotify" 或 "poll"
+        self.mode = ""
+
+    def start(self):
+        if self._thread is not None:
+            return
+        fd = _inotify_fd(os.path.dirname(self.file_path))
+        self.mode = "poll" if fd is None else "inotify"
+        target = self._poll if fd is None else self._watch_inotify
+        args = () if fd is None else (fd,)
+        self._thread = threading.Thread(target=target, args=args, name="file-watcher", daemon=True)
+        self._thread.start()
+
+    def _check(self):
+        """文件确实变化时才回调，忽略目录中其他文件和内容未变的事件"""
+        key = _file_key(self.file_path)
+        if key is None or key == self._key:
+            return
+        self._key = key
+        self.on_change()
+
+    def _watch_inotify(self, fd: int):
+        name = os.fsencode(os.path.basename(self.file_path))
+        while True:
+            data = os.read(fd, 65536)
+            if not self._names_match(data, name):
+                continue
+            # 合并紧随其后的事件
+            while select.select([fd], [], [], COALESCE_DELAY)[0]:
+                os.read(fd, 65536)
+            self._check()
+
+    @staticmethod
+    def _names_match(data: bytes, name: bytes) -> bool:
+        """一批 inotify 事件中是否有目标文件"""
+        offset = 0
+        while offset < len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，可能丢失了目标文件的事件
+                return True
+            if data[offset:offset + length].rstrip(b'\0') == name:
+                return True
+            offset += length
+        return False
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self._check()
+
+
+class DirectoryWatcher:
+    """在后台线程中监视目录中以 suffix 结尾的文件，增加、删除或修改时调用 on_change()
+
+    只报告"可能有变化"，由回调自己比较各文件，未变化的文件不需要重新处理
+    """
+
+    def __init__(self, directory: str, suffix: str, on_change: Callable[[], None],
+                 poll_interval: float = DIRECTORY_POLL_INTERVAL):
+        self.directory = os.path.abspath(directory)
+        self.suffix = suffix
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._thread: Optional[threading.Thread] = None
+        self.mode = ""
+
+    def start(self):
+        if self._thread is not None:
+            return
+        fd = _inotify_fd(self.directory, _DIRECTORY_MASK)
+        self.mode = "poll" if fd is None else "inotify"
+        target = self._poll if fd is None else self._watch_inotify
+        args = () if fd is None else (fd,)
+        self._thread = threading.Thread(target=target, args=args, name="directory-watcher", daemon=True)
+        self._thread.start()
+
+    def _watch_inotify(self, fd: int):
+        suffix = os.fsencode(self.suffix)
+        while True:
+            data = os.read(fd, 65536)
+            if not self._matches(data, suffix):
+                continue
+            while select.select([fd], [], [], COALESCE_DELAY)[0]:
+                os.read(fd, 65536)
+            self.on_change()
+
+    @staticmethod
+    def _matches(data: bytes, suffix: bytes) -> bool:
+        offset = 0
+        while offset < len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            if mask & IN_Q_OVERFLOW or (name.endswith(suffix) and not name.startswith(b'.')):
+                return True
+            offset += length
+        return False
+
+    def _state(self):
+        try:
+            names = [name for name in os.listdir(self.directory)
+                     if name.endswith(self.suffix) and not name.startswith('.')]
+        except OSError:
+            return None
+        return {name: _file_key(os.path.join(self.directory, name)) for name in names}
+
+    def _poll(self):
+        state = self._state()
+        while True:
+            time.sleep(self.poll_interval)
+            current = self._state()
+            if current != state:
+                state = current
+                self.on_change()